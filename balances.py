@@ -1,7 +1,13 @@
 #!/usr/bin/env python3
 # -*- coding: UTF-8 -*-
 
-import copy
+# This must be the first import so it can time all the others (see --profile-imports)
+import classes.import_profiler
+
+import argparse
+import csv
+import json
+import sys
 
 from constants.constants import (
     BASIC_COIN_LOOKUP,
@@ -16,9 +22,14 @@ from classes.common import (
     get_user_choice
 )
 
+from classes.balance_snapshots import balance_snapshots
+from classes.tracer import add_timing_arguments, start_timings
 from classes.wallets import UserWallets
 from classes.wallet import UserWallet
 
+# The columns for the --format csv and ndjson records
+RECORD_FIELDS:list = ['type', 'wallet', 'address', 'coin', 'denom', 'validator', 'available', 'delegated', 'rewards', 'value_usd']
+
 def widestWalletName(user_wallets:UserWallets) -> int:
 
     longest_name: int = 0
@@ -29,272 +40,297 @@ def widestWalletName(user_wallets:UserWallets) -> int:
 
     return longest_name
 
-def main():
-    
-    # Check if there is a new version we should be using
-    check_version()
-    check_database()
+def format_amount(amount:float, denom:str) -> str:
+    """
+    Turn a raw amount into a readable one, with up to 6 decimal places and no trailing zeros.
 
-    # Get the user wallets. We'll be getting the balances futher on down.
-    user_wallets:dict = UserWallets().loadUserWallets(get_balances = False)
-    
-    if len(user_wallets) == 0:
-        print (" 🛑 This password couldn't decrypt any wallets. Make sure it is correct, or rebuild the wallet list by running the configure_user_wallet.py script again.\n")
-        exit()
+    @params:
+        - amount: the raw amount
+        - denom: the denom, so we know the precision
 
-    just_main_coins:bool = get_user_choice(' ❓ Show just LUNC and USTC? (y/n) ', [])
+    @return: the formatted amount
+    """
 
-    if just_main_coins == True:
-        coin_lookup = BASIC_COIN_LOOKUP
-        print ('\n 🕐 Getting the balances for just LUNC and USTC in your wallets, please wait...')
-    else:
-        coin_lookup = FULL_COIN_LOOKUP
-        print ('\n 🕐 Getting the balances for all coins in your wallets, please wait...')
+    return ("%.6f" % (divide_raw_balance(amount, denom))).rstrip('0').rstrip('.')
 
-    balance_coins = {}
-    label_widths  = []
+def build_balance_table(user_wallets:dict, coin_lookup:dict, just_main_coins:bool) -> list[dict, list, list]:
+    """
+    Build the coin, wallet, and validator table in a single pass over the wallets.
+    Each row only holds the cells that have a value, so adding more validators doesn't make every row bigger.
 
-    # These are the default widths of the first 4 columns
-    # We need to go through each validator find its name and width
-    label_widths.append(len('Coin'))
-    label_widths.append(len('Wallet'))
-    label_widths.append(len('Value'))
-    label_widths.append(len('Available'))
-    label_widths.append(len('Delegated'))
+    @params:
+        - user_wallets: the wallets, with the balances and delegations already loaded
+        - coin_lookup: the coins we are showing
+        - just_main_coins: are we only showing LUNC and USTC?
 
-    # First, create a template of all the validators
-    validator_template:dict = {'Available': '', 'Delegated': ''}
+    @return: the table (coin name -> wallet name -> row), the validator column names, and the denoms we need prices for
+    """
 
-    wallet_count: int = 0
-    max_padding: int = widestWalletName(user_wallets)
+    table:dict       = {}
+    validators:dict  = {}    # The keys are the validator columns, in the order we find them
+    coin_denoms:dict = {}    # The keys are the denoms we need prices for
 
     for wallet_name in user_wallets:
-        wallet_count += 1
-
-        update_text: str = f'{wallet_name} {wallet_count}/{len(user_wallets)}' + (' ' * max_padding)
-        print (f'\r    {update_text}', end='\r')
-
         wallet:UserWallet = user_wallets[wallet_name]
-        delegations:dict  = wallet.getDelegations()
+        delegations:dict  = wallet.delegations
 
         if delegations is not None:
             for validator in delegations:
-                if validator not in validator_template:
-                    if int(delegations[validator]['balance_amount']) > 0 and len(delegations[validator]['rewards']) > 0:
+                if int(delegations[validator]['balance_amount']) > 0 and len(delegations[validator]['rewards']) > 0:
+                    validators[validator] = True
 
-                        validator_template.update({validator: ''})
+        for denom in wallet.balances:
+            amount:str = format_amount(wallet.balances[denom], denom)
+            denom:str  = wallet.denomTrace(denom)
 
-                        # The default width is zero until we find out what the maximum width/value is:
-                        label_widths.append(0)
+            if just_main_coins == False or denom in BASIC_COIN_LOOKUP:
+                coin_denoms[denom] = True
 
-    # Then, get all the coins we'll be charting (column 1)
-    coin_denoms:list = []
+            if float(amount) > 0 and denom in coin_lookup:
+                row:dict = table.setdefault(coin_lookup[denom], {}).setdefault(wallet_name, {'Available': '', 'Delegated': '', 'rewards': {}})
+                row['Available'] = amount
 
-    for wallet_name in user_wallets:
-        wallet:UserWallet = user_wallets[wallet_name]
-        wallet.getBalances()
+        if delegations is None:
+            continue
 
-        if len(wallet_name) > label_widths[1]:
-            label_widths[1] = len(wallet_name)
+        # Keep track of the current delegated amount
+        delegated_amount:float = 0
+        for validator in delegations:
+            rewards:dict = delegations[validator]['rewards']
 
-        for denom in wallet.balances:
-            raw_amount:float   = divide_raw_balance(wallet.balances[denom], denom)
-            denom:str          = wallet.denomTrace(denom)
-            if just_main_coins == True and denom in BASIC_COIN_LOOKUP: 
-                if denom not in coin_denoms:
-                    coin_denoms.append(denom)
-            elif just_main_coins == False:
-                if denom not in coin_denoms:
-                    coin_denoms.append(denom)
-            
-        for denom in wallet.balances:
-            
-            raw_amount:float = divide_raw_balance(wallet.balances[denom], denom)
-            denom:str        = wallet.denomTrace(denom)
+            for denom in rewards:
+                if denom == ULUNA:
+                    delegated_amount += float(format_amount(delegations[validator]['balance_amount'], denom))
 
-            amount:str = ("%.6f" % (raw_amount)).rstrip('0').rstrip('.')
+                amount:str = format_amount(rewards[denom], denom)
 
-            if float(amount) > 0:
+                if denom in coin_lookup and float(amount) > 0:
+                    row:dict = table.setdefault(coin_lookup[denom], {}).setdefault(wallet_name, {'Available': '', 'Delegated': '', 'rewards': {}})
 
-                if denom in coin_lookup:
-                    coin_denom = copy.deepcopy(coin_lookup[denom])
+                    # Only LUNC can be delegated
+                    if denom == ULUNA:
+                        row['Delegated'] = delegated_amount
+                    else:
+                        row['Delegated'] = ''
 
-                    if len(coin_denom) > label_widths[0]:
-                        label_widths[0] = len(coin_denom)
+                    row['rewards'][validator] = amount
 
-                    if coin_denom not in balance_coins:
-                        balance_coins[coin_denom] = {}
+    return table, list(validators), list(coin_denoms)
 
-                    if wallet_name not in balance_coins[coin_denom]:
-                        balance_coins[coin_denom].update({wallet_name: validator_template})
-                
-                    cur_vals:dict = copy.deepcopy(balance_coins[coin_denom][wallet_name])
-                    cur_vals.update({'Available': amount})
-                    
-                    if len(str(amount)) > label_widths[3]:
-                        label_widths[3] = len(str(amount))
+def render_balance_table(table:dict, validators:list, coin_prices:dict) -> str:
+    """
+    Turn the balance table into text, with each column as wide as its widest value.
 
-                    # Get the total number of delegations here and populate label_widths[3]
-                    cur_wallets:dict = copy.deepcopy(balance_coins[coin_denom])
-                    cur_wallets.update({wallet_name: cur_vals})
+    @params:
+        - table: the table from build_balance_table
+        - validators: the validator column names
+        - coin_prices: the price for each denom
 
-                    balance_coins.update({coin_denom: cur_wallets})
+    @return: the table, ready to print
+    """
 
-        # Get the delegations on this wallet
-        delegations:dict = wallet.delegations
+    # Coin names back to their denoms, so we can find the prices
+    denoms_by_name:dict = {}
+    for denom in FULL_COIN_LOOKUP:
+        denoms_by_name.setdefault(FULL_COIN_LOOKUP[denom], denom)
 
-        # Keep track of the current delegated amount
-        delegated_amount:float = 0
-        if delegations is not None:
-            for validator in delegations:
-                for denom in delegations[validator]['rewards']:
+    columns:list       = ['Available', 'Delegated'] + validators
+    column_widths:list = [len('Available'), len('Delegated')] + [0] * len(validators)
+    coin_width:int     = len('Coin')
+    wallet_width:int   = len('Wallet')
+    value_width:int    = len('Value')
 
-                    if denom == ULUNA:
-                        raw_amount        = divide_raw_balance(delegations[validator]['balance_amount'], denom)
-                        delegated_amount += float(("%.6f" % (raw_amount)).rstrip('0').rstrip('.'))
-
-                    raw_amount:float = divide_raw_balance(delegations[validator]['rewards'][denom], denom)
-                    amount:str       = ("%.6f" % (raw_amount)).rstrip('0').rstrip('.')
-
-                    if denom in coin_lookup:
-                        if float(amount) > 0:
-
-                            coin_denom = copy.deepcopy(coin_lookup[denom])
-
-                            if coin_denom not in balance_coins:
-                                balance_coins[coin_denom] = {}
-
-                            if wallet_name not in balance_coins[coin_denom]:
-                                balance_coins[coin_denom].update({wallet_name: validator_template})
-                                
-                            cur_vals:dict = copy.deepcopy(balance_coins[coin_denom][wallet_name])
-
-                            if denom == ULUNA:
-                                cur_vals.update({'Delegated': delegated_amount})
-                            else:
-                                cur_vals.update({'Delegated': ''})
-                                
-                            cur_vals.update({validator: amount})
-                            
-                            cur_wallets:dict = copy.deepcopy(balance_coins[coin_denom])
-                            cur_wallets.update({wallet_name: cur_vals})
-
-                            balance_coins.update({coin_denom: cur_wallets})
-
-                            # Find the validator column that this applies to:
-                            val_count = 0
-                            for val_name in validator_template:
-                                if val_name == validator:
-                                    if len(str(amount)) > label_widths[3 + val_count]:
-                                        label_widths[3 + val_count] = len(str(amount))
-                                    break
-                                val_count += 1
-
-                            # Update the delegation column width:
-                            if len(str(delegated_amount)) > label_widths[4]:
-                                label_widths[4] = len(str(delegated_amount))
+    # Work out the values and column widths first
+    rows:list = []
+    for coin_type in sorted(table):
+        coin_width = max(coin_width, len(coin_type))
+        this_coin:str = denoms_by_name[coin_type]
 
-    # Go and get all the prices in one request:
-    coin_prices:dict = wallet.getCoinPrice(coin_denoms)
+        for wallet_name in table[coin_type]:
+            row:dict = table[coin_type][wallet_name]
 
-    # Figure out the biggest total
-    for coin_type in balance_coins:
-        for wallet_name in balance_coins[coin_type]:
-            
+            # Add up the total amount we have for this wallet
             denom_total:float = 0
-            if balance_coins[coin_type][wallet_name]['Available'] != '':
-                denom_total = float(balance_coins[coin_type][wallet_name]['Available'])
-            if balance_coins[coin_type][wallet_name]['Delegated'] != '':
-                denom_total += float(balance_coins[coin_type][wallet_name]['Delegated'])
-            
-            # Get this coin's technical name (ie, uluna)
-            this_coin:str = list(FULL_COIN_LOOKUP.keys())[list(FULL_COIN_LOOKUP.values()).index(coin_type)]
+            if row['Available'] != '':
+                denom_total = float(row['Available'])
+            if row['Delegated'] != '':
+                denom_total += float(row['Delegated'])
 
             if this_coin in coin_prices:
-                # Get the formatted value
                 denom_value:str = "${:,.2f}".format((denom_total) * coin_prices[this_coin])
+                value_width     = max(value_width, len(denom_value))
+            else:
+                denom_value:str = '---'
 
-                if len(denom_value) > label_widths[2]:
-                    label_widths[2] = len(denom_value)
+            cells:list = [str(row['Available']), str(row['Delegated'])] + [row['rewards'].get(validator, '') for validator in validators]
+            for index, cell in enumerate(cells):
+                if len(cell) > column_widths[index]:
+                    column_widths[index] = len(cell)
 
-    padding_str:str = ' ' * 100
+            wallet_width = max(wallet_width, len(wallet_name))
+            rows.append([coin_type, wallet_name, denom_value, cells])
 
-    if label_widths[0] > len('Coin'):
-        header_string = ' Coin' + padding_str[0:label_widths[0] - len('Coin')] + ' |'
-    else:
-        header_string = ' Coin |'
+    # Validator names are cut down to fit their column
+    header_string:str = ' ' + 'Coin'.ljust(coin_width) + ' | ' + 'Wallet'.ljust(wallet_width) + ' | ' + 'Value'.ljust(value_width) + ' |'
+    for column, width in zip(columns, column_widths):
+        header_string += ' ' + column.ljust(width)[0:width] + ' |'
 
-    if label_widths[1] > len('Wallet'):
-        header_string += ' Wallet ' + padding_str[0:label_widths[1] - len('Wallet')] + '|'
-    else:
-        header_string += ' Wallet |'
+    horizontal_spacer:str = '-' * len(header_string)
 
-    if label_widths[2] > len('Value'):
-        header_string += ' Value ' + padding_str[0:label_widths[2] - len('Value')] + '|'
-    else:
-        header_string += ' Value |'
+    lines:list         = [horizontal_spacer, header_string, horizontal_spacer]
+    previous_coin:str  = None
+    for coin_type, wallet_name, denom_value, cells in rows:
+        if coin_type != previous_coin:
+            if previous_coin is not None:
+                lines.append(horizontal_spacer)
 
-    val_count:int = 1
-    for validator in validator_template:
-        if label_widths[2 + val_count] >= len(validator):
-            header_string += ' ' + validator + ' ' + padding_str[0:label_widths[2 + val_count] - len(validator)] + '|'
+            line:str = ' ' + coin_type.ljust(coin_width) + ' |'
         else:
-            header_string += ' ' + validator[0:label_widths[2 + val_count] - len(validator)] + ' |' 
+            line:str = ' ' * (coin_width + 2) + '|'
 
-        val_count += 1
+        line += ' ' + wallet_name.ljust(wallet_width) + ' | ' + denom_value.ljust(value_width) + ' |'
+        for cell, width in zip(cells, column_widths):
+            line += ' ' + cell.ljust(width) + ' |'
 
-    horizontal_spacer:str = '-' * len(header_string)
+        lines.append(line)
+        previous_coin = coin_type
 
-    # Sort the balance coins into alphabetical order    
-    sorted_coins:dict = dict(sorted(balance_coins.items()))
+    if len(rows) > 0:
+        lines.append(horizontal_spacer)
 
-    body_string:str = ''
-    for coin_type in sorted_coins:
+    return '\n'.join(lines) + '\n'
 
-        current_coin =  ' ' + coin_type + padding_str[0:label_widths[0] - len(coin_type)] + ' |'
-        body_string += current_coin
+def wallet_records(wallet_name:str, wallet:UserWallet, coin_lookup:dict, coin_prices:dict) -> list:
+    """
+    Turn a single wallet into records for the streaming output.
+    There is one 'balance' record for each coin, and one 'reward' record for each coin and validator.
 
-        first:bool = True
-        for wallet_name in balance_coins[coin_type]:
-            if first == True:
-                body_string += ' ' + ((wallet_name + padding_str)[0:label_widths[1]]) + ' |'
-            else:
-                body_string += padding_str[0:len(current_coin) - 1] + '| ' + ((wallet_name + padding_str)[0:label_widths[1]]) + ' |'
+    @params:
+        - wallet_name: the wallet name, as it appears in the wallet file
+        - wallet: the wallet, with the balances and delegations already loaded
+        - coin_lookup: the coins we are showing
+        - coin_prices: the price for each denom
 
-            # Get this coin's technical name (ie, uluna)
-            this_coin:str = list(FULL_COIN_LOOKUP.keys())[list(FULL_COIN_LOOKUP.values()).index(coin_type)]
+    @return: a list of dicts, each with the RECORD_FIELDS keys
+    """
 
-            # Add up the total amount we have for this wallet
-            denom_total:float = 0
-            if balance_coins[coin_type][wallet_name]['Available'] != '':
-                denom_total = float(balance_coins[coin_type][wallet_name]['Available'])
-            if balance_coins[coin_type][wallet_name]['Delegated'] != '':
-                denom_total += float(balance_coins[coin_type][wallet_name]['Delegated'])
+    # The raw available and delegated amounts for each denom
+    totals:dict = {}
+    for denom in wallet.balances or {}:
+        totals.setdefault(wallet.denomTrace(denom), [0, 0])[0] += float(wallet.balances[denom])
 
-            # Format it nicely
-            if this_coin in coin_prices:
-                denom_value:str = "${:,.2f}".format((denom_total) * coin_prices[this_coin])
-            else:
-                denom_value:str = '---'
+    delegations:dict = wallet.delegations or {}
+    for validator in delegations:
+        totals.setdefault(delegations[validator]['balance_denom'], [0, 0])[1] += float(delegations[validator]['balance_amount'])
+
+    result:list = []
+    for denom in totals:
+        if denom not in coin_lookup:
+            continue
+
+        available:float = float(format_amount(totals[denom][0], denom))
+        delegated:float = float(format_amount(totals[denom][1], denom))
+
+        if available > 0 or delegated > 0:
+            value:float = round((available + delegated) * coin_prices[denom], 2) if denom in coin_prices else None
+            result.append({'type': 'balance', 'wallet': wallet_name, 'address': wallet.address, 'coin': coin_lookup[denom], 'denom': denom, 'validator': None, 'available': available, 'delegated': delegated, 'rewards': None, 'value_usd': value})
+
+    for validator in delegations:
+        rewards:dict = delegations[validator]['rewards']
+
+        for denom in rewards:
+            amount:float = float(format_amount(rewards[denom], denom))
+
+            if denom in coin_lookup and amount > 0:
+                value:float = round(amount * coin_prices[denom], 2) if denom in coin_prices else None
+                result.append({'type': 'reward', 'wallet': wallet_name, 'address': wallet.address, 'coin': coin_lookup[denom], 'denom': denom, 'validator': validator, 'available': None, 'delegated': None, 'rewards': amount, 'value_usd': value})
+
+    return result
+
+def main():
+    
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--refresh', action = 'store_true', help = "reuse the last snapshot for wallets that haven't sent a transaction since (funds received and rewards earned since then won't be shown)")
+    parser.add_argument('--format', choices = ['table', 'ndjson', 'csv'], default = 'table', help = 'table: the usual summary. ndjson/csv: one record per wallet coin and validator reward, written as each wallet is loaded')
+    parser.add_argument('--coins', choices = ['main', 'all'], default = None, help = 'just LUNC and USTC, or every coin (asked for if not given in table mode, all coins otherwise)')
+    add_timing_arguments(parser)
 
-            body_string += ' ' + ((denom_value + padding_str)[0:label_widths[2]]) + ' |'
-            
-            val_count:int = 1
-            for validator in balance_coins[coin_type][wallet_name]:
-                body_string += ' ' +  (((str(balance_coins[coin_type][wallet_name][validator])) + padding_str)[0:label_widths[2 + val_count]]) + ' |'
-                val_count += 1
+    args = parser.parse_args()
 
-            body_string += '\n'
+    start_timings(args)
 
-            first = False
+    # The records are the only thing on stdout, so everything else goes to stderr (including the notices at the end)
+    output = sys.stdout
+    if args.format != 'table':
+        sys.stdout = sys.stderr
 
-        body_string += horizontal_spacer + '\n'
+    # Check if there is a new version we should be using
+    check_version()
+    check_database()
+
+    # Get the user wallets. We'll be getting the balances futher on down.
+    user_wallets:dict = UserWallets().loadUserWallets(get_balances = False)
+    
+    if len(user_wallets) == 0:
+        print (" 🛑 This password couldn't decrypt any wallets. Make sure it is correct, or rebuild the wallet list by running the configure_user_wallet.py script again.\n")
+        exit()
+
+    if args.coins is not None:
+        just_main_coins:bool = (args.coins == 'main')
+    elif args.format == 'table':
+        just_main_coins:bool = get_user_choice(' ❓ Show just LUNC and USTC? (y/n) ', [])
+    else:
+        just_main_coins:bool = False
+
+    if just_main_coins == True:
+        coin_lookup = BASIC_COIN_LOOKUP
+        print ('\n 🕐 Getting the balances for just LUNC and USTC in your wallets, please wait...')
+    else:
+        coin_lookup = FULL_COIN_LOOKUP
+        print ('\n 🕐 Getting the balances for all coins in your wallets, please wait...')
+
+    if args.format != 'table':
+        # The prices are needed before the first wallet is written, so get every coin we might show in one request
+        coin_prices:dict = user_wallets[list(user_wallets)[0]].getCoinPrice(list(coin_lookup))
+
+        if args.format == 'csv':
+            csv_writer:csv.DictWriter = csv.DictWriter(output, fieldnames = RECORD_FIELDS)
+            csv_writer.writeheader()
+
+    wallet_count: int = 0
+    max_padding: int = widestWalletName(user_wallets)
+
+    # Load the balances and delegations, and save them as a snapshot for snapshots.py
+    for wallet_name in user_wallets:
+        wallet_count += 1
+
+        update_text: str = f'{wallet_name} {wallet_count}/{len(user_wallets)}' + (' ' * max_padding)
+        print (f'\r    {update_text}', end='\r')
+
+        balance_snapshots.refresh(user_wallets[wallet_name], force = not args.refresh)
+
+        if args.format != 'table':
+            # Write this wallet straight away, so nothing has to wait for the rest of the wallets
+            for record in wallet_records(wallet_name, user_wallets[wallet_name], coin_lookup, coin_prices):
+                if args.format == 'csv':
+                    csv_writer.writerow(record)
+                else:
+                    output.write(json.dumps(record) + '\n')
+
+            output.flush()
+
+    if args.format != 'table':
+        print ('\n')
+        return
+
+    table, validators, coin_denoms = build_balance_table(user_wallets, coin_lookup, just_main_coins)
+
+    # Go and get all the prices in one request:
+    wallet:UserWallet = user_wallets[wallet_name]
+    coin_prices:dict  = wallet.getCoinPrice(coin_denoms)
 
     print ('\n')
-    print (horizontal_spacer)
-    print (header_string)
-    print (horizontal_spacer)
-    print (body_string)
+    print (render_balance_table(table, validators, coin_prices))
 
 if __name__ == "__main__":
     """ This is executed when run from the command line """
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+import hashlib
+import hmac
+import os
+import sqlite3
+
+from sqlite3 import Connection
+
+from constants.constants import (
+    DB_FILE_NAME
+)
+
+from classes.schema import schema_manager
+
+class AddressCache:
+    """
+    Remembers which encrypted seeds have already been checked against their saved address,
+    so we don't need to derive the key from the mnemonic every time the wallets are loaded.
+
+    Nothing readable is saved: both the seed and the address are stored as HMACs, using a key made from the user password.
+    If the password or the encrypted seed changes, there won't be a match and the wallet is checked properly again.
+    """
+
+    def __init__(self, password:str):
+        self.checked:bool    = False
+        self.conn:Connection = None
+        self.key:bytes       = None
+        self.known:dict      = {}
+        self.password:str    = password
+
+        # Statistics
+        self.hits:int        = 0
+        self.misses:int      = 0
+
+    def isKnown(self, encrypted_seed:str, address:str) -> bool:
+        """
+        Has this encrypted seed already been checked against this address?
+
+        @params:
+            - encrypted_seed: the encrypted seed from the YML file
+            - address: the address saved against it
+
+        @return: true/false
+        """
+
+        if self.__open() == False:
+            return False
+
+        fingerprint:str = self.__mac('seed', encrypted_seed)
+
+        if fingerprint in self.known and hmac.compare_digest(self.known[fingerprint], self.__mac('address', address)):
+            self.hits += 1
+            return True
+
+        self.misses += 1
+
+        return False
+
+    def remember(self, encrypted_seed:str, address:str) -> bool:
+        """
+        Save this encrypted seed and address pair as checked.
+
+        @params:
+            - encrypted_seed: the encrypted seed from the YML file
+            - address: the address that the seed was shown to generate
+
+        @return: True
+        """
+
+        if self.__open() == False:
+            return True
+
+        fingerprint:str = self.__mac('seed', encrypted_seed)
+        address_mac:str = self.__mac('address', address)
+
+        if self.known.get(fingerprint) != address_mac:
+            self.known[fingerprint] = address_mac
+
+            try:
+                self.conn.execute("INSERT OR REPLACE INTO address_cache (fingerprint, address_mac) VALUES (?, ?);", [fingerprint, address_mac])
+                self.conn.commit()
+            except sqlite3.Error as err:
+                print (' 🛎️  This wallet could not be saved in the address cache.')
+                print (err)
+
+        return True
+
+    def __mac(self, label:str, value:str) -> str:
+        """
+        Create an HMAC of this value with the cache key.
+
+        @params:
+            - label: what kind of value this is, so a seed and an address never produce the same result
+            - value: the value to hash
+
+        @return: a hex string
+        """
+
+        return hmac.new(self.key, f'{label}|{value}'.encode('utf-8'), hashlib.sha256).hexdigest()
+
+    def __open(self) -> bool:
+        """
+        Open the cache tables and create the HMAC key the first time the cache is used.
+        The key is made with scrypt so the cache is no easier to guess the password from than the YML file.
+
+        @params:
+            - None
+
+        @return: true if the cache is available
+        """
+
+        if self.checked == True:
+            return self.key is not None
+
+        self.checked = True
+
+        # Only use the cache if the Osmosis database has already been created
+        if not os.path.exists(DB_FILE_NAME):
+            return False
+
+        try:
+            conn:Connection = schema_manager.connect()
+
+            row = conn.execute("SELECT value FROM address_cache_settings WHERE name = 'salt';").fetchone()
+            if row is None:
+                salt:bytes = os.urandom(16)
+                conn.execute("INSERT INTO address_cache_settings (name, value) VALUES ('salt', ?);", [salt.hex()])
+            else:
+                salt:bytes = bytes.fromhex(row[0])
+
+            conn.commit()
+
+            self.known = {fingerprint: address_mac for fingerprint, address_mac in conn.execute("SELECT fingerprint, address_mac FROM address_cache;")}
+            self.conn  = conn
+            self.key   = hashlib.scrypt(self.password.encode('utf-8'), salt = salt, n = 2 ** 14, r = 8, p = 1, dklen = 32)
+        except (sqlite3.Error, ValueError) as err:
+            print (' 🛎️  The address cache could not be opened, so every wallet will be checked in full.')
+            print (err)
+            return False
+
+        return True
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+from __future__ import annotations
+
+import json
+import sqlite3
+
+from decimal import Decimal
+from sqlite3 import Connection
+from typing import TYPE_CHECKING
+
+from classes.schema import schema_manager
+
+from terra_classic_sdk.exceptions import LCDResponseError
+
+# Only used for the type hints - the wallet module imports the SDK
+if TYPE_CHECKING:
+    from classes.wallet import UserWallet
+
+class BalanceSnapshots:
+    """
+    A history of wallet balances, saved in osmosis.db.
+
+    Each snapshot records the available, delegated, and reward amounts for every coin in a wallet,
+    along with the block height and the account sequence at the time. The sequence only changes when
+    the wallet sends a transaction, so if it's the same as last time then the previous snapshot can be
+    used instead of loading everything again. Funds received and rewards earned since then won't be
+    included, so this is only used when it's asked for.
+
+    The history can be read back for charts and comparisons without any network requests.
+    """
+
+    def __amounts(self, conn:Connection, snapshot_id:int) -> dict:
+        """
+        Get the amounts for a single snapshot.
+
+        @params:
+            - conn: an open connection
+            - snapshot_id: the snapshot we want
+
+        @return: a dict of denoms, each with a list of [available, delegated, rewards] Decimals
+        """
+
+        return {denom: [Decimal(available), Decimal(delegated), Decimal(rewards)] for denom, available, delegated, rewards in conn.execute("SELECT denom, available, delegated, rewards FROM balance_snapshot_amounts WHERE snapshot_id = ?;", [snapshot_id])}
+
+    def accountState(self, wallet:UserWallet) -> list[int, int]:
+        """
+        Get the current block height, and the number of transactions this wallet has sent.
+
+        @params:
+            - wallet: the wallet we want the details for
+
+        @return: the block height and the account sequence (which is None if the account doesn't exist yet). Both are None if the LCD couldn't be reached.
+        """
+
+        try:
+            block_height:int = int(wallet.terra.tendermint.block_info()['block']['header']['height'])
+
+            try:
+                sequence:int = int(wallet.terra.auth.account_info(wallet.address).get_sequence())
+            except LCDResponseError as err:
+                # New accounts don't exist on the chain until they've received something
+                if 'not found' not in str(err.message):
+                    raise err
+                sequence:int = None
+        except Exception as err:
+            print (f' 🛎️  Network error: the account details for {wallet.name} could not be retrieved, so no snapshot will be used or saved for it.')
+            print (err)
+            return None, None
+
+        return block_height, sequence
+
+    def diff(self, wallet_name:str) -> dict:
+        """
+        Compare the two most recent snapshots for a wallet.
+
+        @params:
+            - wallet_name: the wallet name, as it appears in the wallet file
+
+        @return: a dict of denoms, each with the change in 'available', 'delegated', and 'rewards' (only denoms that changed are included)
+        """
+
+        conn:Connection = schema_manager.connect()
+        snapshots:list  = conn.execute("SELECT ID FROM balance_snapshots WHERE wallet_name = ? ORDER BY block_height DESC, ID DESC LIMIT 2;", [wallet_name]).fetchall()
+
+        result:dict = {}
+        if len(snapshots) == 2:
+            latest:dict   = self.__amounts(conn, snapshots[0][0])
+            previous:dict = self.__amounts(conn, snapshots[1][0])
+
+            for denom in list(previous) + [denom for denom in latest if denom not in previous]:
+                zero:list    = [Decimal(0), Decimal(0), Decimal(0)]
+                changes:list = [new - old for new, old in zip(latest.get(denom, zero), previous.get(denom, zero))]
+
+                if changes != [0, 0, 0]:
+                    result[denom] = {'available': changes[0], 'delegated': changes[1], 'rewards': changes[2]}
+
+        conn.close()
+
+        return result
+
+    def history(self, wallet_name:str = None, denom:str = None) -> list:
+        """
+        Get every saved amount, oldest first.
+
+        @params:
+            - wallet_name: only include this wallet (optional)
+            - denom: only include this denom (optional)
+
+        @return: a list of dicts with the date, block height, wallet, denom, and the raw amounts as strings
+        """
+
+        query:str   = "SELECT s.date_added, s.block_height, s.wallet_name, s.wallet_address, a.denom, a.available, a.delegated, a.rewards FROM balance_snapshots s JOIN balance_snapshot_amounts a ON a.snapshot_id = s.ID WHERE 1 = 1"
+        params:list = []
+
+        if wallet_name is not None:
+            query += " AND s.wallet_name = ?"
+            params.append(wallet_name)
+
+        if denom is not None:
+            query += " AND a.denom = ?"
+            params.append(denom)
+
+        query += " ORDER BY s.block_height, s.ID, a.denom;"
+
+        conn:Connection = schema_manager.connect()
+        keys:list       = ['date', 'block_height', 'wallet_name', 'wallet_address', 'denom', 'available', 'delegated', 'rewards']
+        result:list     = [dict(zip(keys, row)) for row in conn.execute(query, params)]
+        conn.close()
+
+        return result
+
+    def latest(self, wallet:UserWallet) -> dict:
+        """
+        Get the most recent snapshot for this wallet.
+
+        @params:
+            - wallet: the wallet we want the snapshot for
+
+        @return: a dict with the snapshot 'id', 'block_height', and 'account_sequence', or None if there isn't one
+        """
+
+        conn:Connection = schema_manager.connect()
+        row:list        = conn.execute("SELECT ID, block_height, account_sequence FROM balance_snapshots WHERE wallet_address = ? AND chain_id = ? ORDER BY block_height DESC, ID DESC LIMIT 1;", [wallet.address, wallet.terra.chain_id]).fetchone()
+        conn.close()
+
+        if row is None:
+            return None
+
+        return {'id': row[0], 'block_height': row[1], 'account_sequence': row[2]}
+
+    def refresh(self, wallet:UserWallet, force:bool = True) -> bool:
+        """
+        Load the balances and delegations for this wallet, and save them as a new snapshot.
+        If force is False, and the wallet hasn't sent any transactions since the last snapshot, then that is used instead.
+        Nothing is saved if any of the balances or delegations couldn't be loaded, or if the LCD couldn't tell us the block height.
+
+        @params:
+            - wallet: the wallet we want to load
+            - force: always load everything from the LCD
+
+        @return: True if the wallet was loaded from the LCD, False if it came from the last snapshot
+        """
+
+        state:list = None
+
+        if force == False:
+            state = self.accountState(wallet)
+            block_height, sequence = state
+
+            if sequence is not None:
+                try:
+                    snapshot:dict = self.latest(wallet)
+                except sqlite3.Error as err:
+                    print (f' 🛎️  The last snapshot for {wallet.name} could not be read: {err}')
+                    snapshot:dict = None
+
+                if snapshot is not None and snapshot['account_sequence'] == sequence:
+                    self.restore(wallet, snapshot['id'])
+                    return False
+
+        wallet.getBalances()
+        wallet.getDelegations()
+
+        # A partial load isn't saved, otherwise it would be reused as the real balances until the wallet sends something
+        if wallet.balances_complete == False or wallet.delegations_complete == False:
+            print (f' 🛎️  Some of the balances for {wallet.name} could not be loaded, so no snapshot has been saved for it.')
+            return True
+
+        # The account details are only needed for saving, so they aren't asked for until we know there's something to save
+        if state is None:
+            state = self.accountState(wallet)
+
+        block_height, sequence = state
+        if block_height is not None:
+            try:
+                self.save(wallet, block_height, sequence)
+            except sqlite3.Error as err:
+                print (f' 🛎️  The snapshot for {wallet.name} could not be saved: {err}')
+
+        return True
+
+    def restore(self, wallet:UserWallet, snapshot_id:int) -> bool:
+        """
+        Fill in the wallet balances and delegations from a saved snapshot.
+
+        @params:
+            - wallet: the wallet to update
+            - snapshot_id: the snapshot to use
+
+        @return: True
+        """
+
+        conn:Connection = schema_manager.connect()
+
+        balances:dict = {}
+        pools:dict    = {}
+        for denom, available in conn.execute("SELECT denom, available FROM balance_snapshot_amounts WHERE snapshot_id = ? ORDER BY rowid;", [snapshot_id]):
+            if Decimal(available) > 0:
+                balances[denom] = int(Decimal(available))
+
+                if denom[0:len('gamm/pool/')] == 'gamm/pool/':
+                    pools[int(denom[len('gamm/pool/'):])] = balances[denom]
+
+        delegations:dict = {}
+        for validator_address, validator_name, commission, balance_denom, balance_amount, rewards in conn.execute("SELECT validator_address, validator_name, commission, balance_denom, balance_amount, rewards FROM balance_snapshot_delegations WHERE snapshot_id = ? ORDER BY rowid;", [snapshot_id]):
+            delegations[validator_name] = {
+                'balance_amount': int(Decimal(balance_amount)),
+                'balance_denom':  balance_denom,
+                'commission':     commission,
+                'delegator':      wallet.address,
+                'rewards':        {reward_denom: float(amount) for reward_denom, amount in json.loads(rewards).items()},
+                'validator':      validator_address,
+                'validator_name': validator_name
+            }
+
+        conn.close()
+
+        wallet.balances    = balances
+        wallet.delegations = delegations
+        wallet.pools       = pools
+
+        return True
+
+    def save(self, wallet:UserWallet, block_height:int, sequence:int) -> int:
+        """
+        Save the current balances and delegations for this wallet.
+
+        @params:
+            - wallet: the wallet, with the balances and delegations already loaded
+            - block_height: the block height these amounts are from
+            - sequence: the account sequence at the time
+
+        @return: the new snapshot ID
+        """
+
+        # Add up the totals for each denom
+        totals:dict = {}
+        for denom in wallet.balances or {}:
+            totals[denom] = [Decimal(str(wallet.balances[denom])), Decimal(0), Decimal(0)]
+
+        for validator_name in wallet.delegations or {}:
+            delegation:dict = wallet.delegations[validator_name]
+
+            totals.setdefault(delegation['balance_denom'], [Decimal(0), Decimal(0), Decimal(0)])
+            totals[delegation['balance_denom']][1] += Decimal(str(delegation['balance_amount']))
+
+            for denom in delegation['rewards']:
+                totals.setdefault(denom, [Decimal(0), Decimal(0), Decimal(0)])
+                totals[denom][2] += Decimal(str(delegation['rewards'][denom]))
+
+        conn:Connection = schema_manager.connect()
+
+        with conn:
+            cursor = conn.execute("INSERT INTO balance_snapshots (wallet_name, wallet_address, chain_id, block_height, account_sequence) VALUES (?, ?, ?, ?, ?);", [str(wallet.name), wallet.address, wallet.terra.chain_id, block_height, sequence])
+            snapshot_id:int = cursor.lastrowid
+
+            conn.executemany("INSERT INTO balance_snapshot_amounts (snapshot_id, denom, available, delegated, rewards) VALUES (?, ?, ?, ?, ?);", [
+                [snapshot_id, denom, str(totals[denom][0]), str(totals[denom][1]), str(totals[denom][2])] for denom in totals
+            ])
+
+            conn.executemany("INSERT OR REPLACE INTO balance_snapshot_delegations (snapshot_id, validator_address, validator_name, commission, balance_denom, balance_amount, rewards) VALUES (?, ?, ?, ?, ?, ?, ?);", [
+                [snapshot_id, delegation['validator'], delegation['validator_name'], delegation['commission'], delegation['balance_denom'], str(delegation['balance_amount']), json.dumps({denom: str(delegation['rewards'][denom]) for denom in delegation['rewards']})]
+                for delegation in (wallet.delegations or {}).values()
+            ])
+
+        conn.close()
+
+        return snapshot_id
+
+# The shared snapshot store - import this rather than creating a new BalanceSnapshots
+balance_snapshots:BalanceSnapshots = BalanceSnapshots()
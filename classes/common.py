@@ -1,89 +1,49 @@
 #!/usr/bin/env python3
 # -*- coding: UTF-8 -*-
 
+from __future__ import annotations
 
-import json
 import os
-import requests
 import sqlite3
 import traceback
 
 from datetime import datetime, timedelta
+from sqlite3 import Connection
 
 from constants.constants import (
     CHAIN_DATA,
-    CHECK_FOR_UPDATES,
-    DB_FILE_NAME,
-    VERSION_URI
+    DB_FILE_NAME
 )
-from terra_classic_sdk.core.coin import Coin
-from terra_classic_sdk.core.coins import Coins
+
+from typing import TYPE_CHECKING
+
+from classes.schema import schema_manager
+from classes.version_check import version_check
+
+# These are only used for type hints, and importing the SDK is slow
+if TYPE_CHECKING:
+    from terra_classic_sdk.core.coin import Coin
+    from terra_classic_sdk.core.coins import Coins
 
 def check_version() -> bool:
     """
     Check the github repo to see if there's a new version.
     This check can be disabled by changing CHECK_FOR_UPDATES in the constants file.
 
+    The check runs in the background and never holds up the script. If there is an update,
+    a notice is printed when the script finishes.
+
     @params:
         - None
 
-    @return: true/false if the script is on the current version
+    @return: True
     """
 
-    if CHECK_FOR_UPDATES == True:
-        local_json:json  = None
-        remote_json:json = None
-
-        print ('\nChecking for new version on Github...')
-        try:
-            with open('version.json') as file:
-                contents = file.read()
-            
-            local_json = json.loads(contents)
-        except:
-            print ('')
-            print ('The local version.json file could not be opened.')
-            print ('Please make sure you are using the latest version, check https://github.com/geoffmunn/utility-scripts for updates.')
-
-        if local_json is not None:
-            try:
-                remote_json = requests.get(url = VERSION_URI, timeout = 1).json()
-            except:
-                print ('')
-                print ('The remote version.json file could not be opened.')
-                print ('Please make sure you are using the latest version, check https://github.com/geoffmunn/utility-scripts for updates.')
-        else:
-            return False
-        
-        if remote_json is not None:
-            if local_json['version'] != remote_json['version']:
-                print ('')
-
-                local_bits = local_json['version'].split('.')
-                remote_bits = remote_json['version'].split('.')
-
-                if int(remote_bits[0]) > int(local_bits[0]):
-                    print (' 🛎️  A new major version is available!')
-                elif int(remote_bits[1]) > int(local_bits[1]):
-                    print (' 🛎️  A new minor version is available!')
-                elif int(remote_bits[2]) > int(local_bits[2]):
-                    print (' 🛎️  An update is available!')
-                elif int(local_bits[0]) > int(remote_bits[0]) or int(local_bits[1]) > int(remote_bits[1]) or int(local_bits[2]) > int(remote_bits[2]):
-                    print (' 🛎️  You are running a version ahead of the official release!')
-                    
-                print (' 🛎️  Please check https://github.com/geoffmunn/utility-scripts for updates.')
-                return False
-            else:
-                print ('... you have the latest version.')
-                return True
-        else:
-            return False
-    else:
-        return True
+    return version_check.start()
     
 def check_database() -> bool:
     """
-    Check if the Osmosis database is present.
+    Check if the Osmosis database is present, and bring its tables up to date.
 
     @params:
         - None
@@ -93,61 +53,32 @@ def check_database() -> bool:
 
     try:
         if os.stat(DB_FILE_NAME).st_size > 0:
-            # Check if the last scan was fairly recent:
+            # The tables, indexes, and settings are all handled by the schema manager
             try:
-                recent_scan = "SELECT last_scan_date FROM osmosis_summary WHERE ID = 1;"
-                conn        = sqlite3.connect(DB_FILE_NAME)
-                cursor      = conn.execute(recent_scan)
-
-                for row in cursor.fetchone():
-                    last_scan_date:datetime = datetime.strptime(row, '%Y-%m-%d %H:%M:%S')
-                    previous_date:datetime  = datetime.now() - timedelta(weeks = 2)
-                    
-                    if last_scan_date < previous_date:
-                        print ('\n 🗄  This database is out of date - you should get the latest Osmosis data.')
-                        print (' 🗄  Run the get_osmosis_pools.py script to update the database.\n')
+                conn:Connection = schema_manager.connect()
+            except sqlite3.Error as err:
+                print (f' 🛑 The database could not be brought up to date: {err}')
+                print (' 🛑 Make sure no other scripts are using osmosis.db, and try again.\n')
+                exit()
 
+            try:
+                row:list = conn.execute("SELECT MAX(last_scan_date) FROM osmosis_summary;").fetchone()
                 conn.close()
-            except:
+            except sqlite3.Error:
+                row:list = None
+
+            if row is None or row[0] is None:
                 print (' 🛑 The Osmosis pool database could accessed...')
                 print (' 🛑 Run \'get_osmosis_pools.py\' first to generate the list.\n')
                 exit()
 
-            # Make sure that the ibc_denoms table is there:
-            ibc_table_exists:bool = True
-            try:
-                recent_scan = "SELECT * FROM ibc_denoms LIMIT 1;"
-                conn        = sqlite3.connect(DB_FILE_NAME)
-                cursor      = conn.execute(recent_scan)
-                conn.close()
-            except:
-                ibc_table_exists = False
-
-            if ibc_table_exists == False:
-                print ('\n 🗄  No ibc_denom table found, creating one...')
-                create_ibc_table = "CREATE TABLE ibc_denoms (ID INTEGER PRIMARY KEY AUTOINCREMENT, date_added DATETIME DEFAULT CURRENT_TIMESTAMP, ibc_denom TEXT NOT NULL, readable_denom TEXT NOT NULL);"
-                conn   = sqlite3.connect(DB_FILE_NAME)
-                cursor = conn.execute(create_ibc_table)
-                conn.commit()
-                conn.close()
-
-            # Make sure that the ibc_denoms table is there:
-            trading_table_exists:bool = True
-            try:
-                recent_scan = "SELECT * FROM trades LIMIT 1;"
-                conn        = sqlite3.connect(DB_FILE_NAME)
-                cursor      = conn.execute(recent_scan)
-                conn.close()
-            except:
-                trading_table_exists = False
-
-            if trading_table_exists == False:
-                print ('\n 🗄  No trading table found, creating one...')
-                create_trade_table = "CREATE TABLE trades (ID INTEGER PRIMARY KEY AUTOINCREMENT, date_added DATETIME DEFAULT CURRENT_TIMESTAMP, wallet_name TEXT NOT NULL, coin_from TEXT NOT NULL, amount_from INTEGER NOT NULL, price_from REAL NOT NULL, coin_to TEXT NOT NULL, amount_to INTEGER NOT NULL, price_to REAL NOT NULL, fees TEXT NOT NULL, exit_profit REAL NOT NULL, exit_loss REAL NOT NULL, linked_trade_id INTEGER, tx_hash TEXT NOT NULL, status TEXT NOT NULL);"
-                conn               = sqlite3.connect(DB_FILE_NAME)
-                cursor             = conn.execute(create_trade_table)
-                conn.commit()
-                conn.close()
+            # Check if the last scan was fairly recent:
+            last_scan_date:datetime = datetime.strptime(row[0], '%Y-%m-%d %H:%M:%S')
+            previous_date:datetime  = datetime.now() - timedelta(weeks = 2)
+            
+            if last_scan_date < previous_date:
+                print ('\n 🗄  This database is out of date - you should get the latest Osmosis data.')
+                print (' 🗄  Run the get_osmosis_pools.py script to update the database.\n')
 
             return True
         else:
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+import requests
+import threading
+
+from requests.adapters import HTTPAdapter
+from urllib.parse import urlsplit
+
+from classes.rate_limiter import rate_limiter
+from classes.tracer import tracer
+
+from constants.constants import (
+    HTTP_POOL_SIZE,
+    HTTP_TIMEOUT,
+    REPLAY_SERVER_URL
+)
+
+# Requests that don't belong to a particular chain (Coingecko, Github etc) share this session
+DEFAULT_POOL_KEY = 'default'
+
+class ConnectionPool:
+    """
+    A process-wide collection of keep-alive HTTP sessions, one per chain.
+
+    Every LCD client and raw HTTP request borrows a connection from here,
+    so we only pay for the TCP+TLS handshake once per host instead of once per request.
+    """
+
+    def __init__(self):
+        self.lock:threading.Lock = threading.Lock()
+        self.request_counts:dict = {}
+        self.sessions:dict       = {}
+
+    def get(self, url:str, params = None, chain_id:str = None, timeout:float = HTTP_TIMEOUT) -> requests.Response:
+        """
+        Make a GET request using the pooled session for this chain.
+
+        @params:
+            - url: the full URL we are requesting
+            - params: optional query parameters (dict, list of tuples, or a multidict)
+            - chain_id: the chain this request belongs to. Leave empty for non-chain requests
+            - timeout: how long to wait for a response
+
+        @return: a requests Response object
+        """
+
+        return self.request('GET', url, chain_id, params = params, timeout = timeout)
+
+    def post(self, url:str, json:dict = None, chain_id:str = None, timeout:float = HTTP_TIMEOUT) -> requests.Response:
+        """
+        Make a POST request using the pooled session for this chain.
+
+        @params:
+            - url: the full URL we are posting to
+            - json: the body of this request, which will be sent as JSON
+            - chain_id: the chain this request belongs to. Leave empty for non-chain requests
+            - timeout: how long to wait for a response
+
+        @return: a requests Response object
+        """
+
+        return self.request('POST', url, chain_id, json = json, timeout = timeout)
+
+    def request(self, method:str, url:str, chain_id:str = None, **kwargs) -> requests.Response:
+        """
+        Send a request through the pooled session and keep track of how many we've made.
+        Requests are paced by the rate limiter for the host we are sending to.
+
+        @params:
+            - method: GET or POST
+            - url: the full URL we are requesting
+            - chain_id: the chain this request belongs to
+            - kwargs: any extra arguments for requests (params, json, timeout)
+
+        @return: a requests Response object
+        """
+
+        pool_key:str = chain_id if chain_id is not None else DEFAULT_POOL_KEY
+
+        session:requests.Session = self.session(pool_key)
+
+        with self.lock:
+            self.request_counts[pool_key] += 1
+
+        # Stay inside this host's request budget
+        rate_limiter.acquire(url)
+
+        if REPLAY_SERVER_URL != '':
+            url = self.replayUrl(url)
+
+        response:requests.Response = tracer.httpRequest(method, url, lambda: session.request(method, url, **kwargs))
+
+        if response.status_code == 429:
+            rate_limiter.throttled(url, response.headers.get('Retry-After'))
+
+        return response
+
+    def replayUrl(self, url:str) -> str:
+        """
+        Rewrite a URL so it goes through the replay server instead.
+        https://host/path becomes REPLAY_SERVER_URL/host/path
+
+        @params:
+            - url: the original URL
+
+        @return: the replay server URL
+        """
+
+        replay_server:str = REPLAY_SERVER_URL.rstrip('/')
+
+        if url.startswith(replay_server):
+            return url
+
+        parts      = urlsplit(url)
+        result:str = f'{replay_server}/{parts.netloc}{parts.path}'
+
+        if parts.query != '':
+            result += f'?{parts.query}'
+
+        return result
+
+    def session(self, pool_key:str) -> requests.Session:
+        """
+        Get the session for this chain, creating it the first time it is asked for.
+
+        @params:
+            - pool_key: the chain id, or DEFAULT_POOL_KEY
+
+        @return: a requests Session with a bounded keep-alive connection pool
+        """
+
+        with self.lock:
+            if pool_key not in self.sessions:
+                adapter:HTTPAdapter = HTTPAdapter(
+                    pool_connections = HTTP_POOL_SIZE,
+                    pool_maxsize     = HTTP_POOL_SIZE,
+                    pool_block       = True
+                )
+
+                session:requests.Session = requests.Session()
+                session.headers.update({'Accept': 'application/json', 'Connection': 'keep-alive'})
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+
+                self.sessions[pool_key]       = session
+                self.request_counts[pool_key] = 0
+
+            return self.sessions[pool_key]
+
+    def stats(self) -> dict:
+        """
+        Report how well the pool is working.
+        A 'hit' is a request that was served on an already-open connection.
+
+        @params:
+            - None
+
+        @return: a dict of pool keys, with request, connection, and reuse counts
+        """
+
+        result:dict = {}
+
+        with self.lock:
+            for pool_key in self.sessions:
+                session:requests.Session = self.sessions[pool_key]
+                connections:int          = 0
+
+                # The http and https prefixes share the same adapter, so only count it once
+                for adapter in set(session.adapters.values()):
+                    host_pools = adapter.poolmanager.pools
+                    for host_key in host_pools.keys():
+                        connections += host_pools[host_key].num_connections
+
+                request_count:int = self.request_counts[pool_key]
+                reused:int        = max(request_count - connections, 0)
+                hit_rate:float    = 0
+
+                if request_count > 0:
+                    hit_rate = round((reused / request_count) * 100, 2)
+
+                result[pool_key] = {
+                    'connections': connections,
+                    'hit_rate':    hit_rate,
+                    'requests':    request_count,
+                    'reused':      reused
+                }
+
+        return result
+
+    def printStats(self) -> bool:
+        """
+        Print a short summary of the connection pool statistics.
+
+        @params:
+            - None
+
+        @return: True
+        """
+
+        stats:dict = self.stats()
+
+        print ('\n 🔌 Connection pool statistics:')
+        for pool_key in stats:
+            print (f"    {pool_key}: {stats[pool_key]['requests']} requests over {stats[pool_key]['connections']} connections ({stats[pool_key]['reused']} reused, {stats[pool_key]['hit_rate']}% hit rate)")
+
+        return True
+
+# The shared pool - import this rather than creating a new ConnectionPool
+connection_pool:ConnectionPool = ConnectionPool()
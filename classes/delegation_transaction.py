@@ -12,6 +12,7 @@ from classes.terra_instance import TerraInstance
 from classes.transaction_core import TransactionCore, TransactionResult
 from classes.wallet import UserWallet
 
+from terra_classic_sdk.client.lcd import LCDClient
 from terra_classic_sdk.client.lcd.api.tx import (
     CreateTxOptions,
     Tx
@@ -42,19 +43,23 @@ class DelegationTransaction(TransactionCore):
 
         super(DelegationTransaction, self).__init__(*args, **kwargs)
         
-    def create(self, seed:str, denom:str = 'uluna') -> DelegationTransaction:
+    def create(self, seed:str, denom:str = 'uluna', terra:LCDClient = None) -> DelegationTransaction:
         """
         Create a delegation object and set it up with the provided details.
 
         @params:
             - seed: the wallet seed so we can create the wallet
             - denom: what denomination are we delegating? It will usually be LUNC
+            - terra: an existing LCD client for this chain, like the one on the wallet
 
         @return: self
         """
 
-        # Create the terra instance
-        self.terra = TerraInstance().create(denom)
+        # Use the provided terra instance, or get the shared one for this chain
+        if terra is None:
+            terra = TerraInstance().create(denom)
+
+        self.terra = terra
 
         # Create the wallet based on the calculated key
         prefix              = CHAIN_DATA[denom]['bech32_prefix']
@@ -288,7 +293,7 @@ def delegate_to_validator(wallet:UserWallet, validator_address:str, delegation_c
     transaction_result:TransactionResult = TransactionResult()
 
     # Create the delegation object
-    delegation_tx = DelegationTransaction().create(seed = wallet.seed, denom = ULUNA)
+    delegation_tx = DelegationTransaction().create(seed = wallet.seed, denom = ULUNA, terra = wallet.terra)
 
     # Assign the details
     delegation_tx.balances          = wallet.balances
@@ -362,7 +367,7 @@ def switch_validator(wallet:UserWallet, new_validator_address:str, old_validator
     transaction_result:TransactionResult = TransactionResult()
 
     # Create the delegation object
-    delegation_tx = DelegationTransaction().create(seed = wallet.seed, denom = ULUNA)
+    delegation_tx = DelegationTransaction().create(seed = wallet.seed, denom = ULUNA, terra = wallet.terra)
 
     # Assign the details
     delegation_tx.balances              = wallet.balances
@@ -424,7 +429,7 @@ def undelegate_from_validator(wallet:UserWallet, validator_address:str, undelega
     transaction_result:TransactionResult = TransactionResult()
 
     # Create the undelegation object    
-    undelegation_tx = DelegationTransaction().create(seed = wallet.seed, denom = ULUNA)
+    undelegation_tx = DelegationTransaction().create(seed = wallet.seed, denom = ULUNA, terra = wallet.terra)
 
     # Assign the details
     undelegation_tx.balances          = wallet.balances
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+import threading
+import time
+
+from constants.constants import (
+    LCD_EJECTION_COOLDOWN,
+    LCD_EJECTION_THRESHOLD
+)
+
+# How quickly the latency and error scores react to new results (0 - 1, higher is faster)
+SCORE_SMOOTHING = 0.3
+
+# How much an error counts against an endpoint, compared to its latency
+ERROR_PENALTY = 10
+
+class EndpointHealth:
+    """
+    The measured health of a single LCD endpoint.
+    """
+
+    def __init__(self, url:str, position:int):
+        self.consecutive_failures:int = 0
+        self.ejected_until:float      = 0
+        self.error_rate:float         = 0
+        self.failures:int             = 0
+        self.latency:float            = None
+        self.position:int             = position   # The order this URL appears in CHAIN_DATA, used as a tie-breaker
+        self.successes:int            = 0
+        self.url:str                  = url
+
+    def isEjected(self, now:float) -> bool:
+        """
+        Is this endpoint currently sitting out a cool-down period?
+
+        @params:
+            - now: the current monotonic time
+
+        @return: true/false
+        """
+
+        return self.ejected_until > now
+
+    def score(self) -> float:
+        """
+        A lower score is healthier. Endpoints we haven't measured yet get a score of zero,
+        so each one is tried once before we settle on the fastest. If it has only ever failed,
+        then it goes to the back of the queue.
+
+        @params:
+            - None
+
+        @return: the score for this endpoint
+        """
+
+        if self.latency is None:
+            return 0 if self.failures == 0 else float('inf')
+
+        return self.latency * (1 + (self.error_rate * ERROR_PENALTY))
+
+class EndpointSelector:
+    """
+    Keeps track of the latency and error rate of every LCD URL for each chain,
+    and ranks them so requests go to the healthiest endpoint first.
+
+    Endpoints that fail LCD_EJECTION_THRESHOLD times in a row are ejected for LCD_EJECTION_COOLDOWN seconds.
+    """
+
+    def __init__(self):
+        self.endpoints:dict      = {}
+        self.lock:threading.Lock = threading.Lock()
+
+    def rankedUrls(self, chain_id:str, default_url:str) -> list:
+        """
+        Get the URLs for this chain, healthiest first.
+        Ejected endpoints are put at the end so they are only used when everything else has failed.
+
+        @params:
+            - chain_id: the chain we are sending a request to
+            - default_url: the URL to use if nothing has been registered for this chain
+
+        @return: a list of base URLs
+        """
+
+        with self.lock:
+            if chain_id not in self.endpoints or len(self.endpoints[chain_id]) == 0:
+                return [default_url]
+
+            now:float = time.monotonic()
+
+            healthy:list = []
+            ejected:list = []
+            for endpoint in self.endpoints[chain_id].values():
+                if endpoint.isEjected(now):
+                    ejected.append(endpoint)
+                else:
+                    healthy.append(endpoint)
+
+            healthy = sorted(healthy, key = lambda endpoint: (endpoint.score(), endpoint.position))
+            ejected = sorted(ejected, key = lambda endpoint: endpoint.ejected_until)
+
+            return [endpoint.url for endpoint in healthy + ejected]
+
+    def recordFailure(self, chain_id:str, url:str) -> bool:
+        """
+        Record a failed request (connection error, timeout, or a busy response).
+
+        @params:
+            - chain_id: the chain this request was sent to
+            - url: the base URL of the endpoint
+
+        @return: true if this endpoint has just been ejected
+        """
+
+        with self.lock:
+            endpoint:EndpointHealth = self.__getEndpoint(chain_id, url)
+
+            endpoint.failures             += 1
+            endpoint.consecutive_failures += 1
+            endpoint.error_rate            = (SCORE_SMOOTHING * 1) + ((1 - SCORE_SMOOTHING) * endpoint.error_rate)
+
+            if endpoint.consecutive_failures >= LCD_EJECTION_THRESHOLD:
+                endpoint.ejected_until        = time.monotonic() + LCD_EJECTION_COOLDOWN
+                endpoint.consecutive_failures = 0
+                return True
+
+        return False
+
+    def recordSuccess(self, chain_id:str, url:str, latency:float) -> bool:
+        """
+        Record a successful request and how long it took.
+
+        @params:
+            - chain_id: the chain this request was sent to
+            - url: the base URL of the endpoint
+            - latency: how many seconds the request took
+
+        @return: True
+        """
+
+        with self.lock:
+            endpoint:EndpointHealth = self.__getEndpoint(chain_id, url)
+
+            endpoint.successes           += 1
+            endpoint.consecutive_failures = 0
+            endpoint.error_rate           = (1 - SCORE_SMOOTHING) * endpoint.error_rate
+
+            if endpoint.latency is None:
+                endpoint.latency = latency
+            else:
+                endpoint.latency = (SCORE_SMOOTHING * latency) + ((1 - SCORE_SMOOTHING) * endpoint.latency)
+
+        return True
+
+    def register(self, chain_id:str, urls:list) -> bool:
+        """
+        Add the LCD URLs for a chain. Duplicates are ignored, and existing health details are kept.
+
+        @params:
+            - chain_id: the chain these URLs belong to
+            - urls: a list of LCD URLs, in order of preference
+
+        @return: True
+        """
+
+        with self.lock:
+            if chain_id not in self.endpoints:
+                self.endpoints[chain_id] = {}
+
+            for url in urls:
+                self.__getEndpoint(chain_id, url)
+
+        return True
+
+    def stats(self) -> dict:
+        """
+        Return the current health details of every endpoint.
+
+        @params:
+            - None
+
+        @return: a dict of chains, each with a dict of URLs and their details
+        """
+
+        result:dict = {}
+        now:float   = time.monotonic()
+
+        with self.lock:
+            for chain_id in self.endpoints:
+                result[chain_id] = {}
+                for endpoint in self.endpoints[chain_id].values():
+                    result[chain_id][endpoint.url] = {
+                        'ejected':    endpoint.isEjected(now),
+                        'error_rate': round(endpoint.error_rate, 3),
+                        'failures':   endpoint.failures,
+                        'latency':    round(endpoint.latency, 3) if endpoint.latency is not None else None,
+                        'successes':  endpoint.successes
+                    }
+
+        return result
+
+    def __getEndpoint(self, chain_id:str, url:str) -> EndpointHealth:
+        """
+        Get the health object for this URL, creating it if required.
+        The lock must already be held by the caller.
+
+        @params:
+            - chain_id: the chain this URL belongs to
+            - url: the base URL of the endpoint
+
+        @return: an EndpointHealth object
+        """
+
+        url = url.rstrip('/')
+
+        if chain_id not in self.endpoints:
+            self.endpoints[chain_id] = {}
+
+        if url not in self.endpoints[chain_id]:
+            self.endpoints[chain_id][url] = EndpointHealth(url, len(self.endpoints[chain_id]))
+
+        return self.endpoints[chain_id][url]
+
+# The shared selector - import this rather than creating a new EndpointSelector
+endpoint_selector:EndpointSelector = EndpointSelector()
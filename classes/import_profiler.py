@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+import atexit
+import sys
+import threading
+import time
+
+class ImportProfiler:
+    """
+    Records how long every module takes to import.
+
+    This has to be imported before anything else in a script, and is turned on by the --profile-imports option.
+    Each loader that Python finds is given a timed version of exec_module, so nested imports are
+    subtracted from their parent and we can report both the total and the module's own time.
+    """
+
+    def __init__(self):
+        self.enabled:bool          = False
+        self.local:threading.local = threading.local()
+        self.lock:threading.Lock   = threading.Lock()
+        self.modules:dict          = {}
+        self.started:float         = time.perf_counter()
+
+    def enable(self) -> bool:
+        """
+        Start timing imports, and print the report when the script finishes.
+
+        @params:
+            - None
+
+        @return: True
+        """
+
+        if self.enabled == False:
+            self.enabled = True
+            self.started = time.perf_counter()
+
+            sys.meta_path.insert(0, TimedImportFinder(self))
+            atexit.register(self.report)
+
+        return True
+
+    def record(self, module_name:str, total:float, own:float) -> bool:
+        """
+        Keep the import time for this module.
+
+        @params:
+            - module_name: the full module name
+            - total: how long it took, including everything it imported
+            - own: how long the module itself took
+
+        @return: True
+        """
+
+        with self.lock:
+            self.modules[module_name] = [total, own]
+
+        return True
+
+    def report(self, limit:int = 25) -> bool:
+        """
+        Print the slowest modules, and the total time for each top level package.
+
+        @params:
+            - limit: how many modules to show
+
+        @return: True
+        """
+
+        with self.lock:
+            modules:dict = dict(self.modules)
+
+        if len(modules) == 0:
+            return True
+
+        packages:dict = {}
+        for module_name in modules:
+            package:str       = module_name.split('.')[0]
+            packages[package] = packages.get(package, 0) + modules[module_name][1]
+
+        name_width:int = max(len(module_name) for module_name in modules)
+        header:str     = f"    {'Module'.ljust(name_width)}  {'Total (ms)':>10}  {'Own (ms)':>9}"
+
+        print (f'\n ⏱️  Slowest imports ({len(modules)} modules):\n')
+        print (header)
+        print ('    ' + '-' * (len(header) - 4))
+
+        for module_name in sorted(modules, key = lambda module_name: modules[module_name][0], reverse = True)[0:limit]:
+            total, own = modules[module_name]
+            print (f'    {module_name.ljust(name_width)}  {total * 1000:>10.1f}  {own * 1000:>9.1f}')
+
+        print ('\n ⏱️  Import time by package:\n')
+        for package in sorted(packages, key = lambda package: packages[package], reverse = True)[0:limit]:
+            print (f'    {package.ljust(name_width)}  {packages[package] * 1000:>10.1f}')
+
+        print (f'\n    Total import time: {sum(packages.values()):.2f}s')
+
+        return True
+
+    def timeModule(self, module_name:str, exec_module, module) -> None:
+        """
+        Run a module's code, and record how long it took.
+
+        @params:
+            - module_name: the full module name
+            - exec_module: the loader's original exec_module function
+            - module: the module being loaded
+
+        @return: None
+        """
+
+        stack:list = getattr(self.local, 'stack', None)
+        if stack is None:
+            stack = self.local.stack = []
+
+        # Each level of the stack adds up the time spent in the modules it imports
+        stack.append(0)
+        start:float = time.perf_counter()
+
+        try:
+            exec_module(module)
+        finally:
+            total:float    = time.perf_counter() - start
+            children:float = stack.pop()
+
+            if len(stack) > 0:
+                stack[-1] += total
+
+            self.record(module_name, total, total - children)
+
+class TimedImportFinder:
+    """
+    A meta path finder that asks the other finders for each module, and then times the loader they return.
+    """
+
+    def __init__(self, profiler:ImportProfiler):
+        self.profiler:ImportProfiler = profiler
+
+    def find_spec(self, fullname:str, path = None, target = None):
+        """
+        Find the module spec with the normal finders, and time its loader.
+
+        @params:
+            - fullname: the full module name
+            - path: the package path, for submodules
+            - target: the module being reloaded, if there is one
+
+        @return: a ModuleSpec, or None if no other finder knows about this module
+        """
+
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, 'find_spec'):
+                continue
+
+            spec = finder.find_spec(fullname, path, target)
+            if spec is None:
+                continue
+
+            loader = spec.loader
+
+            # Built-in and frozen modules use the loader class itself, so those are left alone
+            if loader is not None and not isinstance(loader, type) and hasattr(loader, 'exec_module'):
+                exec_module = loader.exec_module
+                try:
+                    loader.exec_module = lambda module: self.profiler.timeModule(fullname, exec_module, module)
+                except AttributeError:
+                    pass
+
+            return spec
+
+        return None
+
+# The shared profiler - import this module first to use it
+import_profiler:ImportProfiler = ImportProfiler()
+
+if '--profile-imports' in sys.argv:
+    import_profiler.enable()
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import struct
+
+# pycryptodomex is already installed as part of cryptocode
+from Cryptodome.Cipher import AES
+
+# The first bytes of every keystore file, followed by the header length
+KEYSTORE_MAGIC:bytes   = b'LUNCKEY1'
+KEYSTORE_VERSION:int   = 1
+
+# scrypt settings for unlocking the master key - the same cost as a single cryptocode seed
+KEYSTORE_SCRYPT:dict   = {'n': 2 ** 14, 'r': 8, 'p': 1}
+
+class KeystoreError(Exception):
+    """
+    Raised when a keystore file is damaged, or can't be read.
+    """
+
+class Keystore:
+    """
+    A single file that holds every wallet, as an alternative to user_config.yml.
+
+    The file starts with a JSON header that lists every wallet name and address, and where its seed is in the file.
+    The password is only run through the key derivation once, to unlock a random master key.
+    Each seed is then encrypted separately with the master key (AES-GCM), so any one of them can be read
+    without decrypting the rest. The wallet name and address are part of each seed's authentication tag,
+    so a seed can't be moved to a different entry without it being noticed.
+    """
+
+    def __init__(self):
+        self.by_name:dict      = {}    # The same entries, by wallet name
+        self.data_offset:int   = 0
+        self.entries:list      = []
+        self.file_name:str     = None
+        self.header:dict       = {}
+        self.master_key:bytes  = None
+
+    def entry(self, wallet_name:str) -> dict:
+        """
+        Find the index entry for this wallet.
+
+        @params:
+            - wallet_name: the name of the wallet
+
+        @return: the entry dict, or None if it's not in this keystore
+        """
+
+        return self.by_name.get(wallet_name)
+
+    def load(self, file_name:str) -> Keystore:
+        """
+        Read the header of a keystore file. The seeds are only read when they are asked for.
+
+        @params:
+            - file_name: the keystore file
+
+        @return: self
+        """
+
+        with open(file_name, 'rb') as file:
+            magic:bytes = file.read(len(KEYSTORE_MAGIC))
+            if magic != KEYSTORE_MAGIC:
+                raise KeystoreError(f'{file_name} is not a keystore file')
+
+            try:
+                header_length:int = struct.unpack('>I', file.read(4))[0]
+                self.header       = json.loads(file.read(header_length).decode('utf-8'))
+            except (struct.error, ValueError) as err:
+                raise KeystoreError(f'the header in {file_name} is damaged: {err}')
+
+        if self.header.get('version') != KEYSTORE_VERSION:
+            raise KeystoreError(f"{file_name} is keystore version {self.header.get('version')}, but only version {KEYSTORE_VERSION} is supported")
+
+        self.data_offset = len(KEYSTORE_MAGIC) + 4 + header_length
+        self.entries     = self.header['entries']
+        self.file_name   = file_name
+        self.master_key  = None
+
+        # If a name is used twice, then the first one wins (like a search through the list would)
+        self.by_name = {}
+        for entry in self.entries:
+            self.by_name.setdefault(entry['wallet'], entry)
+
+        return self
+
+    def readSeed(self, wallet_name:str) -> str:
+        """
+        Decrypt the seed for a single wallet. The keystore must be unlocked first.
+
+        @params:
+            - wallet_name: the name of the wallet
+
+        @return: the seed, or None if this is an address-only entry
+        """
+
+        seeds, errors = self.readSeeds([wallet_name])
+
+        if wallet_name in errors:
+            raise errors[wallet_name]
+
+        return seeds.get(wallet_name)
+
+    def readSeeds(self, wallet_names:list) -> list[dict, dict]:
+        """
+        Decrypt the seeds for several wallets, reading them all through one file handle.
+        The keystore must be unlocked first.
+
+        @params:
+            - wallet_names: the names of the wallets
+
+        @return: a dict of wallet names and seeds (None for address-only entries), and a dict of wallet names and KeystoreErrors for any damaged seeds
+        """
+
+        if self.master_key is None:
+            raise KeystoreError('the keystore must be unlocked before a seed can be read')
+
+        entries:list = []
+        errors:dict  = {}
+        seeds:dict   = {}
+        for wallet_name in wallet_names:
+            entry:dict = self.entry(wallet_name)
+            if entry is None or entry['length'] == 0:
+                seeds[wallet_name] = None
+            else:
+                entries.append(entry)
+
+        if len(entries) == 0:
+            return seeds, errors
+
+        with open(self.file_name, 'rb') as file:
+            # The seeds are read in the order they were saved, so the file is read from start to finish
+            for entry in sorted(entries, key = lambda entry: entry['offset']):
+                file.seek(self.data_offset + entry['offset'])
+                blob:bytes = file.read(entry['length'])
+
+                try:
+                    seeds[entry['wallet']] = self.__decrypt(self.master_key, blob, self.__associatedData(entry)).decode('utf-8')
+                except ValueError:
+                    errors[entry['wallet']] = KeystoreError(f"the seed for {entry['wallet']} is damaged or has been tampered with")
+
+        return seeds, errors
+
+    def save(self, file_name:str, wallets:list, password:str) -> int:
+        """
+        Write a new keystore file with a new salt and master key.
+        The file is written to a temporary name first, so a failure won't damage an existing keystore.
+
+        @params:
+            - file_name: where to save the keystore
+            - wallets: a list of dicts with 'wallet', 'address', and optionally 'seed' (in plain text)
+            - password: the password that will unlock this keystore
+
+        @return: the number of wallets saved
+        """
+
+        salt:bytes         = os.urandom(16)
+        master_key:bytes   = os.urandom(32)
+        wrapping_key:bytes = self.__deriveKey(password, salt, KEYSTORE_SCRYPT)
+
+        entries:list = []
+        data:bytes   = b''
+        for wallet in wallets:
+            entry:dict = {'wallet': str(wallet['wallet']), 'address': str(wallet['address']), 'offset': len(data), 'length': 0}
+
+            if wallet.get('seed') not in [None, '']:
+                blob:bytes      = self.__encrypt(master_key, wallet['seed'].encode('utf-8'), self.__associatedData(entry))
+                entry['length'] = len(blob)
+                data           += blob
+
+            entries.append(entry)
+
+        header:dict = {
+            'entries':    entries,
+            'kdf':        dict(KEYSTORE_SCRYPT, name = 'scrypt', salt = salt.hex()),
+            'master_key': self.__encrypt(wrapping_key, master_key, KEYSTORE_MAGIC).hex(),
+            'version':    KEYSTORE_VERSION
+        }
+
+        header_bytes:bytes = json.dumps(header).encode('utf-8')
+        temp_name:str      = f'{file_name}.tmp'
+
+        # Only the current user can read this file
+        with open(os.open(temp_name, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), 'wb') as file:
+            file.write(KEYSTORE_MAGIC)
+            file.write(struct.pack('>I', len(header_bytes)))
+            file.write(header_bytes)
+            file.write(data)
+
+        os.replace(temp_name, file_name)
+
+        self.load(file_name)
+        self.master_key = master_key
+
+        return len(entries)
+
+    def unlock(self, password:str) -> bool:
+        """
+        Unlock the master key with the user password.
+
+        @params:
+            - password: the keystore password
+
+        @return: true if the password is correct
+        """
+
+        kdf:dict = self.header['kdf']
+
+        try:
+            wrapping_key:bytes = self.__deriveKey(password, bytes.fromhex(kdf['salt']), kdf)
+            self.master_key    = self.__decrypt(wrapping_key, bytes.fromhex(self.header['master_key']), KEYSTORE_MAGIC)
+        except ValueError:
+            self.master_key = None
+            return False
+
+        return True
+
+    def __associatedData(self, entry:dict) -> bytes:
+        """
+        The extra details that are protected along with each seed.
+
+        @params:
+            - entry: the index entry for this seed
+
+        @return: bytes
+        """
+
+        return json.dumps([entry['wallet'], entry['address']]).encode('utf-8')
+
+    def __decrypt(self, key:bytes, blob:bytes, associated_data:bytes) -> bytes:
+        """
+        Decrypt and verify an AES-GCM blob (nonce + tag + ciphertext).
+
+        @params:
+            - key: the 32 byte key
+            - blob: the encrypted value
+            - associated_data: the extra details that were protected with it
+
+        @return: the decrypted bytes. ValueError is raised if the key is wrong or the data has been changed.
+        """
+
+        cipher = AES.new(key, AES.MODE_GCM, nonce = blob[0:12])
+        cipher.update(associated_data)
+
+        return cipher.decrypt_and_verify(blob[28:], blob[12:28])
+
+    def __deriveKey(self, password:str, salt:bytes, settings:dict) -> bytes:
+        """
+        Turn the password into a key. This is deliberately slow, and is only done once per file.
+
+        @params:
+            - password: the keystore password
+            - salt: the random salt saved in the header
+            - settings: the scrypt cost settings
+
+        @return: a 32 byte key
+        """
+
+        return hashlib.scrypt(password.encode('utf-8'), salt = salt, n = settings['n'], r = settings['r'], p = settings['p'], dklen = 32)
+
+    def __encrypt(self, key:bytes, value:bytes, associated_data:bytes) -> bytes:
+        """
+        Encrypt a value with AES-GCM.
+
+        @params:
+            - key: the 32 byte key
+            - value: the bytes to encrypt
+            - associated_data: extra details that can't be changed without failing decryption
+
+        @return: nonce + tag + ciphertext
+        """
+
+        nonce:bytes = os.urandom(12)
+        cipher      = AES.new(key, AES.MODE_GCM, nonce = nonce)
+        cipher.update(associated_data)
+
+        ciphertext, tag = cipher.encrypt_and_digest(value)
+
+        return nonce + tag + ciphertext
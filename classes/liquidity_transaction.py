@@ -4,9 +4,7 @@
 from __future__ import annotations
 
 from hashlib import sha256
-import sqlite3
 from sqlite3 import Cursor, Connection
-import time
 from terra_classic_sdk.core.osmosis import Pool
 
 from classes.common import (
@@ -15,9 +13,7 @@ from classes.common import (
 )
 
 from constants.constants import (
-    BUSY_RETRY_COUNT,
     CHAIN_DATA,
-    DB_FILE_NAME,
     FULL_COIN_LOOKUP,
     OSMOSIS_FEE_MULTIPLIER,
     OSMOSIS_LIQUIDITIY_SPREAD,
@@ -27,10 +23,13 @@ from constants.constants import (
     USER_ACTION_QUIT
 )
 
+from classes.retry_policy import get_retry_policy, print_busy_lcd
+from classes.schema import schema_manager
 from classes.terra_instance import TerraInstance    
 from classes.transaction_core import TransactionCore, TransactionResult
 from classes.wallet import UserWallet
 
+from terra_classic_sdk.client.lcd import LCDClient
 from terra_classic_sdk.client.lcd.api.tx import (
     CreateTxOptions,
     Tx
@@ -126,19 +125,23 @@ class LiquidityTransaction(TransactionCore):
 
         return share_out_amount
 
-    def create(self, seed:str, denom:str = 'uluna') -> LiquidityTransaction:
+    def create(self, seed:str, denom:str = 'uluna', terra:LCDClient = None) -> LiquidityTransaction:
         """
         Create a liquidity object and set it up with the provided details.
 
         @params:
             - seed: the wallet seed so we can create the wallet
             - denom: what denomination are we sending? It will usually be LUNC
+            - terra: an existing LCD client for this chain, like the one on the wallet
 
         @return: self
         """
 
-        # Create the terra instance
-        self.terra = TerraInstance().create(denom)
+        # Use the provided terra instance, or get the shared one for this chain
+        if terra is None:
+            terra = TerraInstance().create(denom)
+
+        self.terra = terra
 
         # Create the wallet based on the calculated key
         prefix              = CHAIN_DATA[denom]['bech32_prefix']
@@ -287,7 +290,7 @@ class LiquidityTransaction(TransactionCore):
 
         prices:dict = {}
         for asset_denom in assets:
-            prices[asset_denom] = (assets[asset_denom] / (10 ** get_precision(asset_denom))) * self.wallet.getCoinPrice([asset_denom])[asset_denom]
+            prices[asset_denom] = (assets[asset_denom] / (10 ** get_precision(asset_denom))) * self.wallet.getCoinPrice([asset_denom]).get(asset_denom, 0)
 
         return prices
     
@@ -308,18 +311,12 @@ class LiquidityTransaction(TransactionCore):
             pool = self.cached_pools[pool_id]
         else:
             # Get the pool details from the network
-            retry_count: int = 0
-
-            while retry_count < BUSY_RETRY_COUNT:
-                try:
-                    pool:Pool = self.terra.pool.osmosis_pool(pool_id)
-                    # Cache this so we don't have to check again
-                    self.cached_pools[pool_id] = pool
-                    break
-                except Exception as err:
-                    retry_count += 1
-                    print (err)
-                    print (f'    The LCD is busy - trying again {retry_count}/{BUSY_RETRY_COUNT}')            
+            try:
+                pool:Pool = get_retry_policy('lcd').call(lambda: self.terra.pool.osmosis_pool(pool_id), on_retry = print_busy_lcd)
+                # Cache this so we don't have to check again
+                self.cached_pools[pool_id] = pool
+            except Exception as err:
+                print (err)
 
         return pool
 
@@ -373,7 +370,7 @@ class LiquidityTransaction(TransactionCore):
         label_widths.append(len('Your balance'))
 
         # Create a liquidity object
-        liquidity_tx = LiquidityTransaction().create(wallet.seed, wallet.denom)
+        liquidity_tx = LiquidityTransaction().create(wallet.seed, wallet.denom, wallet.terra)
 
         # Now store the basic details
         liquidity_tx.balances     = wallet.balances
@@ -657,7 +654,7 @@ class LiquidityTransaction(TransactionCore):
         all_pools:str = "SELECT pool_id, token_readable_denom FROM asset WHERE pool_id IN (SELECT pool_id FROM asset WHERE token_readable_denom = ?);"
         
         # Open the database and make the query
-        conn:Connection = sqlite3.connect(DB_FILE_NAME)
+        conn:Connection = schema_manager.connect()
         cursor:Cursor   = conn.execute(all_pools, [liquidity_asset_denom])
         rows:list       = cursor.fetchall()
 
@@ -701,7 +698,7 @@ class LiquidityTransaction(TransactionCore):
 
                         asset_amount:float = int(pool_asset.token.amount) / (10 ** get_precision(readable_denom))
 
-                        price:float   = prices[readable_denom]
+                        price:float   = prices.get(readable_denom, 0)
                         pool_balance += (price * asset_amount)
 
                     if valid_pool == True:
@@ -770,7 +767,7 @@ def join_liquidity_pool(wallet:UserWallet, pool_id:int, amount_in:int, silent_mo
 
     transaction_result:TransactionResult = TransactionResult()
 
-    liquidity_tx = LiquidityTransaction().create(wallet.seed, wallet.denom)
+    liquidity_tx = LiquidityTransaction().create(wallet.seed, wallet.denom, wallet.terra)
     liquidity_tx.amount_in      = amount_in
     liquidity_tx.balances       = wallet.balances
     liquidity_tx.pool_id        = pool_id
@@ -862,7 +859,7 @@ def exit_liquidity_pool(wallet:UserWallet, pool_id:int, amount_out:float, silent
 
     transaction_result:TransactionResult = TransactionResult()
 
-    liquidity_tx = LiquidityTransaction().create(wallet.seed, wallet.denom)
+    liquidity_tx = LiquidityTransaction().create(wallet.seed, wallet.denom, wallet.terra)
 
     # Populate it with required details:
     liquidity_tx.amount_out     = amount_out
@@ -893,19 +890,15 @@ def exit_liquidity_pool(wallet:UserWallet, pool_id:int, amount_out:float, silent
             
         if liquidity_result == True:
             
-            transaction_result:TransactionResult = liquidity_tx.broadcast()
+            def is_accepted(transaction_result:TransactionResult) -> bool:
+                # The same signed transaction is sent again if the LCD rate limited it
+                return not (liquidity_tx.broadcast_result is not None and transaction_result.broadcast_result is not None and transaction_result.broadcast_result.raw_log == 'Status 429 - Too Many Requests')
 
-            if liquidity_tx.broadcast_result is not None and transaction_result.broadcast_result is not None and transaction_result.broadcast_result.raw_log == 'Status 429 - Too Many Requests':
-                retry_count = 0
-                while True:
-                    retry_count += 1
-                    
-                    if retry_count <= BUSY_RETRY_COUNT:
-                        if silent_mode == False:
-                            print (f'    {transaction_result.broadcast_result.raw_log}, attempt {retry_count}/{BUSY_RETRY_COUNT}')
-                        time.sleep(1)
-                    else:
-                        break
+            def print_throttled(attempt:int, transaction_result:TransactionResult):
+                if silent_mode == False:
+                    print (f"    {transaction_result.broadcast_result.raw_log}, attempt {attempt}/{get_retry_policy('lcd').max_attempts}")
+
+            transaction_result:TransactionResult = get_retry_policy('lcd').until(liquidity_tx.broadcast, is_accepted, on_retry = print_throttled)
                     
             #     while True:
             #         print (' 🛎️  Boosting sequence number and trying again...')
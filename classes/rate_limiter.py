@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+import threading
+import time
+
+from urllib.parse import urlparse
+
+from constants.constants import (
+    HOST_RATE_LIMITS,
+    LCD_RATE_BURST,
+    LCD_RATE_LIMIT
+)
+
+class TokenBucket:
+    """
+    A token bucket for a single host.
+
+    Tokens refill at 'rate' per second up to 'burst'. Every request takes one token,
+    and if there are none left then the caller waits until one is due.
+    Tokens are allowed to go negative, so waiting callers are queued in order rather than all waking up together.
+    """
+
+    def __init__(self, rate:float, burst:int):
+        self.burst:int           = burst
+        self.lock:threading.Lock = threading.Lock()
+        self.rate:float          = rate
+        self.requests:int        = 0
+        self.tokens:float        = burst
+        self.updated:float       = time.monotonic()
+        self.waited:float        = 0
+
+    def acquire(self) -> float:
+        """
+        Take a token, waiting if required.
+
+        @params:
+            - None
+
+        @return: how many seconds we waited
+        """
+
+        with self.lock:
+            now:float    = time.monotonic()
+            self.tokens  = min(self.burst, self.tokens + ((now - self.updated) * self.rate))
+            self.updated = now
+
+            self.tokens   -= 1
+            self.requests += 1
+
+            wait:float = 0
+            if self.tokens < 0:
+                wait = -self.tokens / self.rate
+
+            self.waited += wait
+
+        if wait > 0:
+            time.sleep(wait)
+
+        return wait
+
+    def pause(self, seconds:float) -> bool:
+        """
+        The host has told us to slow down, so empty the bucket and hold off for this many seconds.
+
+        @params:
+            - seconds: how long the host wants us to wait
+
+        @return: True
+        """
+
+        with self.lock:
+            self.tokens = min(self.tokens, 0) - (seconds * self.rate)
+
+        return True
+
+class RateLimiter:
+    """
+    Paces outgoing requests to each host so we stay under their limits,
+    instead of finding out afterwards with a 429 response.
+    """
+
+    def __init__(self):
+        self.buckets:dict        = {}
+        self.lock:threading.Lock = threading.Lock()
+
+    def acquire(self, url:str) -> float:
+        """
+        Wait until we are allowed to send a request to the host in this URL.
+
+        @params:
+            - url: the full URL we are about to request
+
+        @return: how many seconds we waited
+        """
+
+        return self.bucket(urlparse(url).netloc).acquire()
+
+    def bucket(self, host:str) -> TokenBucket:
+        """
+        Get the token bucket for this host, creating it the first time it is asked for.
+        Hosts in HOST_RATE_LIMITS use their own budget, and everything else (the LCDs) uses LCD_RATE_LIMIT.
+
+        @params:
+            - host: the host name, like api.coingecko.com
+
+        @return: a TokenBucket
+        """
+
+        with self.lock:
+            if host not in self.buckets:
+                if host in HOST_RATE_LIMITS:
+                    rate, burst = HOST_RATE_LIMITS[host]
+                else:
+                    rate, burst = LCD_RATE_LIMIT, LCD_RATE_BURST
+
+                self.buckets[host] = TokenBucket(rate, burst)
+
+            return self.buckets[host]
+
+    def throttled(self, url:str, retry_after:str = None) -> bool:
+        """
+        Record that this host has rate limited us, and hold off before the next request.
+
+        @params:
+            - url: the URL that returned a 429 response
+            - retry_after: the Retry-After header value, if there was one
+
+        @return: True
+        """
+
+        bucket:TokenBucket = self.bucket(urlparse(url).netloc)
+
+        try:
+            seconds:float = float(retry_after)
+        except (TypeError, ValueError):
+            # No usable header, so wait as long as it takes to refill one token
+            seconds:float = 1 / bucket.rate
+
+        return bucket.pause(seconds)
+
+    def stats(self) -> dict:
+        """
+        Report how many requests went to each host, and how long we spent waiting.
+
+        @params:
+            - None
+
+        @return: a dict of hosts with request and wait details
+        """
+
+        with self.lock:
+            return {host: {'requests': bucket.requests, 'waited': round(bucket.waited, 3)} for host, bucket in self.buckets.items()}
+
+# The shared rate limiter - import this rather than creating a new RateLimiter
+rate_limiter:RateLimiter = RateLimiter()
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from collections import OrderedDict
+from sqlite3 import Connection
+
+from constants.constants import (
+    DB_FILE_NAME,
+    LCD_CACHE_DISK,
+    LCD_CACHE_SIZE,
+    LCD_CACHE_TTLS
+)
+
+from classes.schema import schema_manager
+
+class ResponseCache:
+    """
+    A two-tier cache for slow-changing LCD responses.
+
+    The first tier is an in-memory LRU list. The second tier is a table in osmosis.db,
+    so the next run of a script can start with what the last one already fetched.
+    How long each response is kept for is set by the endpoint patterns in LCD_CACHE_TTLS.
+    """
+
+    def __init__(self):
+        self.conn:Connection     = None
+        self.disk_checked:bool   = False
+        self.entries:OrderedDict = OrderedDict()
+        self.lock:threading.Lock = threading.Lock()
+        self.patterns:list       = [(re.compile(pattern), settings[0], settings[1]) for pattern, settings in LCD_CACHE_TTLS.items()]
+
+        # Statistics
+        self.disk_hits:int       = 0
+        self.hits:int            = 0
+        self.misses:int          = 0
+
+    def invalidate(self, prefix:str) -> bool:
+        """
+        Remove every cached entry whose key starts with this prefix, in memory and on disk.
+
+        @params:
+            - prefix: the start of the keys to remove, like 'lcd|columbus-5|'
+
+        @return: True
+        """
+
+        with self.lock:
+            for key in [key for key in self.entries if key.startswith(prefix)]:
+                del self.entries[key]
+
+            conn:Connection = self.__disk()
+            if conn is not None:
+                conn.execute("DELETE FROM lcd_cache WHERE cache_key LIKE ? ESCAPE '\\';", [self.__likePrefix(prefix)])
+                conn.commit()
+
+        return True
+
+    def lookup(self, key:str):
+        """
+        Get a cached value if it is still fresh.
+
+        @params:
+            - key: the cache key
+
+        @return: the cached value, or None if there isn't one
+        """
+
+        now:float = time.time()
+
+        with self.lock:
+            if key in self.entries:
+                expires, value = self.entries[key]
+                if expires > now:
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+
+                del self.entries[key]
+
+            conn:Connection = self.__disk()
+            if conn is not None:
+                row = conn.execute("SELECT expires, response FROM lcd_cache WHERE cache_key = ?;", [key]).fetchone()
+                if row is not None and row[0] > now:
+                    value = json.loads(row[1])
+                    self.__remember(key, row[0], value)
+                    self.disk_hits += 1
+                    return value
+
+            self.misses += 1
+
+        return None
+
+    def queryKey(self, chain_id:str, endpoint:str, params_key:tuple) -> str:
+        """
+        Create the cache key for an LCD query.
+
+        @params:
+            - chain_id: the chain this query is for
+            - endpoint: the LCD path
+            - params_key: the normalised query parameters
+
+        @return: a string key
+        """
+
+        return f"lcd|{chain_id}|{endpoint.lstrip('/')}|{json.dumps(params_key)}"
+
+    def settingsFor(self, endpoint:str) -> list:
+        """
+        Find the cache settings for this LCD endpoint.
+
+        @params:
+            - endpoint: the LCD path
+
+        @return: [ttl, persist] or None if this endpoint should not be cached
+        """
+
+        endpoint = endpoint.lstrip('/')
+
+        for pattern, ttl, persist in self.patterns:
+            if pattern.match(endpoint):
+                return [ttl, persist]
+
+        return None
+
+    def stats(self) -> dict:
+        """
+        Report how well the cache is working.
+
+        @params:
+            - None
+
+        @return: a dict of hit and miss counts
+        """
+
+        with self.lock:
+            return {
+                'disk_hits': self.disk_hits,
+                'entries':   len(self.entries),
+                'hits':      self.hits,
+                'misses':    self.misses
+            }
+
+    def store(self, key:str, value, ttl:float, persist:bool = False) -> bool:
+        """
+        Add a value to the cache.
+
+        @params:
+            - key: the cache key
+            - value: a JSON-compatible value
+            - ttl: how many seconds this value is fresh for
+            - persist: should this also be saved on disk for future runs?
+
+        @return: True
+        """
+
+        expires:float = time.time() + ttl
+
+        with self.lock:
+            self.__remember(key, expires, value)
+
+            if persist == True:
+                conn:Connection = self.__disk()
+                if conn is not None:
+                    conn.execute("INSERT OR REPLACE INTO lcd_cache (cache_key, expires, response) VALUES (?, ?, ?);", [key, expires, json.dumps(value)])
+                    conn.commit()
+
+        return True
+
+    def __disk(self) -> Connection:
+        """
+        Open the disk tier the first time it is needed, and clear out anything that has expired.
+        The lock must already be held by the caller.
+
+        @params:
+            - None
+
+        @return: the database connection, or None if the disk tier is not available
+        """
+
+        if self.disk_checked == False:
+            self.disk_checked = True
+
+            # Only use the disk tier if the Osmosis database has already been created
+            if LCD_CACHE_DISK == True and os.path.exists(DB_FILE_NAME):
+                try:
+                    conn:Connection = schema_manager.connect(check_same_thread = False)
+                    conn.execute("DELETE FROM lcd_cache WHERE expires < ?;", [time.time()])
+                    conn.commit()
+                    self.conn = conn
+                except sqlite3.Error as err:
+                    print (' 🛎️  The LCD cache table could not be opened, only the in-memory cache will be used.')
+                    print (err)
+
+        return self.conn
+
+    def __likePrefix(self, prefix:str) -> str:
+        """
+        Escape a prefix so it can be used in a LIKE query.
+
+        @params:
+            - prefix: the start of the keys we want to match
+
+        @return: a LIKE pattern
+        """
+
+        return prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+
+    def __remember(self, key:str, expires:float, value) -> bool:
+        """
+        Put this value in the memory tier, dropping the least recently used entry if it is full.
+        The lock must already be held by the caller.
+
+        @params:
+            - key: the cache key
+            - expires: when this value stops being fresh
+            - value: the value to store
+
+        @return: True
+        """
+
+        self.entries[key] = (expires, value)
+        self.entries.move_to_end(key)
+
+        while len(self.entries) > LCD_CACHE_SIZE:
+            self.entries.popitem(last = False)
+
+        return True
+
+# The shared cache - import this rather than creating a new ResponseCache
+response_cache:ResponseCache = ResponseCache()
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+import random
+import threading
+import time
+
+from constants.constants import (
+    RETRY_POLICIES
+)
+
+from classes.tracer import tracer
+
+from terra_classic_sdk.exceptions import LCDResponseError
+
+class RetryError(Exception):
+    """
+    Raised when a retry policy runs out of attempts or time.
+    The last error is available in the 'error' attribute.
+    """
+
+    def __init__(self, policy_name:str, error:Exception):
+        super().__init__(f'{policy_name} gave up: {error}')
+        self.error:Exception = error
+
+def is_retryable(error:Exception) -> bool:
+    """
+    Decide if this error is worth trying again.
+    Network problems, rate limits, and server errors are temporary.
+    Other LCD errors (a bad address, a missing account) will fail the same way every time.
+
+    @params:
+        - error: the exception that was raised
+
+    @return: true/false
+    """
+
+    if isinstance(error, LCDResponseError):
+        status:int = getattr(error.response, 'status', None)
+        return status is None or status == 429 or status >= 500
+
+    if isinstance(error, RetryError):
+        return False
+
+    # Connection errors, timeouts, broken JSON, and anything else unexpected
+    return True
+
+class RetryPolicy:
+    """
+    Exponential backoff with jitter, a maximum number of attempts, and an overall deadline.
+    Each named policy keeps track of how often it retried and how long it spent waiting.
+    """
+
+    def __init__(self, name:str, max_attempts:int, first_delay:float, max_delay:float, deadline:float):
+        self.deadline:float      = deadline
+        self.first_delay:float   = first_delay
+        self.lock:threading.Lock = threading.Lock()
+        self.max_attempts:int    = max_attempts
+        self.max_delay:float     = max_delay
+        self.name:str            = name
+
+        # Statistics
+        self.attempts_made:int   = 0
+        self.calls:int           = 0
+        self.exhausted:int       = 0
+        self.waited:float        = 0
+
+    def attempts(self):
+        """
+        A generator that yields the attempt number, waiting between each one.
+        Stop iterating (break) once the operation succeeds.
+
+        @params:
+            - None
+
+        @return: the attempt number, starting at 1
+        """
+
+        start:float = time.monotonic()
+
+        with self.lock:
+            self.calls += 1
+
+        attempt:int = 1
+        try:
+            while True:
+                with self.lock:
+                    self.attempts_made += 1
+
+                # LCD calls made during this attempt are marked as retries in the timing report
+                tracer.setAttempt(attempt)
+
+                yield attempt
+
+                if attempt >= self.max_attempts:
+                    break
+
+                delay:float = self.delay(attempt)
+                if (time.monotonic() - start) + delay > self.deadline:
+                    break
+
+                time.sleep(delay)
+
+                with self.lock:
+                    self.waited += delay
+
+                attempt += 1
+
+            with self.lock:
+                self.exhausted += 1
+        finally:
+            tracer.setAttempt(1)
+
+    def call(self, function, on_retry = None, retryable = is_retryable):
+        """
+        Call the function until it succeeds, or we run out of attempts.
+
+        @params:
+            - function: a function with no arguments
+            - on_retry: an optional function(attempt, error) that is called before each retry
+            - retryable: a function(error) that decides if this error is worth trying again
+
+        @return: whatever the function returns. RetryError is raised if every attempt failed.
+        """
+
+        last_error:Exception = None
+
+        for attempt in self.attempts():
+            try:
+                return function()
+            except Exception as err:
+                if not retryable(err):
+                    raise err
+
+                last_error = err
+                if on_retry is not None and attempt < self.max_attempts:
+                    on_retry(attempt, err)
+
+        raise RetryError(self.name, last_error)
+
+    def delay(self, attempt:int) -> float:
+        """
+        How long to wait after this attempt.
+        The delay doubles each time up to max_delay, and half of it is randomised so callers don't retry in lockstep.
+
+        @params:
+            - attempt: the attempt that just failed, starting at 1
+
+        @return: the number of seconds to wait
+        """
+
+        delay:float = min(self.max_delay, self.first_delay * (2 ** (attempt - 1)))
+
+        return (delay / 2) + random.uniform(0, delay / 2)
+
+    def stats(self) -> dict:
+        """
+        Report how this policy has been used.
+
+        @params:
+            - None
+
+        @return: a dict of call, attempt, and waiting details
+        """
+
+        with self.lock:
+            return {
+                'attempts':  self.attempts_made,
+                'calls':     self.calls,
+                'exhausted': self.exhausted,
+                'waited':    round(self.waited, 3)
+            }
+
+    def until(self, function, is_done, on_retry = None):
+        """
+        Keep calling the function until is_done(result) is true, or we run out of attempts.
+        This is for polling, like waiting for a balance to change.
+
+        @params:
+            - function: a function with no arguments
+            - is_done: a function(result) that returns true when we can stop
+            - on_retry: an optional function(attempt, result) that is called before each retry
+
+        @return: the last result, which may not be 'done' if we ran out of attempts
+        """
+
+        result = None
+
+        for attempt in self.attempts():
+            result = function()
+
+            if is_done(result):
+                break
+
+            if on_retry is not None and attempt < self.max_attempts:
+                on_retry(attempt, result)
+
+        return result
+
+# The named policies, configured in RETRY_POLICIES
+retry_policies:dict = {name: RetryPolicy(name, *settings) for name, settings in RETRY_POLICIES.items()}
+
+def get_retry_policy(name:str) -> RetryPolicy:
+    """
+    Get one of the shared named retry policies.
+
+    @params:
+        - name: the policy name, from RETRY_POLICIES
+
+    @return: a RetryPolicy
+    """
+
+    return retry_policies[name]
+
+def print_retry_stats() -> bool:
+    """
+    Print how much time each retry policy spent waiting.
+
+    @params:
+        - None
+
+    @return: True
+    """
+
+    print ('\n 🔁 Retry statistics:')
+    used:bool = False
+    for name in retry_policies:
+        stats:dict = retry_policies[name].stats()
+        if stats['calls'] > 0:
+            used = True
+            print (f"    {name}: {stats['calls']} operations, {stats['attempts']} attempts, {stats['waited']}s waiting, {stats['exhausted']} gave up")
+
+    if used == False:
+        print ('    No retry policies were used')
+
+    return True
+
+def print_busy_lcd(attempt:int, error:Exception) -> bool:
+    """
+    The standard message when an LCD request is being retried.
+
+    @params:
+        - attempt: the attempt that just failed
+        - error: the error it failed with
+
+    @return: True
+    """
+
+    print (f'    {error}')
+    print (f"    The LCD is busy - trying again {attempt}/{get_retry_policy('lcd').max_attempts}")
+
+    return True
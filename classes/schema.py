@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+import sqlite3
+import threading
+
+from sqlite3 import Connection
+
+from constants.constants import (
+    DB_FILE_NAME
+)
+
+def create_tables(conn:Connection) -> bool:
+    """
+    Migration 1: the tables that were created by get_osmosis_pools.py and check_database before there were migrations.
+    Existing databases will already have most of these.
+
+    @params:
+        - conn: an open connection, inside a transaction
+
+    @return: True
+    """
+
+    conn.execute("CREATE TABLE IF NOT EXISTS pool (ID INTEGER PRIMARY KEY AUTOINCREMENT, date_added DATETIME DEFAULT CURRENT_TIMESTAMP, pool_id INTEGER NOT NULL, pool_type TEXT NOT NULL, pool_address TEXT NOT NULL, pool_swap_fee FLOAT NOT NULL, pool_exit_fee FLOAT NOT NULL, pool_future_pool_governor STRING NOT NULL, total_shares_amount STRING NOT NULL, pool_total_weight INTEGER NOT NULL);")
+    conn.execute("CREATE TABLE IF NOT EXISTS asset (ID INTEGER PRIMARY KEY AUTOINCREMENT, date_added DATETIME DEFAULT CURRENT_TIMESTAMP, pool_id INTEGER NOT NULL, token_denom TEXT NOT NULL, token_readable_denom TEXT NOT NULL, token_amount STRING NOT NULL, weight INTEGER NOT NULL);")
+    conn.execute("CREATE TABLE IF NOT EXISTS ibc_denoms (ID INTEGER PRIMARY KEY AUTOINCREMENT, date_added DATETIME DEFAULT CURRENT_TIMESTAMP, ibc_denom TEXT NOT NULL, readable_denom TEXT NOT NULL);")
+    conn.execute("CREATE TABLE IF NOT EXISTS osmosis_summary (ID INTEGER PRIMARY KEY AUTOINCREMENT, last_scan_date DATETIME);")
+    conn.execute("CREATE TABLE IF NOT EXISTS trades (ID INTEGER PRIMARY KEY AUTOINCREMENT, date_added DATETIME DEFAULT CURRENT_TIMESTAMP, wallet_name TEXT NOT NULL, coin_from TEXT NOT NULL, amount_from INTEGER NOT NULL, price_from REAL NOT NULL, coin_to TEXT NOT NULL, amount_to INTEGER NOT NULL, price_to REAL NOT NULL, fees TEXT NOT NULL, exit_profit REAL NOT NULL, exit_loss REAL NOT NULL, linked_trade_id INTEGER, tx_hash TEXT NOT NULL, status TEXT NOT NULL);")
+
+    return True
+
+def add_trade_hash(conn:Connection) -> bool:
+    """
+    Migration 2: older trades tables were created without the tx_hash column, so logging a trade would fail.
+
+    @params:
+        - conn: an open connection, inside a transaction
+
+    @return: True
+    """
+
+    columns:list = [row[1] for row in conn.execute("PRAGMA table_info(trades);")]
+    if 'tx_hash' not in columns:
+        conn.execute("ALTER TABLE trades ADD COLUMN tx_hash TEXT NOT NULL DEFAULT '';")
+
+    return True
+
+def fix_column_types(conn:Connection) -> bool:
+    """
+    Migration 3: 'STRING' isn't a SQLite type, and 'FLOAT' only works by accident.
+    The pool and asset tables are rebuilt with the types they actually behave as.
+    Amounts stay NUMERIC because the swap code compares them as numbers.
+    The unused 'assets' table is also removed.
+
+    @params:
+        - conn: an open connection, inside a transaction
+
+    @return: True
+    """
+
+    conn.execute("CREATE TABLE pool_new (ID INTEGER PRIMARY KEY AUTOINCREMENT, date_added DATETIME DEFAULT CURRENT_TIMESTAMP, pool_id INTEGER NOT NULL, pool_type TEXT NOT NULL, pool_address TEXT NOT NULL, pool_swap_fee REAL NOT NULL, pool_exit_fee REAL NOT NULL, pool_future_pool_governor TEXT NOT NULL, total_shares_amount NUMERIC NOT NULL, pool_total_weight INTEGER NOT NULL);")
+    conn.execute("INSERT INTO pool_new SELECT * FROM pool;")
+    conn.execute("DROP TABLE pool;")
+    conn.execute("ALTER TABLE pool_new RENAME TO pool;")
+
+    conn.execute("CREATE TABLE asset_new (ID INTEGER PRIMARY KEY AUTOINCREMENT, date_added DATETIME DEFAULT CURRENT_TIMESTAMP, pool_id INTEGER NOT NULL, token_denom TEXT NOT NULL, token_readable_denom TEXT NOT NULL, token_amount NUMERIC NOT NULL, weight INTEGER NOT NULL);")
+    conn.execute("INSERT INTO asset_new SELECT * FROM asset;")
+    conn.execute("DROP TABLE asset;")
+    conn.execute("ALTER TABLE asset_new RENAME TO asset;")
+
+    conn.execute("DROP TABLE IF EXISTS assets;")
+
+    return True
+
+def add_indexes(conn:Connection) -> bool:
+    """
+    Migration 4: indexes for the lookups that every swap, liquidity check, and denom trace makes.
+
+    @params:
+        - conn: an open connection, inside a transaction
+
+    @return: True
+    """
+
+    conn.execute("CREATE INDEX IF NOT EXISTS asset_pool_id ON asset (pool_id);")
+    conn.execute("CREATE INDEX IF NOT EXISTS asset_readable_denom ON asset (token_readable_denom, pool_id);")
+    conn.execute("CREATE INDEX IF NOT EXISTS ibc_denoms_ibc_denom ON ibc_denoms (ibc_denom);")
+    conn.execute("CREATE INDEX IF NOT EXISTS pool_pool_id ON pool (pool_id);")
+    conn.execute("CREATE INDEX IF NOT EXISTS trades_status ON trades (status);")
+
+    return True
+
+def add_cache_tables(conn:Connection) -> bool:
+    """
+    Migration 5: the LCD response cache and the validated address cache.
+
+    @params:
+        - conn: an open connection, inside a transaction
+
+    @return: True
+    """
+
+    conn.execute("CREATE TABLE IF NOT EXISTS lcd_cache (cache_key TEXT PRIMARY KEY, expires REAL NOT NULL, response TEXT NOT NULL);")
+    conn.execute("CREATE INDEX IF NOT EXISTS lcd_cache_expires ON lcd_cache (expires);")
+    conn.execute("CREATE TABLE IF NOT EXISTS address_cache (fingerprint TEXT PRIMARY KEY, address_mac TEXT NOT NULL);")
+    conn.execute("CREATE TABLE IF NOT EXISTS address_cache_settings (name TEXT PRIMARY KEY, value TEXT NOT NULL);")
+
+    return True
+
+def add_balance_snapshots(conn:Connection) -> bool:
+    """
+    Migration 6: the balance snapshot history used by balances.py and snapshots.py.
+    Amounts are saved as text so large token amounts and fractional rewards are kept exactly.
+
+    @params:
+        - conn: an open connection, inside a transaction
+
+    @return: True
+    """
+
+    conn.execute("CREATE TABLE IF NOT EXISTS balance_snapshots (ID INTEGER PRIMARY KEY AUTOINCREMENT, date_added DATETIME DEFAULT CURRENT_TIMESTAMP, wallet_name TEXT NOT NULL, wallet_address TEXT NOT NULL, chain_id TEXT NOT NULL, block_height INTEGER NOT NULL, account_sequence INTEGER);")
+    conn.execute("CREATE INDEX IF NOT EXISTS balance_snapshots_address ON balance_snapshots (wallet_address, chain_id, block_height);")
+    conn.execute("CREATE INDEX IF NOT EXISTS balance_snapshots_name ON balance_snapshots (wallet_name, block_height);")
+    conn.execute("CREATE TABLE IF NOT EXISTS balance_snapshot_amounts (snapshot_id INTEGER NOT NULL, denom TEXT NOT NULL, available TEXT NOT NULL, delegated TEXT NOT NULL, rewards TEXT NOT NULL, PRIMARY KEY (snapshot_id, denom));")
+    conn.execute("CREATE TABLE IF NOT EXISTS balance_snapshot_delegations (snapshot_id INTEGER NOT NULL, validator_address TEXT NOT NULL, validator_name TEXT NOT NULL, commission REAL NOT NULL, balance_denom TEXT NOT NULL, balance_amount TEXT NOT NULL, rewards TEXT NOT NULL, PRIMARY KEY (snapshot_id, validator_address));")
+
+    return True
+
+# Every schema change, in order. The position in this list is the schema version.
+# Never change a migration once it has been released - add a new one to the end instead.
+MIGRATIONS:list = [
+    create_tables,
+    add_trade_hash,
+    fix_column_types,
+    add_indexes,
+    add_cache_tables,
+    add_balance_snapshots
+]
+
+class SchemaManager:
+    """
+    Opens connections to osmosis.db with consistent settings, and keeps the tables up to date.
+
+    The schema_version table records which migrations have been applied. The first connection
+    in each run applies any that are missing, and later connections skip straight to the settings.
+    If a migration fails, then connect() raises an error and the next connection tries again.
+    """
+
+    def __init__(self):
+        self.lock:threading.Lock = threading.Lock()
+        self.migrated:bool       = False
+
+    def connect(self, check_same_thread:bool = True) -> Connection:
+        """
+        Open a connection to osmosis.db, creating it and bringing it up to date if required.
+
+        @params:
+            - check_same_thread: set this to False if the connection will be shared between threads (with your own lock)
+
+        @return: a sqlite3 Connection. sqlite3.OperationalError is raised if the database couldn't be brought up to date.
+        """
+
+        conn:Connection = sqlite3.connect(DB_FILE_NAME, check_same_thread = check_same_thread, timeout = 10)
+
+        # These only apply to this connection. WAL is saved in the database file when it is migrated.
+        conn.execute("PRAGMA synchronous = NORMAL;")
+        conn.execute("PRAGMA cache_size = -8000;")
+        conn.execute("PRAGMA temp_store = MEMORY;")
+
+        if self.migrated == False:
+            with self.lock:
+                if self.migrated == False:
+                    version:int = self.migrate(conn)
+
+                    # If a migration failed then the next connection will try again
+                    if version < len(MIGRATIONS):
+                        conn.close()
+                        raise sqlite3.OperationalError(f'the database is at version {version}, but version {len(MIGRATIONS)} is needed')
+
+                    self.migrated = True
+
+        return conn
+
+    def currentVersion(self, conn:Connection) -> int:
+        """
+        Get the schema version of this database.
+
+        @params:
+            - conn: an open connection
+
+        @return: the number of migrations that have been applied
+        """
+
+        conn.execute("CREATE TABLE IF NOT EXISTS schema_version (version INTEGER PRIMARY KEY, description TEXT NOT NULL, date_applied DATETIME DEFAULT CURRENT_TIMESTAMP);")
+
+        row = conn.execute("SELECT MAX(version) FROM schema_version;").fetchone()
+
+        return row[0] if row[0] is not None else 0
+
+    def migrate(self, conn:Connection) -> int:
+        """
+        Apply every migration that this database doesn't have yet.
+        Each migration runs in its own transaction, so a failure leaves the database at the last good version.
+
+        @params:
+            - conn: an open connection
+
+        @return: the new schema version
+        """
+
+        version:int = self.currentVersion(conn)
+        conn.commit()
+
+        if version < len(MIGRATIONS):
+            # WAL lets the caches write while other connections are reading
+            conn.execute("PRAGMA journal_mode = WAL;")
+
+        for migration_version in range(version + 1, len(MIGRATIONS) + 1):
+            migration = MIGRATIONS[migration_version - 1]
+
+            try:
+                conn.execute("BEGIN;")
+                migration(conn)
+                conn.execute("INSERT INTO schema_version (version, description) VALUES (?, ?);", [migration_version, migration.__name__])
+                conn.commit()
+            except sqlite3.Error as err:
+                conn.rollback()
+                print (f' 🛑 The database could not be updated to version {migration_version} ({migration.__name__}):')
+                print (err)
+                break
+
+            version = migration_version
+
+        return version
+
+# The shared schema manager - use schema_manager.connect() rather than sqlite3.connect(DB_FILE_NAME)
+schema_manager:SchemaManager = SchemaManager()
@@ -4,7 +4,6 @@
 from __future__ import annotations
 
 import math
-import time
 
 from classes.common import (
     get_user_choice
@@ -15,17 +14,18 @@ from constants.constants import (
     FULL_COIN_LOOKUP,
     GRDX,
     NON_ULUNA_COINS,
-    SEARCH_RETRY_COUNT,
     TERRASWAP_GRDX_TO_LUNC_ADDRESS,
     ULUNA,
     UOSMO,
     UUSD
 )
 
+from classes.retry_policy import get_retry_policy
 from classes.terra_instance import TerraInstance
 from classes.transaction_core import TransactionCore, TransactionResult
 from classes.wallet import UserWallet
 
+from terra_classic_sdk.client.lcd import LCDClient
 from terra_classic_sdk.client.lcd.api.tx import (
     CreateTxOptions,
     Tx
@@ -64,19 +64,23 @@ class SendTransaction(TransactionCore):
         self.source_channel:str    = None
         self.tax:float             = None
 
-    def create(self, seed:str, denom:str = 'uluna') -> SendTransaction:
+    def create(self, seed:str, denom:str = 'uluna', terra:LCDClient = None) -> SendTransaction:
         """
         Create a send object and set it up with the provided details.
         
         @params:
             - seed: the wallet seed so we can create the wallet
             - denom: what denomination are we sending? It will usually be LUNC
+            - terra: an existing LCD client for this chain, like the one on the wallet
 
         @return: self
         """
 
-        # Create the terra instance
-        self.terra = TerraInstance().create(denom)
+        # Use the provided terra instance, or get the shared one for this chain
+        if terra is None:
+            terra = TerraInstance().create(denom)
+
+        self.terra = terra
 
         # Create the wallet based on the calculated key
         prefix              = CHAIN_DATA[denom]['bech32_prefix']
@@ -459,7 +463,7 @@ def send_transaction(wallet:UserWallet, recipient_address:str, send_coin:Coin, m
 
     transaction_result:TransactionResult = TransactionResult()
 
-    send_tx = SendTransaction().create(wallet.seed, wallet.denom)
+    send_tx = SendTransaction().create(wallet.seed, wallet.denom, wallet.terra)
         
     # Populate it with required details:
     send_tx.balances          = wallet.balances
@@ -554,26 +558,22 @@ def send_transaction(wallet:UserWallet, recipient_address:str, send_coin:Coin, m
             else:
                 # Check that the recipient wallet has been updated
                 # To keep things simple, we'll only check for increased balances
-                retry_count:int = 0
                 if silent_mode == False:
                     print (f'\n 🔎︎ Checking that the recipient has this transaction...')
-                while True:
+
+                def get_new_balance() -> int:
                     recipient_wallet.getBalances()
                     new_balance:int = 0
                     if send_tx.denom in recipient_wallet.balances:
                         new_balance = int(recipient_wallet.balances[send_tx.denom])
 
-                    if new_balance > old_balance:
-                        break
-                    
-                    retry_count += 1
+                    return new_balance
 
-                    if retry_count <= SEARCH_RETRY_COUNT:
-                        if silent_mode == False:
-                            print (f'    Search attempt {retry_count}/{SEARCH_RETRY_COUNT}')
-                        time.sleep(1)
-                    else:
-                        break
+                def print_search_attempt(attempt:int, new_balance:int):
+                    if silent_mode == False:
+                        print (f"    Search attempt {attempt}/{get_retry_policy('tx_search').max_attempts}")
+
+                get_retry_policy('tx_search').until(get_new_balance, lambda new_balance: new_balance > old_balance, on_retry = print_search_attempt)
 
 
         else:
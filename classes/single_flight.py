@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+import threading
+
+class InFlightCall:
+    """
+    A request that is currently being made, which other callers can wait on.
+    """
+
+    def __init__(self):
+        self.error:Exception          = None
+        self.finished:threading.Event = threading.Event()
+        self.result                   = None
+        self.waiters:int              = 0
+
+class SingleFlight:
+    """
+    Merges identical requests that are running at the same time into a single call.
+
+    The first caller makes the request, and everyone else asking for the same key
+    while it is still running gets the same result (or the same error).
+    Nothing is kept once the call finishes - this is not a cache.
+    """
+
+    def __init__(self):
+        self.calls:dict          = {}
+        self.coalesced:int       = 0
+        self.lock:threading.Lock = threading.Lock()
+        self.requests:int        = 0
+
+    def do(self, key:tuple, function):
+        """
+        Run the function, unless an identical call is already running, in which case wait for that result.
+
+        @params:
+            - key: a hashable tuple identifying this request
+            - function: a function with no arguments that makes the actual request
+
+        @return: whatever the function returns
+        """
+
+        with self.lock:
+            self.requests += 1
+
+            if key in self.calls:
+                call:InFlightCall = self.calls[key]
+                call.waiters     += 1
+                self.coalesced   += 1
+                is_leader:bool    = False
+            else:
+                call:InFlightCall = InFlightCall()
+                self.calls[key]   = call
+                is_leader:bool    = True
+
+        if is_leader == False:
+            call.finished.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = function()
+        except Exception as err:
+            call.error = err
+            raise err
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call.finished.set()
+
+        return call.result
+
+    def stats(self) -> dict:
+        """
+        Report how many requests were merged into another identical request.
+
+        @params:
+            - None
+
+        @return: a dict with the request and coalesced counts
+        """
+
+        with self.lock:
+            return {'coalesced': self.coalesced, 'requests': self.requests}
+
+# The shared coalescing layer - import this rather than creating a new SingleFlight
+single_flight:SingleFlight = SingleFlight()
@@ -6,13 +6,11 @@ from __future__ import annotations
 import base64
 import json
 import math
-import sqlite3
 
 from sqlite3 import Cursor, Connection
 
 from constants.constants import (
     CHAIN_DATA,
-    DB_FILE_NAME,
     FULL_COIN_LOOKUP,
     GAS_ADJUSTMENT_OSMOSIS,
     GAS_ADJUSTMENT_SWAPS,
@@ -47,9 +45,11 @@ from classes.common import (
     multiply_raw_balance
 )
 
+from classes.schema import schema_manager
 from classes.terra_instance import TerraInstance    
 from classes.transaction_core import TransactionCore, TransactionResult
 
+from terra_classic_sdk.client.lcd import LCDClient
 from terra_classic_sdk.client.lcd.api.tx import CreateTxOptions, Tx
 from terra_classic_sdk.core.coin import Coin
 from terra_classic_sdk.core.coins import Coins
@@ -158,19 +158,24 @@ class SwapTransaction(TransactionCore):
 
         return self.belief_price
     
-    def create(self, seed:str, denom:str = 'uluna') -> SwapTransaction:
+    def create(self, seed:str, denom:str = 'uluna', terra:LCDClient = None) -> SwapTransaction:
         """
         Create a swap object and set it up with the provided details.
         
         @params:
             - seed: the wallet seed so we can create the wallet
             - denom: what denomination are we swapping from?
+            - terra: an existing LCD client for this chain, like the one on the wallet
 
         @return: self
         """
 
-        # Create the terra instance
-        self.terra = TerraInstance().create(denom)
+        # Use the provided terra instance, or get the shared one for swaps
+        # The gas adjustment needs to be higher for swaps it turns out
+        if terra is None:
+            terra = TerraInstance().create(denom, gas_adjustment = GAS_ADJUSTMENT_SWAPS)
+
+        self.terra = terra
 
         # Create the wallet based on the calculated key
         prefix              = CHAIN_DATA[denom]['bech32_prefix']
@@ -209,9 +214,6 @@ class SwapTransaction(TransactionCore):
         if self.getSequenceNumber() == False:
             return False
 
-        # Bump up the gas adjustment - it needs to be higher for swaps it turns out
-        self.terra.gas_adjustment = float(GAS_ADJUSTMENT_SWAPS)
-
         #Perform the swap as a simulation, with no fee details
         self.marketSwap()
         
@@ -300,7 +302,7 @@ class SwapTransaction(TransactionCore):
         path_query:str      = "SELECT pool.pool_id, token_denom, token_readable_denom, pool_swap_fee FROM pool INNER JOIN asset ON pool.pool_id=asset.pool_id WHERE pool.pool_id IN (SELECT pool_id FROM asset WHERE token_readable_denom = ?) AND token_readable_denom=? ORDER BY pool_swap_fee ASC;"
         liquidity_query:str = "SELECT token_readable_denom, token_amount FROM asset WHERE pool_id = ?;"
 
-        conn:Connection = sqlite3.connect(DB_FILE_NAME)
+        conn:Connection = schema_manager.connect()
         cursor:Cursor   = conn.execute(path_query, [denom_in, denom_out])
         rows:list       = cursor.fetchall()
 
@@ -386,7 +388,7 @@ class SwapTransaction(TransactionCore):
             tx_hash:str     = transaction_result.broadcast_result.txhash
 
             if coin_from not in NON_ULUNA_COINS.values():
-                price_from:float = float(wallet.getCoinPrice([coin_from])[coin_from])
+                price_from:float = float(wallet.getCoinPrice([coin_from]).get(coin_from, 0))
             else:
                 price_from:float = 0
                 
@@ -394,7 +396,7 @@ class SwapTransaction(TransactionCore):
 
             # Some coins won't return a price because they're not on coingecko:
             if coin_to not in NON_ULUNA_COINS.values():
-                price_to:float = float(wallet.getCoinPrice([coin_to])[coin_to])
+                price_to:float = float(wallet.getCoinPrice([coin_to]).get(coin_to, 0))
             else:
                 price_to:float = 0
 
@@ -435,7 +437,7 @@ class SwapTransaction(TransactionCore):
                 exit_profit:float = log_trade_params['exit_profit']
                 exit_loss:float   = -abs(float(log_trade_params['exit_loss']))
 
-                conn   = sqlite3.connect(DB_FILE_NAME)
+                conn   = schema_manager.connect()
                 cursor = conn.cursor()
                 cursor.execute(insert_trade_query, [wallet_name, coin_from, amount_from, price_from, coin_to, amount_to, price_to, json.dumps(fees), exit_profit, exit_loss, tx_hash])
                 
@@ -1179,9 +1181,6 @@ def swap_coins(wallet, swap_coin:Coin, swap_to_denom:str, estimated_amount:int =
     swap_tx.swap_request_denom = swap_to_denom
     swap_tx.wallet_denom       = wallet.denom
 
-    # Bump up the gas adjustment - it needs to be higher for swaps it turns out
-    swap_tx.terra.gas_adjustment = float(GAS_ADJUSTMENT_SWAPS)
-
     # Set the contract based on what we've picked
     # As long as the swap_denom and swap_request_denom values are set, the correct contract should be picked
     use_market_swap:bool  = swap_tx.setContract()
@@ -7,8 +7,314 @@ from constants.constants import (
     UOSMO
 )
 
+import asyncio
+import atexit
+import functools
+import nest_asyncio
+import requests
+import threading
+import time
+
+from classes.connection_pool import connection_pool
+from classes.endpoint_selector import endpoint_selector
+from classes.response_cache import response_cache
+from classes.single_flight import single_flight
+from classes.tracer import tracer
+
+from multidict import CIMultiDict
+from requests import Response
+
 from terra_classic_sdk.client.lcd import LCDClient
+from terra_classic_sdk.exceptions import LCDResponseError
+from terra_classic_sdk.util.json import dict_to_data
+from terra_classic_sdk.util.url import urljoin
+
+from urllib3.exceptions import NewConnectionError
+
+# Each worker thread gets its own event loop, since a loop can only be run by one thread at a time
+thread_loops:threading.local = threading.local()
+worker_loops:list            = []
+
+@atexit.register
+def close_worker_loops():
+    """
+    Close the worker thread event loops cleanly when the script finishes.
     
+    @params:
+        - None
+
+    @return: None
+    """
+
+    for loop in worker_loops:
+        if not loop.is_closed():
+            loop.close()
+
+# The LCD modules that are included in the timing report
+TRACED_MODULES = ['auth', 'bank', 'distribution', 'gov', 'ibc', 'ibc_transfer', 'market', 'oracle', 'pool', 'staking', 'tendermint', 'treasury', 'tx', 'wasm']
+
+# Transactions are broadcast to this endpoint
+BROADCAST_ENDPOINT = 'cosmos/tx/v1beta1/txs'
+
+# These status codes mean the node is overloaded or behind a failing gateway, so another node should be tried
+FAILOVER_STATUS_CODES = [429, 502, 503, 504]
+
+class PooledLCDClient(LCDClient):
+    """
+    An LCD client that sends every request through the shared connection pool.
+
+    The standard synchronous LCDClient creates and tears down a brand new session
+    for every single request, so nothing is ever reused between calls.
+
+    Each request goes to the healthiest LCD endpoint for this chain, and moves on
+    to the next one if that endpoint can't be reached or is too busy.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        # Time every call made through the LCD modules (bank.balance, staking.validator, etc)
+        for module_name in TRACED_MODULES:
+            module = getattr(self, module_name, None)
+            if module is not None:
+                module._run_sync = functools.partial(tracer.lcdCall, module_name, module._run_sync)
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """
+        The synchronous API calls run their requests on this loop.
+        The main thread uses the loop this client was created with, and other threads get their own,
+        so wallets can be loaded from a thread pool.
+
+        @params:
+            - None
+
+        @return: an event loop belonging to the current thread
+        """
+
+        if threading.current_thread() is threading.main_thread():
+            return self.main_loop
+
+        if not hasattr(thread_loops, 'loop'):
+            thread_loops.loop = asyncio.new_event_loop()
+            nest_asyncio.apply(thread_loops.loop)
+            worker_loops.append(thread_loops.loop)
+
+        return thread_loops.loop
+
+    @loop.setter
+    def loop(self, loop:asyncio.AbstractEventLoop):
+        """
+        The LCDClient constructor sets the loop, which we keep for the main thread.
+
+        @params:
+            - loop: the event loop to use on the main thread
+
+        @return: None
+        """
+
+        self.main_loop = loop
+
+    async def _get(self, endpoint:str, params = None) -> dict:
+        """
+        Make a GET request against the LCD.
+
+        @params:
+            - endpoint: the LCD path, like /cosmos/bank/v1beta1/balances/terra123abc
+            - params: APIParams, a multidict, a list of tuples, or a dict
+
+        @return: the JSON result as a dict
+        """
+
+        if params and hasattr(params, 'to_dict') and callable(getattr(params, 'to_dict')):
+            params = params.to_dict()
+
+        key:tuple = (self.chain_id, endpoint, self.__paramsKey(params))
+
+        # Slow-changing responses (validators, pools) might already be cached
+        cache_settings:list = response_cache.settingsFor(endpoint)
+        if cache_settings is not None:
+            cache_key:str = response_cache.queryKey(*key)
+            result:dict   = response_cache.lookup(cache_key)
+            if result is not None:
+                return result
+
+        # Identical queries that are already running (the same validator for many wallets, for example) share one request
+        result:dict = single_flight.do(key, lambda: self.__parseResponse(self.__send('GET', endpoint, params = params), is_post = False))
+
+        if cache_settings is not None:
+            response_cache.store(cache_key, result, *cache_settings)
+
+        return result
+
+    async def _post(self, endpoint:str, data:dict = None) -> dict:
+        """
+        Make a POST request against the LCD.
+
+        @params:
+            - endpoint: the LCD path, like /cosmos/tx/v1beta1/txs
+            - data: the body of this request
+
+        @return: the JSON result as a dict
+        """
+
+        try:
+            response:Response = self.__send('POST', endpoint, json = data and dict_to_data(data))
+        finally:
+            if endpoint.lstrip('/') == BROADCAST_ENDPOINT:
+                # Our own transaction changes balances, pools, and validators, so don't trust anything we've cached
+                response_cache.invalidate(f'lcd|{self.chain_id}|')
+
+        return self.__parseResponse(response, is_post = True)
+
+    async def _search(self, events:list, params = None) -> dict:
+        """
+        Search for transactions matching the provided events.
+
+        @params:
+            - events: a list of (event, value) pairs
+            - params: any extra query parameters
+
+        @return: the JSON result as a dict
+        """
+
+        actual_params:CIMultiDict = CIMultiDict()
+
+        for event in events:
+            if event[0] == 'tx.height':
+                actual_params.add('events', f'{event[0]}={event[1]}')
+            else:
+                actual_params.add('events', f"{event[0]}='{event[1]}'")
+
+        if params:
+            for param in params:
+                actual_params.add(param, params[param])
+
+        return await self._get('/cosmos/tx/v1beta1/txs', actual_params)
+
+    def __neverConnected(self, err:Exception) -> bool:
+        """
+        Check if this error happened before the connection was made, so the node can't have seen the request.
+
+        @params:
+            - err: the exception raised by requests
+
+        @return: true/false
+        """
+
+        if isinstance(err, requests.exceptions.ConnectTimeout):
+            return True
+
+        if isinstance(err, requests.exceptions.ConnectionError) and len(err.args) > 0:
+            # requests wraps the urllib3 error in a MaxRetryError, which keeps the original as the reason
+            return isinstance(getattr(err.args[0], 'reason', None), NewConnectionError)
+
+        return False
+
+    def __send(self, method:str, endpoint:str, **kwargs) -> Response:
+        """
+        Send this request to the healthiest endpoint, failing over to the others if required.
+
+        GET requests are sent somewhere else if the connection fails, or if the node is overloaded
+        or behind a failing gateway. Any other error response is returned as it is, because the
+        LCD also uses these for problems with the request itself (like a failed smart query).
+
+        POST requests are only sent somewhere else if the connection was never made,
+        so a transaction that might have been received is never broadcast twice.
+
+        @params:
+            - method: GET or POST
+            - endpoint: the LCD path
+            - kwargs: any extra arguments for requests (params, json)
+
+        @return: a requests Response object
+        """
+
+        last_error:Exception   = None
+        last_response:Response  = None
+
+        for url in endpoint_selector.rankedUrls(self.chain_id, self.url):
+            start:float = time.monotonic()
+
+            try:
+                response:Response = connection_pool.request(method, urljoin(url, endpoint), self.chain_id, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as err:
+                endpoint_selector.recordFailure(self.chain_id, url)
+                if method == 'POST' and self.__neverConnected(err) == False:
+                    raise err
+                last_error = err
+                continue
+
+            if response.status_code in FAILOVER_STATUS_CODES:
+                endpoint_selector.recordFailure(self.chain_id, url)
+                if method == 'POST':
+                    # The gateway might have already passed this on to the node
+                    return response
+                last_response = response
+                continue
+
+            endpoint_selector.recordSuccess(self.chain_id, url, time.monotonic() - start)
+
+            return response
+
+        if last_response is not None:
+            return last_response
+
+        raise last_error
+
+    def __paramsKey(self, params) -> tuple:
+        """
+        Turn the query parameters into something we can use as part of a dictionary key.
+
+        @params:
+            - params: a dict, multidict, or list of tuples
+
+        @return: a sorted tuple of (key, value) string pairs
+        """
+
+        if not params:
+            return ()
+
+        if hasattr(params, 'items'):
+            pairs = params.items()
+        else:
+            pairs = params
+
+        return tuple(sorted((str(key), str(value)) for key, value in pairs))
+
+    def __parseResponse(self, response:Response, is_post:bool) -> dict:
+        """
+        Convert the response into a result, raising the same errors that the standard LCDClient does.
+
+        @params:
+            - response: the requests Response object
+            - is_post: POST errors only include the message value
+
+        @return: the JSON result as a dict
+        """
+
+        # LCDResponseError expects an aiohttp-style status attribute
+        response.status = response.status_code
+
+        try:
+            result:dict = response.json()
+        except ValueError:
+            raise LCDResponseError(message = str(response.reason), response = response)
+
+        if not 200 <= response.status_code < 299:
+            if is_post == True:
+                raise LCDResponseError(message = result.get('message'), response = response)
+            else:
+                raise LCDResponseError(message = str(result), response = response)
+
+        self.last_request_height = result.get('height') if result else self.last_request_height
+
+        return result
+
+# One shared LCD client for each (chain id, URL, gas adjustment, gas prices)
+lcd_clients:dict                = {}
+lcd_clients_lock:threading.Lock = threading.Lock()
+
 class TerraInstance:
     def __init__(self):
         self.chain_id:str   = None
@@ -16,15 +322,23 @@ class TerraInstance:
         self.terra          = None
         self.url:str        = None
         
-    def create(self, denom:str = 'uluna') -> LCDClient:
+    def create(self, denom:str = 'uluna', gas_adjustment:float = None) -> LCDClient:
         """
-        Create an LCD client instance and store it in this object.
+        Get the LCD client for this chain and store it in this object.
+        All LCD clients share the same pool of connections, and the same endpoint health scores.
+
+        Clients are shared between everything that asks for the same chain and gas settings,
+        so don't change the settings on the client you get back - ask for different gas settings instead.
         
         @params:
             - denom: the denomination we expect to be using. This will help identify the chain details.
+            - gas_adjustment: an optional gas adjustment, instead of the standard GAS_ADJUSTMENT value
             
         @return: LCDCLient
         """
+
+        if gas_adjustment is not None:
+            self.gas_adjustment = float(gas_adjustment)
         
         if denom in CHAIN_DATA:
             if 'chain_id' in CHAIN_DATA[denom]:
@@ -37,16 +351,21 @@ class TerraInstance:
                     
             if 'lcd_urls' in CHAIN_DATA[denom]:
                 self.url = CHAIN_DATA[denom]['lcd_urls'][0]
+                endpoint_selector.register(self.chain_id, CHAIN_DATA[denom]['lcd_urls'])
             
             if self.chain_id is not None and self.url is not None:
-                terra:LCDClient = LCDClient(
-                    chain_id       = self.chain_id,
-                    gas_adjustment = float(self.gas_adjustment),
-                    url            = self.url,
-                    gas_prices     = gas_prices
-                )
-
-                self.terra = terra
+                client_key:tuple = (self.chain_id, self.url, float(self.gas_adjustment), gas_prices)
+
+                with lcd_clients_lock:
+                    if client_key not in lcd_clients:
+                        lcd_clients[client_key] = PooledLCDClient(
+                            chain_id       = self.chain_id,
+                            gas_adjustment = float(self.gas_adjustment),
+                            url            = self.url,
+                            gas_prices     = gas_prices
+                        )
+
+                    self.terra = lcd_clients[client_key]
         
         return self.terra
 
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+import atexit
+import json
+import re
+import threading
+import time
+
+from argparse import ArgumentParser, Namespace
+from urllib.parse import urlsplit
+
+# Path segments that look like addresses, hashes, or IDs are grouped together in the summary
+VARIABLE_SEGMENT = re.compile(r'^([0-9]+|[A-Za-z0-9]{20,}|ibc)$')
+
+class Tracer:
+    """
+    Records how long every LCD module call and raw HTTP request takes.
+
+    LCD calls are recorded as 'lcd' spans (like bank.balance), and every HTTP request
+    underneath them is recorded as an 'http' span. Nothing is recorded unless tracing has been enabled.
+    """
+
+    def __init__(self):
+        self.enabled:bool            = False
+        self.local:threading.local   = threading.local()
+        self.lock:threading.Lock     = threading.Lock()
+        self.spans:list              = []
+        self.started:float           = time.monotonic()
+        self.trace_file:str          = None
+
+    def enable(self, trace_file:str = None) -> bool:
+        """
+        Start recording, and print the report when the script finishes.
+
+        @params:
+            - trace_file: an optional file name to write every span to as JSON
+
+        @return: True
+        """
+
+        if self.enabled == False:
+            self.enabled    = True
+            self.started    = time.monotonic()
+            self.trace_file = trace_file
+
+            atexit.register(self.report)
+
+        return True
+
+    def lcdCall(self, module:str, run_sync, coroutine):
+        """
+        Run an LCD module coroutine and record how long it took.
+        The HTTP requests it makes are counted against it.
+
+        @params:
+            - module: the module name, like bank or staking
+            - run_sync: the original _run_sync function for this module
+            - coroutine: the coroutine to run
+
+        @return: whatever the coroutine returns
+        """
+
+        if self.enabled == False:
+            return run_sync(coroutine)
+
+        name:str = f'{module}.{coroutine.cr_code.co_name}'
+        span:dict = {
+            'attempt':  getattr(self.local, 'attempt', 1),
+            'bytes':    0,
+            'error':    None,
+            'kind':     'lcd',
+            'name':     name,
+            'requests': 0,
+            'start':    round(time.monotonic() - self.started, 4),
+            'thread':   threading.current_thread().name
+        }
+
+        previous:dict     = getattr(self.local, 'span', None)
+        self.local.span   = span
+        start:float       = time.perf_counter()
+
+        try:
+            return run_sync(coroutine)
+        except Exception as err:
+            span['error'] = type(err).__name__
+            raise err
+        finally:
+            span['duration'] = time.perf_counter() - start
+            self.local.span  = previous
+            self.record(span)
+
+    def httpRequest(self, method:str, url:str, send) -> object:
+        """
+        Send a raw HTTP request and record how long it took, and how big it was.
+
+        @params:
+            - method: GET or POST
+            - url: the full URL
+            - send: a function with no arguments that sends the request and returns the response
+
+        @return: the requests Response object
+        """
+
+        if self.enabled == False:
+            return send()
+
+        parts = urlsplit(url)
+        span:dict = {
+            'bytes':    0,
+            'endpoint': parts.path,
+            'error':    None,
+            'host':     parts.netloc,
+            'kind':     'http',
+            'method':   method,
+            'name':     f'{method} {parts.netloc}{self.pathTemplate(parts.path)}',
+            'parent':   None,
+            'start':    round(time.monotonic() - self.started, 4),
+            'status':   None,
+            'thread':   threading.current_thread().name
+        }
+
+        parent:dict = getattr(self.local, 'span', None)
+        if parent is not None:
+            span['parent']      = parent['name']
+            parent['requests'] += 1
+
+        start:float = time.perf_counter()
+
+        try:
+            response = send()
+            span['status'] = response.status_code
+            span['bytes']  = len(response.content)
+
+            if parent is not None:
+                parent['bytes'] += span['bytes']
+
+            return response
+        except Exception as err:
+            span['error'] = type(err).__name__
+            raise err
+        finally:
+            span['duration'] = time.perf_counter() - start
+            self.record(span)
+
+    def pathTemplate(self, path:str) -> str:
+        """
+        Replace the variable parts of a path (addresses, hashes, IDs) so similar requests are grouped.
+
+        @params:
+            - path: the URL path
+
+        @return: the path with variable segments replaced by {id}
+        """
+
+        return '/'.join('{id}' if VARIABLE_SEGMENT.match(segment) else segment for segment in path.split('/'))
+
+    def record(self, span:dict) -> bool:
+        """
+        Keep this span for the report.
+
+        @params:
+            - span: the details of a single call
+
+        @return: True
+        """
+
+        span['duration'] = round(span['duration'], 4)
+
+        with self.lock:
+            self.spans.append(span)
+
+        return True
+
+    def report(self) -> bool:
+        """
+        Print the timing summary, and write the JSON trace file if one was asked for.
+
+        @params:
+            - None
+
+        @return: True
+        """
+
+        # These are imported here so the tracer doesn't depend on the network classes
+        from classes.connection_pool import connection_pool
+        from classes.response_cache import response_cache
+        from classes.retry_policy import print_retry_stats
+        from classes.single_flight import single_flight
+
+        with self.lock:
+            spans:list = list(self.spans)
+
+        total_time:float = time.monotonic() - self.started
+
+        for kind, label in [('lcd', 'LCD calls'), ('http', 'HTTP requests')]:
+            groups:dict = {}
+            for span in spans:
+                if span['kind'] == kind:
+                    if span['name'] not in groups:
+                        groups[span['name']] = []
+                    groups[span['name']].append(span)
+
+            if len(groups) == 0:
+                continue
+
+            name_width:int = max(len(name) for name in groups)
+            header:str     = f"    {'Call'.ljust(name_width)}  {'Count':>6}  {'Total (s)':>9}  {'Avg (ms)':>9}  {'Max (ms)':>9}  {'KB':>8}  {'Retries':>7}  {'Errors':>6}"
+
+            print (f'\n ⏱️  {label}:\n')
+            print (header)
+            print ('    ' + '-' * (len(header) - 4))
+
+            for name in sorted(groups, key = lambda name: sum(span['duration'] for span in groups[name]), reverse = True):
+                durations:list = [span['duration'] for span in groups[name]]
+                kb:float       = sum(span['bytes'] for span in groups[name]) / 1024
+                errors:int     = len([span for span in groups[name] if span['error'] is not None or (span.get('status') or 0) >= 400])
+
+                if kind == 'lcd':
+                    # Extra attempts from a retry policy, and failover requests to other endpoints
+                    retries:str = str(sum(max(span['attempt'] - 1, 0) + max(span['requests'] - 1, 0) for span in groups[name]))
+                else:
+                    retries:str = '-'
+
+                print (f"    {name.ljust(name_width)}  {len(durations):>6}  {sum(durations):>9.2f}  {(sum(durations) / len(durations)) * 1000:>9.1f}  {max(durations) * 1000:>9.1f}  {kb:>8.1f}  {retries:>7}  {errors:>6}")
+
+        print (f'\n    Total running time: {total_time:.2f}s')
+
+        cache_stats:dict         = response_cache.stats()
+        single_flight_stats:dict = single_flight.stats()
+
+        print (f"\n 🗄  LCD cache: {cache_stats['hits']} memory hits, {cache_stats['disk_hits']} disk hits, {cache_stats['misses']} misses")
+        print (f"    {single_flight_stats['coalesced']} of {single_flight_stats['requests']} LCD queries were merged with an identical request")
+
+        connection_pool.printStats()
+        print_retry_stats()
+
+        if self.trace_file is not None:
+            try:
+                with open(self.trace_file, 'w') as file:
+                    json.dump({'spans': spans, 'total_time': round(total_time, 4)}, file, indent = 4)
+                print (f'\n 🗄  The timing trace has been saved to {self.trace_file}')
+            except OSError as err:
+                print (f'\n 🛑 The timing trace could not be saved to {self.trace_file}:', err)
+
+        return True
+
+    def setAttempt(self, attempt:int) -> bool:
+        """
+        Let the tracer know which retry attempt the current thread is on.
+
+        @params:
+            - attempt: the attempt number, starting at 1
+
+        @return: True
+        """
+
+        self.local.attempt = attempt
+
+        return True
+
+# The shared tracer - import this rather than creating a new Tracer
+tracer:Tracer = Tracer()
+
+def add_timing_arguments(parser:ArgumentParser) -> ArgumentParser:
+    """
+    Add the --timings and --profile-imports options to a script's argument parser.
+    The import profiler is started by classes.import_profiler itself, because it has to be running before anything else is imported.
+
+    @params:
+        - parser: the script's ArgumentParser
+
+    @return: the same parser
+    """
+
+    parser.add_argument('--timings', nargs = '?', const = True, default = False, metavar = 'TRACE_FILE', help = 'print how long every LCD and HTTP request took, and optionally save the full trace as JSON')
+    parser.add_argument('--profile-imports', action = 'store_true', help = 'print how long each module took to import')
+
+    return parser
+
+def start_timings(args:Namespace) -> bool:
+    """
+    Turn on tracing if the --timings option was used.
+
+    @params:
+        - args: the parsed arguments
+
+    @return: true if tracing is enabled
+    """
+
+    if args.timings == False:
+        return False
+
+    trace_file:str = args.timings if isinstance(args.timings, str) else None
+
+    return tracer.enable(trace_file)
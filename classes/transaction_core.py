@@ -4,8 +4,6 @@
 from __future__ import annotations
 
 import json
-import requests
-import sqlite3
 import time
 
 from hashlib import sha256
@@ -15,21 +13,21 @@ from classes.common import (
     divide_raw_balance,
     get_precision
 )
+from classes.connection_pool import connection_pool
+from classes.retry_policy import get_retry_policy, print_busy_lcd
+from classes.schema import schema_manager
 
 from constants.constants import (
     BASE_SMART_CONTRACT_ADDRESS,
-    BUSY_RETRY_COUNT,
     CANDY_SMART_CONTRACT_ADDRESS,
     CHAIN_DATA,
     COIN_ALIASES,
     CREMAT_SMART_CONTRACT_ADDRESS,
-    DB_FILE_NAME,
     FULL_COIN_LOOKUP,
     #GAS_PRICE_URI,
     GRDX_SMART_CONTRACT_ADDRESS,
     LENNY_SMART_CONTRACT_ADDRESS,
     NON_ULUNA_COINS,
-    SEARCH_RETRY_COUNT,
     UBASE,
     ULUNA,
     UUSD
@@ -107,28 +105,16 @@ class TransactionCore():
                 # Send this back for a retry with a higher gas adjustment value
                 return transaction_result
             else:
-                # Put in a loop for busy LCDs here:
-
-                retry_count: int = 0
-                found: bool      = False
-                # Find the transaction on the network and return the result
-                while retry_count < BUSY_RETRY_COUNT:
-                    try:
-                        transaction_result:TransactionResult = self.findTransaction()
-
-                        if transaction_result.transaction_confirmed == True:
-                            transaction_result.message = 'This transaction should be visible in your wallet now.'
-                        else:
-                            transaction_result.message = 'The transaction did not appear. Future transactions might fail due to a lack of expected funds.'
-                            
-                        found = True
-                        break
-                    except Exception as err:
-                        retry_count += 1
-                        print (f'    {err}')
-                        print (f'    The LCD is busy - trying again {retry_count}/{BUSY_RETRY_COUNT}')
-                         
-                if found == False:
+                # Find the transaction on the network and return the result, retrying if the LCD is busy
+                try:
+                    transaction_result:TransactionResult = get_retry_policy('lcd').call(self.findTransaction, on_retry = print_busy_lcd)
+
+                    if transaction_result.transaction_confirmed == True:
+                        transaction_result.message = 'This transaction should be visible in your wallet now.'
+                    else:
+                        transaction_result.message = 'The transaction did not appear. Future transactions might fail due to a lack of expected funds.'
+                except Exception as err:
+                    print (f'    {err}')
                     transaction_result = TransactionResult()
                     transaction_result.message = 'An unexpected error occurred when broadcasting.'
                  
@@ -144,39 +130,25 @@ class TransactionCore():
         @return: True
         """
 
-        retry_count:int  = 0
-        retry:bool       = True
-        
         if self.prices is None:
-            while retry == True:
-                try:
-                    # Get all the prices we are interested in and cache them so we don't get rate limited by Coingecko
-                    id_str:str = ''
-                    for denom in CHAIN_DATA:
-                        id_str += CHAIN_DATA[denom]['coingecko_id'] + ','
-
-                    uri:str     = 'https://api.coingecko.com/api/v3/simple/price'
-                    params:dict = {  
-                        'ids': id_str,
-                        'vs_currencies': 'USD'
-                    }
+            # Get all the prices we are interested in and cache them so we don't get rate limited by Coingecko
+            id_str:str = ''
+            for denom in CHAIN_DATA:
+                id_str += CHAIN_DATA[denom]['coingecko_id'] + ','
 
-                    self.prices = requests.get(uri, params = params).json()
+            uri:str     = 'https://api.coingecko.com/api/v3/simple/price'
+            params:dict = {  
+                'ids': id_str,
+                'vs_currencies': 'USD'
+            }
 
-                    # Exit this loop
-                    retry = False
-                    break
-
-                except Exception as err:
-                    retry_count += 1
-                    if retry_count == 10:
-                        print (' 🛑 Error getting coin prices')
-                        print (err)
-
-                        retry = False
-                        exit()
-                    else:
-                        time.sleep(1)
+            try:
+                self.prices = get_retry_policy('prices').call(lambda: connection_pool.get(uri, params = params).json())
+            except Exception as err:
+                # Swaps can't be estimated without prices, so we can't continue
+                print (' 🛑 Error getting coin prices')
+                print (err)
+                exit()
 
         return True
             
@@ -271,44 +243,30 @@ class TransactionCore():
             insert_ibc_denom = "INSERT INTO ibc_denoms (ibc_denom, readable_denom) VALUES (?, ?);"
 
             # Get the database results
-            conn:Connection = sqlite3.connect(DB_FILE_NAME)
+            conn:Connection = schema_manager.connect()
             cursor:Cursor   = conn.execute(get_ibc_query, [uri])
             row:list        = cursor.fetchone()
 
             if row is None:
                 # Go and get this denom trace:
 
-                retry_count:int = 0
-                retry:bool      = True
-
-                while retry == True:
-                    try:
-                        trace_result:json = requests.get(uri).json()
-                    
-                        if 'denom_trace' in trace_result:
-                            # Return this result
-                            result = trace_result['denom_trace']['base_denom']
-                            
-                            # Add this IBC value and readable version into the database:
-                            cursor:Cursor = conn.execute(insert_ibc_denom, [uri, result])
-                            conn.commit()
+                try:
+                    trace_result:json = get_retry_policy('http').call(lambda: connection_pool.get(uri).json())
+                
+                    if 'denom_trace' in trace_result:
+                        # Return this result
+                        result = trace_result['denom_trace']['base_denom']
+                        
+                        # Add this IBC value and readable version into the database:
+                        cursor:Cursor = conn.execute(insert_ibc_denom, [uri, result])
+                        conn.commit()
 
-                            # Store this result for future requests
-                            self.cached_traces[uri] = result
-                            
-                            break
-                        else:
-                            break
-                    except Exception as err:
-                        retry_count += 1
-                        if retry_count == 10:
-                            print (f'Denom trace error for {uri}:')
-                            print (err)
-                            retry  = False
-                            result = ''
-                            break
-                        else:
-                            time.sleep(1)
+                        # Store this result for future requests
+                        self.cached_traces[uri] = result
+                except Exception as err:
+                    print (f'Denom trace error for {uri}:')
+                    print (err)
+                    result = ''
             else:
                 # This IBC entry is in the database
                 result = row[0]
@@ -332,7 +290,6 @@ class TransactionCore():
         @return: a TransactionResult object
         """
 
-        retry_count:int                      = 0
         transaction_result:TransactionResult = TransactionResult()
         
         # Set up the default values:
@@ -344,7 +301,10 @@ class TransactionCore():
         if self.silent_mode == False:
             print (f'\n 🔎︎ Looking for the TX hash...')
 
-        while True:
+        for attempt in get_retry_policy('tx_search').attempts():
+            if attempt > 1 and self.silent_mode == False:
+                print (f"    Search attempt {attempt - 1}/{get_retry_policy('tx_search').max_attempts}")
+
             # We will be the current height - 1 just in case it rolled over just as we started the search
             block_height:int = int(self.terra.tendermint.block_info()['block']['header']['height']) - 1
 
@@ -527,15 +487,6 @@ class TransactionCore():
             else:
                 if self.silent_mode == False:
                     print ('    No result object returned, trying again...')
-                
-            retry_count += 1
-
-            if retry_count <= SEARCH_RETRY_COUNT:
-                if self.silent_mode == False:
-                    print (f'    Search attempt {retry_count}/{SEARCH_RETRY_COUNT}')
-                time.sleep(1)
-            else:
-                break
 
         # Return the completed transaction result
         return transaction_result
@@ -612,18 +563,13 @@ class TransactionCore():
         @return: bool (true if sequence number was set, false if not)
         """
 
-        retry_count: int = 0
-        result: bool  = False
+        result:bool = False
 
-        while retry_count < BUSY_RETRY_COUNT:
-            try:
-                self.sequence = self.current_wallet.sequence()
-                result = True
-                break
-            except Exception as err:
-                retry_count += 1
-                print (f'    {err}')
-                print (f'    The LCD is busy - trying again {retry_count}/{BUSY_RETRY_COUNT}')
+        try:
+            self.sequence = get_retry_policy('lcd').call(self.current_wallet.sequence, on_retry = print_busy_lcd)
+            result = True
+        except Exception as err:
+            print (f'    {err}')
 
         return result
         
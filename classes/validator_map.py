@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+from __future__ import annotations
+
+import threading
+
+from typing import TYPE_CHECKING
+
+# The SDK is only needed for the type hints
+if TYPE_CHECKING:
+    from terra_classic_sdk.client.lcd import LCDClient
+    from terra_classic_sdk.core.staking.data.validator import Validator
+
+class ValidatorMap:
+    """
+    The name and commission of every validator that has been looked up during this run.
+
+    Wallets usually delegate to the same handful of validators, so each validator only
+    needs to be requested once, no matter how many wallets (or threads) ask for it.
+    """
+
+    def __init__(self):
+        self.lock:threading.Lock = threading.Lock()
+        self.validators:dict     = {}
+
+    def get(self, terra:LCDClient, validator_address:str) -> dict:
+        """
+        Get the details we need about a validator, from the LCD if we haven't seen it yet.
+
+        @params:
+            - terra: the LCD client for the chain this validator is on
+            - validator_address: the validator operator address
+
+        @return: a dict with the 'moniker' and 'commission' (as a percentage)
+        """
+
+        key:tuple = (terra.chain_id, validator_address)
+
+        with self.lock:
+            if key in self.validators:
+                return self.validators[key]
+
+        # Identical requests from other threads are merged by the LCD client, so this is done outside the lock
+        validator:Validator = terra.staking.validator(validator_address)
+        details:dict        = {
+            'commission': round(float(validator.commission.commission_rates.rate) * 100, 2),
+            'moniker':    validator.description.moniker
+        }
+
+        with self.lock:
+            self.validators[key] = details
+
+        return details
+
+    def remember(self, terra:LCDClient, validator:Validator) -> bool:
+        """
+        Add a validator that was already loaded somewhere else, like the full validator list.
+
+        @params:
+            - terra: the LCD client for the chain this validator is on
+            - validator: the validator object
+
+        @return: True
+        """
+
+        with self.lock:
+            self.validators[(terra.chain_id, validator.operator_address)] = {
+                'commission': round(float(validator.commission.commission_rates.rate) * 100, 2),
+                'moniker':    validator.description.moniker
+            }
+
+        return True
+
+# The shared validator map - import this rather than creating a new ValidatorMap
+validator_map:ValidatorMap = ValidatorMap()
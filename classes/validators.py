@@ -9,6 +9,7 @@ from constants.constants import (
 
 from classes.wallet import UserWallet
 from classes.terra_instance import TerraInstance
+from classes.validator_map import validator_map
 
 from terra_classic_sdk.client.lcd.params import PaginationOptions
 from terra_classic_sdk.core.staking.data.validator import Validator
@@ -63,6 +64,7 @@ class Validators():
         validator:Validator
         for validator in result:
             self.__iter_result__(validator)
+            validator_map.remember(terra, validator)
 
         while pagination['next_key'] is not None:
 
@@ -72,6 +74,7 @@ class Validators():
             validator:Validator
             for validator in result:
                 self.__iter_result__(validator)
+                validator_map.remember(terra, validator)
 
         # Go through each validator and create an ordered list
         sorted_validators:dict = {}
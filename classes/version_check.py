@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+import atexit
+import json
+import os
+import threading
+
+from constants.constants import (
+    CHECK_FOR_UPDATES,
+    VERSION_CHECK_TTL,
+    VERSION_URI
+)
+
+from classes.connection_pool import connection_pool
+from classes.response_cache import response_cache
+
+# The local version file is kept in the top level of the project
+LOCAL_VERSION_FILE:str = os.path.dirname(os.path.abspath(__file__)) + '/../version.json'
+
+class VersionCheck:
+    """
+    Checks the github repo for a new version without holding up the script.
+
+    The check runs in a background thread, and the latest version number is cached on disk for VERSION_CHECK_TTL seconds,
+    so most runs don't need to ask github at all. If an update is available, the notice is printed when the script finishes.
+    Nothing is printed if we're offline or the check doesn't finish in time.
+    """
+
+    def __init__(self):
+        self.lock:threading.Lock     = threading.Lock()
+        self.notice:str              = None
+        self.thread:threading.Thread = None
+
+    def compare(self, local_version:str, remote_version:str) -> str:
+        """
+        Compare the local and remote version numbers.
+
+        @params:
+            - local_version: the version we are running, like 2.4.0
+            - remote_version: the latest released version
+
+        @return: a message for the user, or None if we have the latest version
+        """
+
+        if local_version == remote_version:
+            return None
+
+        local_bits:list  = [int(bit) for bit in local_version.split('.')]
+        remote_bits:list = [int(bit) for bit in remote_version.split('.')]
+
+        if remote_bits < local_bits:
+            message:str = ' 🛎️  You are running a version ahead of the official release!'
+        elif remote_bits[0] > local_bits[0]:
+            message:str = ' 🛎️  A new major version is available!'
+        elif remote_bits[1] > local_bits[1]:
+            message:str = ' 🛎️  A new minor version is available!'
+        else:
+            message:str = ' 🛎️  An update is available!'
+
+        return message + '\n 🛎️  Please check https://github.com/geoffmunn/utility-scripts for updates.'
+
+    def printNotice(self) -> bool:
+        """
+        Print the update notice if there is one. This is run when the script finishes.
+
+        @params:
+            - None
+
+        @return: True
+        """
+
+        with self.lock:
+            notice:str = self.notice
+
+        if notice is not None:
+            print ('')
+            print (notice)
+            print ('')
+
+        return True
+
+    def remoteVersion(self) -> str:
+        """
+        Get the latest released version number, from the cache if we've checked recently.
+
+        @params:
+            - None
+
+        @return: the version number, like 2.4.0
+        """
+
+        cache_key:str = f'version|{VERSION_URI}'
+        cached:dict   = response_cache.lookup(cache_key)
+
+        if cached is not None:
+            return cached['version']
+
+        remote_json:dict = connection_pool.get(VERSION_URI, timeout = 5).json()
+        response_cache.store(cache_key, remote_json, VERSION_CHECK_TTL, persist = True)
+
+        return remote_json['version']
+
+    def run(self) -> bool:
+        """
+        Do the version check. This runs in the background thread.
+
+        @params:
+            - None
+
+        @return: True
+        """
+
+        try:
+            with open(LOCAL_VERSION_FILE) as file:
+                local_version:str = json.load(file)['version']
+
+            notice:str = self.compare(local_version, self.remoteVersion())
+        except Exception:
+            # We're probably offline - this isn't important enough to interrupt anything
+            notice:str = None
+
+        with self.lock:
+            self.notice = notice
+
+        return True
+
+    def start(self) -> bool:
+        """
+        Start the version check in the background, if it's enabled.
+
+        @params:
+            - None
+
+        @return: True
+        """
+
+        if CHECK_FOR_UPDATES == True and self.thread is None:
+            self.thread = threading.Thread(target = self.run, name = 'version-check', daemon = True)
+            self.thread.start()
+
+            atexit.register(self.printNotice)
+
+        return True
+
+# The shared version check - import this rather than creating a new VersionCheck
+version_check:VersionCheck = VersionCheck()
@@ -5,17 +5,17 @@ from __future__ import annotations
 
 import cryptocode
 import json
-import requests
 import time
-import sqlite3
 import traceback
 
 
+from bech32 import bech32_decode, convertbits
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
 from datetime import datetime
 from dateutil.tz import tz
 from enum import Enum
-from pycoingecko import CoinGeckoAPI
 from sqlite3 import Cursor, Connection
+from typing import TYPE_CHECKING
 
 from classes.common import (
     coin_list,
@@ -27,12 +27,14 @@ from classes.common import (
 )
     
 from constants.constants import (
+    ACCOUNT_CACHE_TTL,
     CHAIN_DATA,
-    DB_FILE_NAME,
     FULL_COIN_LOOKUP,
     GRDX,
     NON_ULUNA_COINS,
     TERRASWAP_GRDX_TO_LUNC_ADDRESS,
+    TOKEN_QUERY_CONCURRENCY,
+    TOKEN_QUERY_TIMEOUT,
     UBASE,
     ULUNA,
     USER_ACTION_CONTINUE,
@@ -41,20 +43,28 @@ from constants.constants import (
     WITHDRAWAL_REMAINDER,
 )
 
-from classes.swap_transaction import SwapTransaction
-from classes.terra_instance import TerraInstance
-from terra_classic_sdk.core.staking import UnbondingDelegation
-
-from terra_classic_sdk.client.lcd import LCDClient
-from terra_classic_sdk.client.lcd.api.distribution import Rewards
-from terra_classic_sdk.client.lcd.params import PaginationOptions
-from terra_classic_sdk.client.lcd.wallet import Wallet
-from terra_classic_sdk.core.coin import Coin
-from terra_classic_sdk.core.coins import Coins
-from terra_classic_sdk.core.staking.data.delegation import Delegation
-from terra_classic_sdk.core.staking.data.validator import Validator
+from classes.connection_pool import connection_pool
+from classes.response_cache import response_cache
+from classes.retry_policy import get_retry_policy
+from classes.schema import schema_manager
+from classes.validator_map import validator_map
+
 from terra_classic_sdk.exceptions import LCDResponseError
-from terra_classic_sdk.key.mnemonic import MnemonicKey
+
+# The rest of the SDK takes about a second to import, so it is only loaded once a wallet needs an LCD client.
+# These imports are just for the type hints.
+if TYPE_CHECKING:
+    from terra_classic_sdk.client.lcd import LCDClient
+    from terra_classic_sdk.client.lcd.api.distribution import Rewards
+    from terra_classic_sdk.client.lcd.params import PaginationOptions
+    from terra_classic_sdk.client.lcd.wallet import Wallet
+    from terra_classic_sdk.core.coin import Coin
+    from terra_classic_sdk.core.coins import Coins
+    from terra_classic_sdk.core.staking import UnbondingDelegation
+    from terra_classic_sdk.core.staking.data.delegation import Delegation
+
+# The CW20 balance queries for every wallet share this pool, so the threads (and their event loops) get reused
+token_query_pool:ThreadPoolExecutor = ThreadPoolExecutor(max_workers = TOKEN_QUERY_CONCURRENCY, thread_name_prefix = 'token-query')
 
 class UserParameters:
     """
@@ -73,47 +83,49 @@ class UserParameters:
 
 class UserWallet:
     def __init__(self):
-        self.address:str        = ''
-        self.balances:dict      = None
-        self.cached_prices:dict = {}    # Prices get stored here for speed
-        self.cached_traces:dict = {}    # Denom traces get stored here for speed
-        self.delegations:dict   = {}
-        self.denom:str          = ''
-        self.undelegations:dict = {}
-        self.name:str           = ''
-        self.pools:dict         = {}
-        self.prefix:str         = ''
-        self.seed:str           = ''
-        self.terra:LCDClient    = None
-        self.validated: bool    = False
+        self.address:str               = ''
+        self.balances:dict             = None
+        self.balances_complete:bool    = True  # False if anything was left out of the last getBalances call
+        self.cached_prices:dict        = {}    # Prices get stored here for speed
+        self.cached_traces:dict        = {}    # Denom traces get stored here for speed
+        self.delegations:dict          = {}
+        self.delegations_complete:bool = True  # False if the last getDelegations call didn't finish
+        self.denom:str                 = ''
+        self.undelegations:dict        = {}
+        self.name:str                  = ''
+        self.pools:dict                = {}
+        self.prefix:str                = ''
+        self.seed:str                  = ''
+        self.terra:LCDClient           = None
+        self.validated: bool           = False
         
-    def __iter_delegator_result__(self, delegator:Delegation):
+    def __iter_delegator_result__(self, delegator:Delegation, rewards:Rewards):
         """
         An internal function to get delegation results.
         
         @params:
             - delegator: a delegation object that we'll be querying information on
+            - rewards: the rewards for every validator this wallet delegates to
             
         @return: None - the internal self.delegation var is updated.
         """
 
         # Get the basic details about the delegator and validator etc
-        delegator_address:str       = delegator.delegation.delegator_address
-        validator_address:str       = delegator.delegation.validator_address
-        validator_details:Validator = self.terra.staking.validator(validator_address)
-        validator_name:str          = validator_details.description.moniker
-        validator_commission:float  = float(validator_details.commission.commission_rates.rate)
+        delegator_address:str      = delegator.delegation.delegator_address
+        validator_address:str      = delegator.delegation.validator_address
+        validator_details:dict     = validator_map.get(self.terra, validator_address)
+        validator_name:str         = validator_details['moniker']
+        validator_commission:float = validator_details['commission']
         
         # Get the delegated amount:
         balance_denom:str    = delegator.balance.denom
         balance_amount:float = delegator.balance.amount
 
         # Get any rewards
-        rewards:Rewards   = self.terra.distribution.rewards(delegator_address)
-        reward_coins:dict = coin_list(rewards.rewards[validator_address], {})
-        
-        # Make the commission human-readable
-        validator_commission = round(validator_commission * 100, 2)
+        if validator_address in rewards.rewards:
+            reward_coins:dict = coin_list(rewards.rewards[validator_address], {})
+        else:
+            reward_coins:dict = {}
 
         # Set up the object with the details we're interested in
         if balance_amount > 0:
@@ -190,7 +202,7 @@ class UserWallet:
         
         return uluna_amount
     
-    def create(self, name:str = '', address:str = '', seed:str = '', password:str = '', denom:str = '') -> UserWallet:
+    def create(self, name:str = '', address:str = '', seed:str = '', password:str = '', denom:str = '', connect:bool = True) -> UserWallet:
         """
         Create a wallet object based on the provided details.
         
@@ -200,6 +212,7 @@ class UserWallet:
             - seed: the seed so we can create it for withdrawals etc
             - password: the decryption password so we can retrieve the seed from the YML file
             - denom: what denomination is this wallet (usually uluna or uosmo)
+            - connect: set this to False for address book entries that will never need an LCD client
             
         @return: self
         """
@@ -220,7 +233,12 @@ class UserWallet:
                         denom = chain_key
 
         self.denom = denom        
-        self.terra = TerraInstance().create(denom)
+
+        if connect == True:
+            # This is where the SDK gets loaded for the first time
+            from classes.terra_instance import TerraInstance
+
+            self.terra = TerraInstance().create(denom)
 
         return self
     
@@ -235,6 +253,8 @@ class UserWallet:
         @return: Coin
         """
 
+        from terra_classic_sdk.core.coin import Coin
+
         return Coin.from_data({'amount': int(float(amount)), 'denom': denom})
 
     def denomTrace(self, ibc_address:str) -> str:
@@ -269,44 +289,30 @@ class UserWallet:
             insert_ibc_denom = "INSERT INTO ibc_denoms (ibc_denom, readable_denom) VALUES (?, ?);"
 
             # Get the database results
-            conn:Connection = sqlite3.connect(DB_FILE_NAME)
+            conn:Connection = schema_manager.connect()
             cursor:Cursor   = conn.execute(get_ibc_query, [uri])
             row:list        = cursor.fetchone()
 
             if row is None:
                 # Go and get this denom trace:
 
-                retry_count:int = 0
-                retry:bool      = True
+                try:
+                    trace_result:json = get_retry_policy('http').call(lambda: connection_pool.get(uri).json())
+                
+                    if 'denom_trace' in trace_result:
+                        # Return this result
+                        result = trace_result['denom_trace']['base_denom']
+                        
+                        # Add this IBC value and readable version into the database:
+                        cursor:Cursor = conn.execute(insert_ibc_denom, [uri, result])
+                        conn.commit()
 
-                while retry == True:
-                    try:
-                        trace_result:json = requests.get(uri).json()
-                    
-                        if 'denom_trace' in trace_result:
-                            # Return this result
-                            result = trace_result['denom_trace']['base_denom']
-                            
-                            # Add this IBC value and readable version into the database:
-                            cursor:Cursor = conn.execute(insert_ibc_denom, [uri, result])
-                            conn.commit()
-
-                            # Store this result for future requests
-                            self.cached_traces[uri] = result
-                            
-                            break
-                        else:
-                            break
-                    except Exception as err:
-                        retry_count += 1
-                        if retry_count == 10:
-                            print (f'Denom trace error for {uri}:')
-                            print (err)
-                            retry  = False
-                            result = ''
-                            break
-                        else:
-                            time.sleep(1)
+                        # Store this result for future requests
+                        self.cached_traces[uri] = result
+                except Exception as err:
+                    print (f'Denom trace error for {uri}:')
+                    print (err)
+                    result = ''
             else:
                 # This IBC entry is in the database
                 result = row[0]
@@ -351,6 +357,7 @@ class UserWallet:
         For this to work, the target_coin amount needs to be the current balance + the new balance
 
         If you just want the previously fetched balances, use wallet.balances
+        If any of the balances couldn't be retrieved, then wallet.balances_complete is set to False.
 
         @params:
             - core_coins_only: if true, then this will return ULUNA and USTC only
@@ -358,6 +365,8 @@ class UserWallet:
         @return: a dict of coins and their amounts for this wallet
         """
 
+        self.balances_complete = True
+
         if self.terra is not None:
             #retry_count:int = 0
 
@@ -365,6 +374,8 @@ class UserWallet:
             pools:dict    = {}
                 
             # Default pagination options
+            from terra_classic_sdk.client.lcd.params import PaginationOptions
+
             pagOpt:PaginationOptions = PaginationOptions(limit=50, count_total=True)
 
             # Get the current balance in this wallet
@@ -408,48 +419,27 @@ class UserWallet:
                 
             except Exception as err:
                 print (f'Pagination error for {self.name}:', err)
+                self.balances_complete = False
 
             if core_coins_only == False:
                 # Add the extra coins (Base, GarudaX, etc)
                 if self.terra is not None and self.terra.chain_id == CHAIN_DATA[ULUNA]['chain_id']:
-
-                    for coin_item in NON_ULUNA_COINS:
-                        if NON_ULUNA_COINS[coin_item] == GRDX:
-                            coin_address = TERRASWAP_GRDX_TO_LUNC_ADDRESS
-                        else:
-                            coin_address = coin_item
-
-                        coin_balance = self.terra.wasm.contract_query(coin_address, {'balance':{'address':self.address}})  
-                        if int(coin_balance['balance']) > 0:
-                            balances[NON_ULUNA_COINS[coin_item]] = coin_balance['balance']
+                    balances.update(self.getTokenBalances())
 
         else:
             balances:dict = {}
+            pools:dict    = {}
 
         self.balances = balances
         self.pools    = pools
 
         return self.balances
     
-    async def getBalancesAsync(self) -> dict:
-        """
-        An asynchronous wrapper aruond the standard delegation function.
-
-        @params:
-            - None
-            
-        @return: a dict of coins and their amounts for this wallet
-        """
-
-        balances:dict = self.getBalances(core_coins_only = True)
-
-        return balances
-    
     def getCoinPrice(self, denom_list:list) -> dict:
         """
         Based on the provided list of denominations, get the coingecko details.
 
-        It returns the price in US dollars.
+        It returns the price in US dollars. If Coingecko can't be reached, then the coins without a price are left out.
 
         @params:
             - denom_list: a list of coins we want prices for
@@ -473,38 +463,30 @@ class UserWallet:
 
         # Now make a bulk query for anything we haven't already requested:        
         if len(cg_denoms) > 0:
-            # Create the Coingecko object
-            cg = CoinGeckoAPI()
-
             # Coingecko uses its own denom key, which we store in the chain data constant
             # We're only supporting USD at the moment
-            retry_count:int = 0
-            retry:bool      = True
-
-            while retry == True:
-                try:
-                    
-                    cg_result = cg.get_price(cg_denoms, 'usd')
-
-                    for cg_denom in cg_result:
-                        self.cached_prices[cg_denom] = cg_result[cg_denom]['usd']
-
-                    retry = False
-                    break
+            # This goes through the connection pool so it is paced by the Coingecko rate limit
+            uri:str     = 'https://api.coingecko.com/api/v3/simple/price'
+            params:dict = {
+                'ids': ','.join(cg_denoms),
+                'vs_currencies': 'usd'
+            }
 
-                except Exception as err:
-                    retry_count += 1
-                    if retry_count == 10:
-                        print (' 🛑 Error getting coin prices')
-                        print (err)
+            def get_prices() -> dict:
+                cg_result:dict = connection_pool.get(uri, params = params).json()
+                # Rate limit and error responses don't include any prices
+                return {cg_denom: cg_result[cg_denom]['usd'] for cg_denom in cg_result}
 
-                        retry = False
-                        exit()
-                    else:
-                        if retry_count == 1:
-                            print (' 🛎️   Coingecko is slow at the moment, this might take a while...')
+            def slow_warning(attempt:int, error:Exception):
+                if attempt == 1:
+                    print (' 🛎️   Coingecko is slow at the moment, this might take a while...')
 
-                        time.sleep(1)
+            try:
+                self.cached_prices.update(get_retry_policy('prices').call(get_prices, on_retry = slow_warning))
+            except Exception as err:
+                # Carry on without prices - the caller will only get the ones we already know about
+                print (' 🛎️  Coin prices are not available right now')
+                print (err)
 
         result:dict = {}
         for denom in denom_list:
@@ -534,6 +516,8 @@ class UserWallet:
 
         if estimation_against is not None:
             label_widths.append(len('Estimation'))
+            from classes.swap_transaction import SwapTransaction
+            
             swap_tx = SwapTransaction().create(self.seed, self.denom)
 
             if swap_tx == False:
@@ -703,6 +687,7 @@ class UserWallet:
         """
         Create a dictionary of information about the delegations on this wallet.
         It may contain more than one validator.
+        If the delegations couldn't all be retrieved, then wallet.delegations_complete is set to False.
 
         @params:
             - None
@@ -710,14 +695,23 @@ class UserWallet:
         @return: a dictionary of delegations on this wallet.
         """
 
+        self.delegations_complete = True
+
         if self.terra is not None:
+            from terra_classic_sdk.client.lcd.params import PaginationOptions
+
             pagOpt:PaginationOptions = PaginationOptions(limit=50, count_total=True)
             try:
                 result, pagination = self.terra.staking.delegations(delegator = self.address, params = pagOpt)
 
+                # The rewards for every validator come back in one request, so this is only done once
+                rewards:Rewards = None
+                if len(result) > 0:
+                    rewards = self.terra.distribution.rewards(self.address)
+
                 delegator:Delegation 
                 for delegator in result:
-                    self.__iter_delegator_result__(delegator)
+                    self.__iter_delegator_result__(delegator, rewards)
 
                 while pagination['next_key'] is not None:
                     pagOpt.key         = pagination['next_key']
@@ -725,26 +719,13 @@ class UserWallet:
 
                     delegator:Delegation 
                     for delegator in result:
-                        self.__iter_delegator_result__(delegator)
+                        self.__iter_delegator_result__(delegator, rewards)
             except:
                 print (' 🛎️  Network error: delegations could not be retrieved.')
+                self.delegations_complete = False
 
         return self.delegations
     
-    async def getDelegationsAsync(self) -> dict:
-        """
-        An asynchronous wrapper aruond the standard delegation function.
-
-        @params:
-            - None
-
-        @return: a dictionary of delegations on this wallet.
-        """
-
-        delegations:dict = self.getDelegations()
-
-        return delegations
-    
     def getDenomByPrefix(self, prefix:str) -> str:
         """
         Go through the supported chains to find the denom for the provided prefix
@@ -829,6 +810,52 @@ class UserWallet:
 
         return result
 
+    def getTokenBalances(self) -> dict:
+        """
+        Get the balances of the CW20 tokens in NON_ULUNA_COINS (Base, GarudaX, etc).
+
+        Each token needs its own contract query, so they are all sent at the same time.
+        Any token that hasn't answered within TOKEN_QUERY_TIMEOUT seconds is left out,
+        so one slow contract doesn't hold up the whole wallet. If that happens, then
+        wallet.balances_complete is set to False.
+
+        @params:
+            - None
+
+        @return: a dict of tokens and their amounts, for the tokens this wallet holds
+        """
+
+        futures:dict = {}
+        for coin_item in NON_ULUNA_COINS:
+            if NON_ULUNA_COINS[coin_item] == GRDX:
+                coin_address = TERRASWAP_GRDX_TO_LUNC_ADDRESS
+            else:
+                coin_address = coin_item
+
+            futures[NON_ULUNA_COINS[coin_item]] = token_query_pool.submit(self.terra.wasm.contract_query, coin_address, {'balance':{'address':self.address}})
+
+        balances:dict  = {}
+        deadline:float = time.monotonic() + TOKEN_QUERY_TIMEOUT
+
+        # The results are collected in the same order as NON_ULUNA_COINS
+        for denom in futures:
+            try:
+                coin_balance:dict = futures[denom].result(timeout = max(0, deadline - time.monotonic()))
+            except FuturesTimeoutError:
+                futures[denom].cancel()
+                print (f' 🛎️  The {FULL_COIN_LOOKUP.get(denom, denom)} balance for {self.name} took too long and has been left out.')
+                self.balances_complete = False
+                continue
+            except Exception as err:
+                print (f' 🛎️  The {FULL_COIN_LOOKUP.get(denom, denom)} balance for {self.name} could not be retrieved:', err)
+                self.balances_complete = False
+                continue
+
+            if int(coin_balance['balance']) > 0:
+                balances[denom] = coin_balance['balance']
+
+        return balances
+
     def getUbaseUndelegations(self, wallet_address:str) -> list:
         """
         Get the undelegations that are in progress for BASE.
@@ -841,7 +868,7 @@ class UserWallet:
         @return: a list of undelegation details
         """
 
-        result:json  = requests.get('https://raw.githubusercontent.com/lbunproject/BASEswap-api-price/main/public/unstaked_plus_hashes.json').json()
+        result:json  = connection_pool.get('https://raw.githubusercontent.com/lbunproject/BASEswap-api-price/main/public/unstaked_plus_hashes.json').json()
         results:list = []
         today        = datetime.now()
 
@@ -869,6 +896,8 @@ class UserWallet:
         
         if prefix == 'terra':
             if len(self.undelegations) == 0:
+                from terra_classic_sdk.client.lcd.params import PaginationOptions
+
                 pagOpt:PaginationOptions = PaginationOptions(limit=50, count_total=True)
                 try:
                 
@@ -924,20 +953,6 @@ class UserWallet:
 
         return self.undelegations
     
-    async def getUnDelegationsAsync(self) -> dict:
-        """
-        An asynchronous wrapper aruond the standard undelegation function.
-
-        @params:
-            - None
-
-        @return: a dict of active undelegations on this wallet
-        """
-        
-        undelegations:dict = self.getUndelegations()
-
-        return undelegations
-    
     def getUserNumber(self, question:str, user_params:UserParameters) -> str:
         """
         Get the user input - could be a number or a percentage, and is constrained by details in the params parameter
@@ -1021,6 +1036,13 @@ class UserWallet:
 
         recipient_address:str = ''
 
+        # Index the wallet names once, rather than going through the whole list for every answer
+        addresses_by_name:dict = {}
+        if len(user_config) > 0:
+            for user_wallet in user_config['wallets']:
+                if str(user_wallet['wallet']).lower() not in addresses_by_name:
+                    addresses_by_name[str(user_wallet['wallet']).lower()] = user_wallet['address']
+
         while True:
             answer:str = input(question)
         
@@ -1037,11 +1059,8 @@ class UserWallet:
 
             else:
                 # Check if this is a wallet name
-                if len(user_config) > 0:
-                    for user_wallet in user_config['wallets']:
-                        if user_wallet['wallet'].lower() == answer.lower():
-                            recipient_address = user_wallet['address']
-                            break
+                if answer.lower() in addresses_by_name:
+                    recipient_address = addresses_by_name[answer.lower()]
 
             # Figure out if this wallet address is legit
             is_valid, is_empty = self.validateAddress(recipient_address)
@@ -1092,6 +1111,8 @@ class UserWallet:
         @return: the mnemonic and address of the new wallet
         """
 
+        from terra_classic_sdk.key.mnemonic import MnemonicKey
+
         mk            = MnemonicKey(prefix = prefix)
         wallet:Wallet = self.terra.wallet(mk)
         
@@ -1108,18 +1129,29 @@ class UserWallet:
         @return: is this valid, and is this empty?
         """
 
+        # Check the checksum first, so typos are rejected without asking the LCD
+        if self.validateAddressFormat(address) == False:
+            return False, False
+
         prefix:str = self.getPrefix(address)
 
-        # If this is an Osmosis address (or something like that) then we'll just accept it
+        # If this is an Osmosis address (or something like that) then the checksum is all we can check
         if prefix != 'terra':
             return True, False
         
         # We'll run some extra checks on terra addresses
         if address != '':
+            # Accounts never disappear, so if we've seen this one before then we don't need to ask again
+            cache_key:str = f'account|{self.terra.chain_id}|{address}'
+            if response_cache.lookup(cache_key) == True:
+                return True, False
+
             try:
                 result = self.terra.auth.account_info(address)
 
                 # No need to do anything - if it doesn't return an error then it's valid
+                response_cache.store(cache_key, True, ACCOUNT_CACHE_TTL, persist = True)
+
                 return True, False
             
             except LCDResponseError as err:
@@ -1132,6 +1164,27 @@ class UserWallet:
         else:
             return False, False
         
+    def validateAddressFormat(self, address:str) -> bool:
+        """
+        Check that the address is a properly formed bech32 address for a chain we support.
+        This is done locally, so no LCD requests are made.
+
+        @params:
+            - address: the wallet address we want to validate
+            
+        @return: true/false, is this a well-formed address?
+        """
+
+        prefix, data = bech32_decode(address)
+
+        if prefix is None or prefix not in self.getSupportedPrefixes():
+            return False
+
+        # Wallets are 20 bytes long, and contracts are 32 bytes
+        decoded:list = convertbits(data, 5, 8, False)
+
+        return decoded is not None and len(decoded) in [20, 32]
+
     def validateWallet(self) -> bool:
         """
         Check that the generated wallet matches the address we have saved against it.
@@ -1144,6 +1197,8 @@ class UserWallet:
         @return: true/false, does this generated wallet address match the saved address?
         """
 
+        from terra_classic_sdk.key.mnemonic import MnemonicKey
+
         try:
             prefix                   = self.getPrefix(self.address)
             generated_wallet_key     = MnemonicKey(mnemonic=self.seed, prefix = prefix)
@@ -1156,4 +1211,68 @@ class UserWallet:
                 return False
         except:
             return False
-    
\ No newline at end of file
+    
+class AddressRecord:
+    """
+    An address book entry from the YML file, for wallets we don't have (or don't need) the seed for.
+
+    Most of these are only ever shown in an address list, so this just keeps the name and address
+    instead of everything a UserWallet needs. If anything else is asked for, the record is promoted
+    to a full UserWallet the first time, and that wallet is used from then on.
+    """
+
+    __slots__ = ('address', 'name', 'wallet')
+
+    def __init__(self, name:str = '', address:str = ''):
+        self.address:str       = address
+        self.name:str          = name
+        self.wallet:UserWallet = None
+
+    def __getattr__(self, attribute:str):
+        """
+        Python only calls this for attributes that aren't in __slots__, so the request is passed to the full wallet.
+        """
+
+        if attribute in AddressRecord.__slots__:
+            raise AttributeError(attribute)
+        
+        return getattr(self.promote(), attribute)
+
+    def getPrefix(self, address:str) -> str:
+        """
+        Get the prefix of an address without promoting this record.
+
+        @params:
+            - address: the wallet address that we are interested in
+
+        @return: a string, something like 'terra' or 'osmo'
+        """
+
+        return UserWallet.getPrefix(self, address)
+
+    def getSupportedPrefixes(self) -> list:
+        """
+        Return a list of all the supported prefixes without promoting this record.
+
+        @params:
+            - None
+
+        @return: a list of prefixes we support
+        """
+
+        return UserWallet.getSupportedPrefixes(self)
+
+    def promote(self) -> UserWallet:
+        """
+        Turn this record into a full wallet, with its own LCD client.
+
+        @params:
+            - None
+
+        @return: the UserWallet for this address
+        """
+
+        if self.wallet is None:
+            self.wallet = UserWallet().create(name = self.name, address = self.address)
+
+        return self.wallet
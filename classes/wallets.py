@@ -1,68 +1,241 @@
 #!/usr/bin/env python3
 # -*- coding: UTF-8 -*-
 
-import asyncio
+import cryptocode
 import netrc
+import os
 import yaml
 
+from concurrent.futures import as_completed, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from getpass import getpass
 from os.path import exists
 
 from constants.constants import (
     CONFIG_FILE_NAME,
+    KEYSTORE_FILE_NAME,
     NETRC_MACHINE_NAME,
     ULUNA,
     USER_ACTION_ALL,
     USER_ACTION_CLEAR,
     USER_ACTION_CONTINUE,
     USER_ACTION_QUIT,
-    UUSD
+    UUSD,
+    WALLET_DECRYPT_PROCESSES,
+    WALLET_LOAD_CONCURRENCY
 )
 
-from classes.wallet import UserWallet
+from classes.address_cache import AddressCache
+from classes.keystore import Keystore, KeystoreError
+from classes.wallet import AddressRecord, UserWallet
+
+def decrypt_and_validate(encrypted_seed:str, password:str, address:str, derive:bool = True) -> str:
+    """
+    Decrypt a seed and check that it generates the address we have saved against it.
+    This is slow (the key derivation is deliberately expensive), so it is run in a separate process.
+    
+    @params:
+        - encrypted_seed: the encrypted seed from the YML file
+        - password: the decryption password
+        - address: the address we expect this seed to generate
+        - derive: set this to False if the address cache has already matched this seed to this address
+
+    @return: the decrypted seed, or None if the password is wrong or the address doesn't match
+    """
+
+    seed = cryptocode.decrypt(encrypted_seed, password)
+
+    if derive == False:
+        return seed if seed != False else None
+
+    from terra_classic_sdk.key.mnemonic import MnemonicKey
+
+    try:
+        prefix:str                       = UserWallet().getPrefix(address)
+        generated_wallet_key:MnemonicKey = MnemonicKey(mnemonic = seed, prefix = prefix)
+
+        if generated_wallet_key.acc_address == address:
+            return seed
+    except:
+        pass
+
+    return None
+
 class UserWallets:
     def __init__(self):
-        self.file           = None
-        self.wallets:dict   = {}
-        self.addresses:dict = {}
+        self.file            = None
+        self.wallets:dict    = {}
+        self.addresses:dict  = {}
+        self.by_address:dict = {}    # lowercase address -> wallet name
+        self.by_name:dict    = {}    # lowercase wallet name -> wallet name
+
+    def __addAddress(self, wallet_item:UserWallet) -> bool:
+        """
+        Add a wallet or address record to the address list, and to the lookup indexes.
+        
+        @params:
+            - wallet_item: a UserWallet or AddressRecord
+            
+        @return: True
+        """
+
+        self.addresses[wallet_item.name] = wallet_item
+
+        self.by_name[str(wallet_item.name).lower()] = wallet_item.name
+        self.by_address[wallet_item.address.lower()] = wallet_item.name
+
+        return True
+
+    def __loadConcurrently(self, user_wallets:dict, load_function) -> bool:
+        """
+        Run the provided function against every wallet at the same time, using a bounded thread pool.
+        The LCD requests for each wallet are blocking, so threads let them overlap instead of adding up.
+        
+        @params:
+            - user_wallets: a dict of wallets we want to load the details for
+            - load_function: a function that takes a UserWallet
+            
+        @return: True
+        """
+
+        if len(user_wallets) == 0:
+            return True
+
+        max_workers:int = min(WALLET_LOAD_CONCURRENCY, len(user_wallets))
+
+        with ThreadPoolExecutor(max_workers = max_workers) as executor:
+            futures:list = [executor.submit(load_function, user_wallets[wallet_name]) for wallet_name in user_wallets]
+
+            for future in as_completed(futures):
+                # Raise any unexpected errors here rather than losing them inside the thread
+                future.result()
+
+        return True
+
+    def __decryptSeeds(self, encrypted_wallets:list, user_password:str) -> list:
+        """
+        Decrypt and validate every seed, spread across a pool of processes.
+        If a process pool can't be started here, then they are done one at a time instead.
+        
+        @params:
+            - encrypted_wallets: a list of [encrypted seed, address, derive] lists
+            - user_password: the decryption password
+            
+        @return: a list of decrypted seeds (or None if invalid), in the same order
+        """
+
+        seeds:list     = [wallet[0] for wallet in encrypted_wallets]
+        addresses:list = [wallet[1] for wallet in encrypted_wallets]
+        derive:list    = [wallet[2] for wallet in encrypted_wallets]
+        passwords:list = [user_password] * len(encrypted_wallets)
+
+        max_workers:int = min(WALLET_DECRYPT_PROCESSES, os.cpu_count() or 1, len(encrypted_wallets))
+
+        if max_workers > 1:
+            if True in derive:
+                # Load the key classes before the pool starts, so each process doesn't have to import them separately
+                import terra_classic_sdk.key.mnemonic
 
-    async def __AsyncLoadBalances(self, user_wallets:dict):
+            try:
+                with ProcessPoolExecutor(max_workers = max_workers) as executor:
+                    # map() returns the results in the order they were submitted
+                    return list(executor.map(decrypt_and_validate, seeds, passwords, addresses, derive))
+            except (BrokenProcessPool, OSError):
+                pass
+
+        return list(map(decrypt_and_validate, seeds, passwords, addresses, derive))
+
+    def __getPassword(self) -> str:
         """
-        A special function to load wallet balances in an asynchronous mode.
+        Get the wallet password from .netrc, or ask the user for it.
         
         @params:
-            - user_wallets: a list of wallets we want to load the details for
+            - None
             
-        @return: None
+        @return: the password
         """
 
-        async def async_loop(user_wallets, wallet_name):
-            wallet:UserWallet = user_wallets[wallet_name]
-            await wallet.getBalancesAsync()
+        # First, check if we have a .netrc password set up:
+        try:
+            netrc_obj = netrc.netrc()
+            # Get the password for the current in-use machine
+            decrypt_password:str = netrc_obj.authenticators(NETRC_MACHINE_NAME)[2]
+        except Exception as err:
+            #print (err)
+            # No .netrc or something went wrong
+            decrypt_password:str = ''
+
+        if decrypt_password == '':
+
+            print ('')
+            decrypt_password:str = getpass(' 🔑 Wallet password: ') # the secret password that encrypts the seed phrase
+
+            if decrypt_password == '':
+                print (' 🛑 Exiting...\n')  
+                exit()
+
+        return decrypt_password
+
+    def __isRequested(self, wallet:dict, requested:set) -> bool:
+        """
+        Check if this wallet from the YML file is one we were asked to load.
+        
+        @params:
+            - wallet: the wallet entry from the YML file
+            - requested: a set of lowercase wallet names or addresses, or None for every wallet
             
-        coros = [async_loop(user_wallets, wallet_name) for wallet_name in user_wallets]
-        await asyncio.gather(*coros)
+        @return: true/false
+        """
+
+        if requested is None:
+            return True
+
+        return str(wallet['wallet']).lower() in requested or str(wallet['address']).lower() in requested
 
-    async def __AsyncLoadDelegations(self, user_wallets):
+    def __loadBalances(self, wallet:UserWallet) -> dict:
         """
-        A special function to load wallet delegations and undelegations in an asynchronous mode.
+        Load the core balances for a single wallet.
         
         @params:
-            - user_wallets: a list of wallets we want to load the details for
+            - wallet: the wallet we want to load the details for
             
-        @return: None
+        @return: a dict of coins and their amounts for this wallet
         """
 
-        async def async_loop(user_wallets, wallet_name):
-            wallet:UserWallet = user_wallets[wallet_name]
-            await wallet.getDelegationsAsync()
-            await wallet.getUnDelegationsAsync()
+        return wallet.getBalances(core_coins_only = True)
+
+    def __loadDelegations(self, wallet:UserWallet) -> dict:
+        """
+        Load the delegations and undelegations for a single wallet.
+        
+        @params:
+            - wallet: the wallet we want to load the details for
             
-        coros = [async_loop(user_wallets, wallet_name) for wallet_name in user_wallets]
+        @return: a dict of active undelegations on this wallet
+        """
+
+        wallet.getDelegations()
+
+        return wallet.getUndelegations()
+
+    def __lookup(self, name_or_address:str) -> str:
+        """
+        Find the address list key for a wallet name or address.
         
-        await asyncio.gather(*coros)
+        @params:
+            - name_or_address: a wallet name, or an actual terra/osmo address
+            
+        @return: the wallet name as it appears in the address list, or None if there is no match
+        """
+
+        key:str = str(name_or_address).lower()
+
+        if key in self.by_name:
+            return self.by_name[key]
+
+        return self.by_address.get(key)
 
-    def create(self, yml_file:dict, user_password:str, filter:list = None) -> dict:
+    def create(self, yml_file:dict, user_password:str, filter:list = None, wallet_names:list = None) -> dict:
         """
         Create a dictionary of wallets. Each wallet is a Wallet object.
         The wallet information comes from a provided YML file.
@@ -71,6 +244,7 @@ class UserWallets:
             - yml_file: a dictionary made from the contents of the user_config.yml file
             - user_password: the decryption password to get the seed
             - filter: return just terra or osmo wallets if required
+            - wallet_names: only decrypt the wallets with these names or addresses. The rest are added to the address list only.
             
         @return: a dict of wallets
         """
@@ -87,36 +261,124 @@ class UserWallets:
             print (' 🛑 No wallets were provided.')
             exit()
 
+        # Decrypt and validate all the seeds first, because this is the slow part.
+        # Seeds that have already been matched to their address don't need the key derived again.
+        address_cache:AddressCache = AddressCache(user_password)
+        encrypted_wallets:list     = []
+        requested:set              = None if wallet_names is None else set(str(name).lower() for name in wallet_names)
+
         for wallet in yml_file['wallets']:
+            if 'seed' in wallet and self.__isRequested(wallet, requested):
+                prefix:str = UserWallet().getPrefix(wallet['address'])
+                if filter is None or prefix in filter:
+                    encrypted_wallets.append([wallet['seed'], wallet['address'], not address_cache.isKnown(wallet['seed'], wallet['address'])])
+
+        decrypted_seeds:list = self.__decryptSeeds(encrypted_wallets, user_password)
+
+        for encrypted_wallet, seed in zip(encrypted_wallets, decrypted_seeds):
+            if seed is not None and encrypted_wallet[2] == True:
+                address_cache.remember(encrypted_wallet[0], encrypted_wallet[1])
 
-            if 'seed' in wallet:
-                wallet_item:UserWallet = UserWallet().create(name = wallet['wallet'], address = wallet['address'], seed = wallet['seed'], password = user_password)
+        # Now create the wallets in the same order as the YML file
+        for wallet in yml_file['wallets']:
 
-                prefix:str = wallet_item.getPrefix(wallet_item.address)
+            if 'seed' in wallet and self.__isRequested(wallet, requested):
+                prefix:str = UserWallet().getPrefix(wallet['address'])
                 
                 if filter is None or prefix in filter:
-                    wallet_item.validated = wallet_item.validateWallet()
+                    seed:str               = decrypted_seeds.pop(0)
+                    wallet_item:UserWallet = UserWallet().create(name = wallet['wallet'], address = wallet['address'])
+                    
+                    if seed is not None:
+                        wallet_item.seed      = seed
+                        wallet_item.validated = True
 
                     if wallet_item.validated == True:
                         # Add this completed wallet to the list
                         self.wallets[wallet['wallet']] = wallet_item
 
                         # Add this to the address list as well
-                        self.addresses[wallet['wallet']] = wallet_item
+                        self.__addAddress(wallet_item)
             else:
-                # It's just an address - add it to the address list
+                # It's just an address (or a wallet we don't need right now) - add it to the address list
                 if 'address' in wallet:
-                    wallet_item:UserWallet = UserWallet().create(name = wallet['wallet'], address = wallet['address'])
-                    self.addresses[wallet['wallet']] = wallet_item
+                    self.__addAddress(AddressRecord(name = wallet['wallet'], address = wallet['address']))
+
+        return self.wallets
+
+    def createFromKeystore(self, keystore:Keystore, user_password:str, filter:list = None, wallet_names:list = None) -> dict:
+        """
+        Create a dictionary of wallets from a keystore file instead of the YML file.
+        The seeds were checked against their addresses when the keystore was made, and are protected
+        against changes, so they don't need to be checked again here.
+        
+        @params:
+            - keystore: a loaded Keystore object
+            - user_password: the keystore password
+            - filter: return just terra or osmo wallets if required
+            - wallet_names: only decrypt the wallets with these names or addresses. The rest are added to the address list only.
+            
+        @return: a dict of wallets
+        """
+
+        if keystore.unlock(user_password) == False:
+            print (' 🛑 This password does not unlock the keystore.\n')
+            return self.wallets
+
+        requested:set = None if wallet_names is None else set(str(name).lower() for name in wallet_names)
+
+        # Work out which seeds we need first, so they can all be read in one go
+        decrypt:set = set()
+        for entry in keystore.entries:
+            prefix:str = UserWallet().getPrefix(entry['address'])
+
+            if entry['length'] > 0 and self.__isRequested(entry, requested) and (filter is None or prefix in filter):
+                decrypt.add(entry['wallet'])
+
+        seeds, errors = keystore.readSeeds(list(decrypt))
+
+        for entry in keystore.entries:
+            if entry['wallet'] in errors:
+                print (f" 🛑 {errors[entry['wallet']]}")
+                continue
+
+            if entry['wallet'] in decrypt:
+                wallet_item:UserWallet = UserWallet().create(name = entry['wallet'], address = entry['address'])
+                wallet_item.seed       = seeds[entry['wallet']]
+                wallet_item.validated  = True
+
+                self.wallets[entry['wallet']] = wallet_item
+                self.__addAddress(wallet_item)
+            else:
+                self.__addAddress(AddressRecord(name = entry['wallet'], address = entry['address']))
 
         return self.wallets
 
+    def findWallet(self, name_or_address:str) -> UserWallet:
+        """
+        Get a decrypted wallet by its name or address.
+        Names are matched first, and case doesn't matter.
+        
+        @params:
+            - name_or_address: a wallet name, or an actual terra/osmo address
+            
+        @return: the UserWallet, or None if there isn't a decrypted wallet that matches
+        """
+
+        wallet_name = self.__lookup(name_or_address)
+
+        if wallet_name is None:
+            return None
+        
+        return self.wallets.get(wallet_name)
+
     def getAddresses(self) -> dict:
         """
         Return the dictionary of addresses.
         No validation or anything fancy is done here.
 
-        This is used by the send.py file to show an address book of possible addresses
+        This is used by the send.py file to show an address book of possible addresses.
+        Entries without a usable seed are AddressRecord objects, which become a full UserWallet if needed.
         
         @params:
             - None
@@ -522,42 +784,40 @@ class UserWallets:
         
         return user_wallet, answer
         
-    def loadUserWallets(self, get_balances:bool = True, get_delegations:bool = False, filter:list = None) -> dict:
+    def loadUserWallets(self, get_balances:bool = True, get_delegations:bool = False, filter:list = None, wallet_names:list = None) -> dict:
         """
         Request the decryption password off the user and load the user_config.yml file based on this.
+        If a keystore file has been created with keystore.py, then that is used instead.
         
         @params:
             - get_balances: do we want the wallet balances?
             - get_delegations: do we want any available delegations on this wallet? LUNC only at this point.
             - filter: provide just terra or osmo wallets
+            - wallet_names: only decrypt the wallets with these names or addresses (None means every wallet)
             
         @return: a dict of wallets
         """
 
-        file_exists = exists(CONFIG_FILE_NAME)
-
         result:dict = None
 
-        if file_exists:
-
-            # First, check if we have a .netrc password set up:
+        if exists(KEYSTORE_FILE_NAME):
+            # The keystore is used instead of user_config.yml if it exists
             try:
-                netrc_obj = netrc.netrc()
-                # Get the password for the current in-use machine
-                decrypt_password:str = netrc_obj.authenticators(NETRC_MACHINE_NAME)[2]
-            except Exception as err:
-                #print (err)
-                # No .netrc or something went wrong
-                decrypt_password:str = ''
+                keystore:Keystore = Keystore().load(KEYSTORE_FILE_NAME)
+            except (KeystoreError, OSError) as err:
+                print (f' 🛑 The keystore could not be opened: {err}')
+                print (' 🛑 Delete it to go back to using user_config.yml, or create it again with keystore.py.')
+                exit()
 
-            if decrypt_password == '':
+            decrypt_password:str = self.__getPassword()
 
-                print ('')
-                decrypt_password:str = getpass(' 🔑 Wallet password: ') # the secret password that encrypts the seed phrase
+            print ('\n 🕐 Unlocking the keystore - please wait...\n')
+            self.createFromKeystore(keystore, decrypt_password, filter, wallet_names)
+            result = self.wallets
 
-                if decrypt_password == '':
-                    print (' 🛑 Exiting...\n')  
-                    exit()
+        elif exists(CONFIG_FILE_NAME):
+
+            decrypt_password:str = self.__getPassword()
 
             # Now open this file and get the contents
             try:
@@ -565,7 +825,7 @@ class UserWallets:
                     user_config = yaml.safe_load(file)
 
                     print ('\n 🕐 Decrypting and validating wallets - please wait...\n')
-                    self.create(user_config, decrypt_password, filter)
+                    self.create(user_config, decrypt_password, filter, wallet_names)
                     result = self.wallets
                 
             except:
@@ -576,11 +836,48 @@ class UserWallets:
             exit()
 
         if get_balances == True:
-            loop = asyncio.get_event_loop()
-            loop.run_until_complete(self.__AsyncLoadBalances(self.wallets))
+            self.__loadConcurrently(self.wallets, self.__loadBalances)
 
         if get_delegations == True:
-            loop = asyncio.get_event_loop()
-            loop.run_until_complete(self.__AsyncLoadDelegations(self.wallets))
+            self.__loadConcurrently(self.wallets, self.__loadDelegations)
+
+        return result
+
+    def validateAddresses(self, addresses:list) -> dict:
+        """
+        Check a whole list of addresses at the same time.
+        Badly formed addresses are rejected without an LCD request, and any accounts
+        we already know about come from the cache.
+
+        Like validateAddress, an address is also [False, False] if the LCD couldn't check it,
+        so use validateAddressFormat to tell a bad address apart from an LCD problem.
+        
+        @params:
+            - addresses: a list of addresses to check
+            
+        @return: a dict of addresses, each with a [is valid, is empty] list
+        """
+
+        result:dict = {}
+
+        # Duplicates only need to be checked once
+        addresses:list = list(dict.fromkeys(addresses))
+
+        if len(addresses) == 0:
+            return result
+
+        # Every terra address is checked against the same LCD client
+        checker:UserWallet = UserWallet().create(denom = ULUNA)
+        max_workers:int    = min(WALLET_LOAD_CONCURRENCY, len(addresses))
+
+        with ThreadPoolExecutor(max_workers = max_workers) as executor:
+            futures:dict = {address: executor.submit(checker.validateAddress, address) for address in addresses}
+
+            for address in futures:
+                try:
+                    result[address] = list(futures[address].result())
+                except Exception:
+                    # The LCD couldn't be reached, which doesn't mean the address is wrong
+                    result[address] = [False, False]
 
-        return result
\ No newline at end of file
+        return result
@@ -9,6 +9,7 @@ from classes.transaction_core import TransactionCore, TransactionResult
 from classes.terra_instance import TerraInstance
 from classes.wallet import UserWallet
 
+from terra_classic_sdk.client.lcd import LCDClient
 from terra_classic_sdk.client.lcd.api.tx import (
     CreateTxOptions,
     Tx
@@ -28,7 +29,7 @@ class WithdrawalTransaction(TransactionCore):
         self.delegator_address:str = ''
         self.validator_address:str = ''
 
-    def create(self, seed:str, delegator_address:str, validator_address:str) -> WithdrawalTransaction:
+    def create(self, seed:str, delegator_address:str, validator_address:str, terra:LCDClient = None) -> WithdrawalTransaction:
         """
         Create a withdrawal object and set it up with the provided details.
         
@@ -36,12 +37,16 @@ class WithdrawalTransaction(TransactionCore):
             - seed: the wallet seed so we can create the wallet
             - delegator_address: usually the wallet address that we are currently using
             - validator_address: the address of the validator we're withdrawing from
+            - terra: an existing LCD client for this chain, like the one on the wallet
 
         @return: self
         """
 
-        # Create the terra instance
-        self.terra = TerraInstance().create()
+        # Use the provided terra instance, or get the shared one for this chain
+        if terra is None:
+            terra = TerraInstance().create()
+
+        self.terra = terra
         
         # Create the wallet based on the calculated key
         current_wallet_key  = MnemonicKey(seed)
@@ -165,7 +170,7 @@ def claim_delegation_rewards(wallet:UserWallet, validator_address:str, silent_mo
     wallet.getBalances()
     
     # Set up the withdrawal object
-    withdrawal_tx = WithdrawalTransaction().create(seed = wallet.seed, delegator_address = wallet.address, validator_address = validator_address)
+    withdrawal_tx = WithdrawalTransaction().create(seed = wallet.seed, delegator_address = wallet.address, validator_address = validator_address, terra = wallet.terra)
 
     # We need to populate some details
     withdrawal_tx.balances     = wallet.balances
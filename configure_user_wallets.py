@@ -6,6 +6,7 @@ from constants.constants import (
     CHAIN_OSMO,
     CHAIN_TERRA,
     CONFIG_FILE_NAME,
+    KEYSTORE_FILE_NAME,
     ULUNA,
     USER_ACTION_QUIT
 )
@@ -153,6 +154,9 @@ def main():
 
     print ('\nDone. The user_config.yml file has been updated.\n')
 
+    if exists(KEYSTORE_FILE_NAME):
+        print ('You are using a keystore file, so run "python3 keystore.py import" to add this change to it.\n')
+
 if __name__ == "__main__":
     """ This is executed when run from the command line """
     main()
\ No newline at end of file
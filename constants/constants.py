@@ -4,7 +4,7 @@
 import os
 
 # User settings - can be changed if required
-CHECK_FOR_UPDATES    = True  # This might slow things down a bit when the script is first run. Change it to False if it becomes a problem.
+CHECK_FOR_UPDATES    = True  # Check github for a new version. This runs in the background, and only once a day (see VERSION_CHECK_TTL).
 WITHDRAWAL_REMAINDER = 150   # This is the amount of Lunc we want to keep after withdrawal and before delegating. You should never delegate the entire balance.
 SEARCH_RETRY_COUNT   = 50    # This is the number of times we will check for a transaction to appear in the chain before deciding it didn't work.
 HIDE_DISABLED_COINS  = True  # Some coins are not currently available. Functionality is mostly there, but swaps etc won't work
@@ -23,7 +23,9 @@ TOKEN_LIST               = 'https://assets.terrarebels.net/cw20/tokens.json'
 CONFIG_FILE_NAME         = os.path.dirname(os.path.abspath(__file__)) + '/../user_config.yml'
 WORKFLOWS_FILE_NAME      = os.path.dirname(os.path.abspath(__file__)) + '/../user_workflows.yml'
 DB_FILE_NAME             = os.path.dirname(os.path.abspath(__file__)) + '/../osmosis.db'
+KEYSTORE_FILE_NAME       = os.path.dirname(os.path.abspath(__file__)) + '/../user_config.keystore'
 VERSION_URI              = 'https://raw.githubusercontent.com/geoffmunn/utility-scripts/main/version.json'
+VERSION_CHECK_TTL        = 86400    # How many seconds we remember the latest version number for
 
 # Gas adjustments and other values
 GAS_ADJUSTMENT            = 3.6      # The standard gas adjustment value. Make higher to increase liklihood of success
@@ -35,6 +37,51 @@ OSMOSIS_FEE_MULTIPLIER    = 1.5      # An additional fee multiplier for Osmosis
 OSMOSIS_LIQUIDITIY_SPREAD = 0.01     # For liquidity investments, what slippage will we tolerate?
 OSMOSIS_POOL_TAX          = 0.025    # What it costs to exit a liquidity pool on Osmosis
 
+# Network settings
+HTTP_POOL_SIZE            = 10       # The maximum number of kept-alive connections to each host
+HTTP_TIMEOUT              = 30       # How many seconds we wait for an LCD or HTTP response before giving up
+LCD_EJECTION_COOLDOWN     = 60       # How many seconds a failing LCD endpoint is ignored for
+LCD_EJECTION_THRESHOLD    = 3        # How many failures in a row before an LCD endpoint is ejected
+WALLET_LOAD_CONCURRENCY   = 8        # How many wallets we load balances and delegations for at the same time
+WALLET_DECRYPT_PROCESSES  = 4        # How many processes decrypt and check wallet seeds at the same time (capped at the CPU count)
+TOKEN_QUERY_CONCURRENCY   = 16       # How many CW20 token balance queries run at the same time, across every wallet
+TOKEN_QUERY_TIMEOUT       = 10       # How many seconds we wait for the CW20 token balances before leaving the slow ones out
+LCD_RATE_BURST            = 20       # How many LCD requests we can send in a quick burst before pacing kicks in
+LCD_RATE_LIMIT            = 10       # How many requests per second we send to each LCD host
+
+# LCD response cache
+ACCOUNT_CACHE_TTL         = 2592000  # How many seconds we remember that an address exists on chain (30 days)
+LCD_CACHE_DISK            = True     # Keep slow-changing LCD responses in osmosis.db so the next run starts warm
+LCD_CACHE_SIZE            = 2000     # The maximum number of LCD responses kept in memory
+
+# How long to cache each LCD endpoint: {path pattern: [seconds, keep on disk]}
+# Account details are never cached here because the sequence number changes with every transaction
+LCD_CACHE_TTLS:dict = {
+    r'^cosmos/staking/v1beta1/validators(/[a-z0-9]+)?$': [300, True],   # Validator lists and details
+    r'^osmosis/gamm/v1beta1/pools/[0-9]+$':               [30, True],    # Osmosis pools
+    r'^cosmos/base/tendermint/v1beta1/blocks/latest$':    [2, False]     # The latest block
+}
+
+# Replay server settings - see replay_server.py
+REPLAY_FIXTURES_DIR       = os.path.dirname(os.path.abspath(__file__)) + '/../fixtures'
+REPLAY_SERVER_URL         = os.environ.get('LUNC_REPLAY_SERVER', '')   # Send every request through replay_server.py, for example 'http://127.0.0.1:8080'
+
+# Retry policies: [maximum attempts, first delay, maximum delay, deadline] - the delays and deadline are in seconds
+# Delays double after each attempt, with some randomness so we don't retry in lockstep
+RETRY_POLICIES:dict = {
+    'http':      [10, 0.5, 8, 60],                    # Denom traces and other raw HTTP requests
+    'lcd':       [BUSY_RETRY_COUNT, 0.5, 8, 90],      # Busy LCD responses when getting sequence numbers, pools, and transactions
+    'prices':    [8, 1, 16, 90],                      # Coingecko prices
+    'tx_search': [SEARCH_RETRY_COUNT, 1, 1, 180]      # Waiting for a transaction (or a balance change) to appear on the chain - checked every second
+}
+
+# Request budgets for other hosts: [requests per second, burst size]
+HOST_RATE_LIMITS:dict = {
+    'api.coingecko.com':         [0.2, 3],
+    'raw.githubusercontent.com': [5, 10],
+    'rest.cosmos.directory':     [5, 10]
+}
+
 # Swap contracts can be found here
 # https://assets.terra.money/cw20/pairs.dex.json
 TERRASWAP_UUSD_TO_ULUNA_ADDRESS = 'terra1l7vy20x940je7lskm6x9s839vjsmekz9k9mv7g'
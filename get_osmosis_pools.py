@@ -1,31 +1,23 @@
 
 #!/usr/bin/python
 
-import sqlite3
 import time
 
-from constants.constants import (
-    DB_FILE_NAME
-)
-
+from classes.schema import schema_manager
 from classes.wallet import UserWallet
 
 from terra_classic_sdk.core.osmosis import Pool, PoolAsset
 
 def main():
-    conn = sqlite3.connect(DB_FILE_NAME)
+    # The schema manager creates the tables if this is a new database
+    conn = schema_manager.connect()
     print ("Opened database successfully")
 
-    # Create a terra object and get the Osmosis pools
-    delete_pool_table    = "DROP TABLE IF EXISTS pool;"
-    delete_asset_table   = "DROP TABLE IF EXISTS asset;"
-    delete_ibc_table     = "DROP TABLE IF EXISTS ibc_denoms;"
-    delete_summary_table = "DROP TABLE IF EXISTS osmosis_summary;"
-
-    create_pool_table    = "CREATE TABLE pool (ID INTEGER PRIMARY KEY AUTOINCREMENT, date_added DATETIME DEFAULT CURRENT_TIMESTAMP, pool_id INTEGER NOT NULL, pool_type TEXT NOT NULL, pool_address TEXT NOT NULL, pool_swap_fee FLOAT NOT NULL, pool_exit_fee FLOAT NOT NULL, pool_future_pool_governor STRING NOT NULL, total_shares_amount STRING NOT NULL, pool_total_weight INTEGER NOT NULL);"
-    create_asset_table   = "CREATE TABLE asset (ID INTEGER PRIMARY KEY AUTOINCREMENT, date_added DATETIME DEFAULT CURRENT_TIMESTAMP, pool_id INTEGER NOT NULL, token_denom TEXT NOT NULL, token_readable_denom TEXT NOT NULL, token_amount STRING NOT NULL, weight INTEGER NOT NULL);"
-    create_ibc_table     = "CREATE TABLE ibc_denoms (ID INTEGER PRIMARY KEY AUTOINCREMENT, date_added DATETIME DEFAULT CURRENT_TIMESTAMP, ibc_denom TEXT NOT NULL, readable_denom TEXT NOT NULL);"
-    create_summary_table = "CREATE TABLE osmosis_summary (ID INTEGER PRIMARY KEY AUTOINCREMENT, last_scan_date DATETIME);"
+    # Clear out the old data, but keep the tables and indexes
+    delete_pools     = "DELETE FROM pool;"
+    delete_assets    = "DELETE FROM asset;"
+    delete_ibc       = "DELETE FROM ibc_denoms;"
+    delete_summaries = "DELETE FROM osmosis_summary;"
 
     add_pool       = "INSERT INTO pool (pool_id, pool_type, pool_address, pool_swap_fee, pool_exit_fee, pool_future_pool_governor, total_shares_amount, pool_total_weight) VALUES (?, ?, ?, ?, ?, ?, ?, ?);"
     add_asset      = "INSERT INTO asset (pool_id, token_denom, token_readable_denom, token_amount, weight) VALUES (?, ?, ?, ?, ?);"
@@ -35,16 +27,10 @@ def main():
 
     wallet:UserWallet = UserWallet().create(denom = 'uosmo')
 
-    conn.execute(delete_pool_table)
-    conn.execute(delete_asset_table)
-    conn.execute(delete_ibc_table)
-    conn.execute(delete_summary_table)
-    conn.commit()
-
-    conn.execute(create_pool_table)
-    conn.execute(create_asset_table)
-    conn.execute(create_ibc_table)
-    conn.execute(create_summary_table)
+    conn.execute(delete_pools)
+    conn.execute(delete_assets)
+    conn.execute(delete_ibc)
+    conn.execute(delete_summaries)
     conn.commit()
 
     pools:list = wallet.terra.pool.osmosis_pools()
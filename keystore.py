@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+import argparse
+import cryptocode
+import yaml
+
+from getpass import getpass
+from os.path import exists
+
+from constants.constants import (
+    CONFIG_FILE_NAME,
+    KEYSTORE_FILE_NAME
+)
+
+from classes.common import (
+    get_user_choice
+)
+
+from classes.keystore import Keystore, KeystoreError
+from classes.wallets import UserWallets
+
+def export_keystore(keystore_file:str, yaml_file:str) -> bool:
+    """
+    Write every wallet in the keystore back out to a user_config.yml file.
+    Each seed is encrypted separately with cryptocode, so this is slow for a large number of wallets.
+
+    @params:
+        - keystore_file: the keystore to read
+        - yaml_file: the YML file to create
+
+    @return: True
+    """
+
+    try:
+        keystore:Keystore = Keystore().load(keystore_file)
+    except (KeystoreError, OSError) as err:
+        print (f' 🛑 The keystore could not be opened: {err}\n')
+        exit()
+
+    if exists(yaml_file):
+        overwrite:bool = get_user_choice(f' ❓ {yaml_file} already exists. Do you want to replace it? (y/n) ', [])
+        if overwrite == False:
+            print (' 🛑 Exiting...\n')
+            exit()
+
+    password:str = getpass(' 🔑 Keystore password: ')
+
+    if keystore.unlock(password) == False:
+        print (' 🛑 This password does not unlock the keystore.\n')
+        exit()
+
+    print ('\n 🕐 Encrypting each wallet - please wait...\n')
+
+    seeds, errors = keystore.readSeeds([entry['wallet'] for entry in keystore.entries])
+    if len(errors) > 0:
+        for wallet_name in errors:
+            print (f' 🛑 {errors[wallet_name]}')
+        print (' 🛑 Exiting...\n')
+        exit()
+
+    # This is the same layout as configure_user_wallets.py creates
+    output:str = '---\n\nwallets:'
+    for entry in keystore.entries:
+        output += '\n  - wallet: ' + str(entry['wallet']) + '\n'
+
+        seed:str = seeds[entry['wallet']]
+        if seed is not None:
+            output += '    seed: ' + cryptocode.encrypt(seed, password) + '\n'
+
+        output += '    address: ' + str(entry['address']) + '\n'
+
+    output += '\n...'
+
+    with open(yaml_file, 'w') as file:
+        file.write(output)
+
+    print (f' ✅ {len(keystore.entries)} wallets have been exported to {yaml_file}\n')
+
+    return True
+
+def import_keystore(yaml_file:str, keystore_file:str) -> bool:
+    """
+    Create a keystore from an existing user_config.yml file.
+    Every seed is checked against its address first, and any that don't match are left out.
+
+    @params:
+        - yaml_file: the YML file to read
+        - keystore_file: the keystore to create
+
+    @return: True
+    """
+
+    if not exists(yaml_file):
+        print (f' 🛑 {yaml_file} does not exist - please run configure_user_wallets.py first.\n')
+        exit()
+
+    try:
+        with open(yaml_file, 'r') as file:
+            user_config:dict = yaml.safe_load(file)
+    except Exception as err:
+        print (f' 🛑 {yaml_file} could not be opened: {err}\n')
+        exit()
+
+    if exists(keystore_file):
+        overwrite:bool = get_user_choice(f' ❓ {keystore_file} already exists. Do you want to replace it? (y/n) ', [])
+        if overwrite == False:
+            print (' 🛑 Exiting...\n')
+            exit()
+
+    password:str = getpass(' 🔑 Wallet password: ')
+
+    print ('\n 🕐 Decrypting and validating wallets - please wait...\n')
+
+    user_wallets:UserWallets = UserWallets()
+    user_wallets.create(user_config, password)
+
+    if len(user_wallets.wallets) == 0:
+        print (" 🛑 This password couldn't decrypt any wallets, so the keystore was not created.\n")
+        exit()
+
+    # The address list has every wallet we can use, in the same order as the YML file.
+    # Address-only entries don't have a seed, so they're saved with an empty one.
+    wallets:list = []
+    for wallet_name in user_wallets.addresses:
+        wallet = user_wallets.addresses[wallet_name]
+        seed   = user_wallets.wallets[wallet_name].seed if wallet_name in user_wallets.wallets else ''
+        wallets.append({'wallet': wallet.name, 'address': wallet.address, 'seed': seed})
+
+    skipped:list = [str(wallet['wallet']) for wallet in user_config['wallets'] if wallet['wallet'] not in user_wallets.addresses]
+    if len(skipped) > 0:
+        print (f" 🛎️  These wallets couldn't be validated with this password and were left out: {', '.join(skipped)}\n")
+
+    saved:int = Keystore().save(keystore_file, wallets, password)
+
+    print (f' ✅ {saved} wallets have been saved to {keystore_file}')
+    print (' The keystore will now be used instead of the YML file. Delete it to go back to using the YML file.\n')
+
+    return True
+
+def main():
+
+    parser = argparse.ArgumentParser(description = 'Convert user_config.yml into a keystore file that loads much faster, or convert a keystore back again.')
+    parser.add_argument('action', choices = ['import', 'export'], help = 'import: create a keystore from the YML file. export: create a YML file from the keystore.')
+    parser.add_argument('--yaml', default = CONFIG_FILE_NAME, help = 'the YML wallet file')
+    parser.add_argument('--keystore', default = KEYSTORE_FILE_NAME, help = 'the keystore file')
+
+    args = parser.parse_args()
+
+    if args.action == 'import':
+        import_keystore(args.yaml, args.keystore)
+    else:
+        export_keystore(args.keystore, args.yaml)
+
+if __name__ == "__main__":
+    """ This is executed when run from the command line """
+    main()
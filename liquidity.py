@@ -53,7 +53,7 @@ def main():
     print ('\n 🕐  Loading pool list, please wait...')
     
     # Create the send tx object
-    liquidity_tx = LiquidityTransaction().create(wallet.seed, wallet.denom)
+    liquidity_tx = LiquidityTransaction().create(wallet.seed, wallet.denom, wallet.terra)
 
     # Get the pool off the user
     user_pool, answer = liquidity_tx.getPoolSelection('Enter the pool number you want to use, (X) to continue, or (Q) to quit: ', wallet)
@@ -1,6 +1,15 @@
 #!/usr/bin/env python3
 # -*- coding: UTF-8 -*-
 
+from __future__ import annotations
+
+# This must be the first import so it can time all the others (see --profile-imports)
+import classes.import_profiler
+
+import argparse
+
+from typing import TYPE_CHECKING
+
 from classes.common import (
     check_database,
     check_version,
@@ -22,17 +31,24 @@ from constants.constants import (
     WITHDRAWAL_REMAINDER
 )
 
-from classes.delegation_transaction import delegate_to_validator
-from classes.swap_transaction import SwapTransaction
-from classes.transaction_core import TransactionResult
+from classes.tracer import add_timing_arguments, start_timings
 from classes.wallet import UserWallet
 from classes.wallets import UserWallets
-from classes.withdrawal_transaction import claim_delegation_rewards
-    
-from terra_classic_sdk.core.coin import Coin
+
+# The SDK is only loaded once the wallets are unlocked - these imports are just for the type hints
+if TYPE_CHECKING:
+    from classes.transaction_core import TransactionResult
+    from terra_classic_sdk.core.coin import Coin
 
 def main():
     
+    parser = argparse.ArgumentParser()
+    add_timing_arguments(parser)
+
+    args = parser.parse_args()
+
+    start_timings(args)
+
     # Check if there is a new version we should be using
     check_version()
     check_database()
@@ -41,6 +57,11 @@ def main():
     wallets = UserWallets()
     user_wallets = wallets.loadUserWallets()
 
+    # The transaction classes load the whole SDK, so they aren't imported until the wallets are unlocked
+    from classes.delegation_transaction import delegate_to_validator
+    from classes.swap_transaction import SwapTransaction
+    from classes.withdrawal_transaction import claim_delegation_rewards
+
     # Get the desired actions
     print ('\nWhat action do you want to take?\n')
     print ('  (W)  Withdraw rewards')
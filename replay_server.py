@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import requests
+import threading
+import time
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+from constants.constants import (
+    HTTP_TIMEOUT,
+    REPLAY_FIXTURES_DIR
+)
+
+class ReplayStore:
+    """
+    Reads and writes the recorded responses.
+
+    Each response is saved as a JSON file in a folder for its host, named after a hash
+    of the method, path, query parameters, and body of the request.
+    """
+
+    def __init__(self, fixtures_dir:str):
+        self.fixtures:dict       = {}
+        self.fixtures_dir:str    = fixtures_dir
+        self.latest:dict         = {}
+        self.lock:threading.Lock = threading.Lock()
+
+    def fixtureKey(self, method:str, host:str, path:str, query:str, body:bytes) -> str:
+        """
+        Create a stable key for this request. Query parameters are sorted and JSON bodies are normalised,
+        so the same request always gets the same key.
+
+        @params:
+            - method: GET or POST
+            - host: the upstream host, like terra-classic-lcd.publicnode.com
+            - path: the path on the upstream host
+            - query: the raw query string
+            - body: the raw request body
+
+        @return: a hex string
+        """
+
+        query_pairs:list = sorted(parse_qsl(query, keep_blank_values = True))
+
+        try:
+            body_str:str = json.dumps(json.loads(body), sort_keys = True) if body else ''
+        except ValueError:
+            body_str:str = body.decode('utf-8', errors = 'replace')
+
+        key_source:str = json.dumps([method, host, path, query_pairs, body_str])
+
+        return hashlib.sha256(key_source.encode('utf-8')).hexdigest()[0:24]
+
+    def load(self) -> int:
+        """
+        Load every fixture file into memory.
+
+        @params:
+            - None
+
+        @return: the number of fixtures loaded
+        """
+
+        if not os.path.isdir(self.fixtures_dir):
+            return 0
+
+        for host in sorted(os.listdir(self.fixtures_dir)):
+            host_dir:str = os.path.join(self.fixtures_dir, host)
+            if not os.path.isdir(host_dir):
+                continue
+
+            for file_name in sorted(os.listdir(host_dir)):
+                if not file_name.endswith('.json'):
+                    continue
+
+                with open(os.path.join(host_dir, file_name), 'r') as file:
+                    fixture:dict = json.load(file)
+
+                self.remember(fixture)
+
+        return len(self.fixtures)
+
+    def lookup(self, key:str, method:str, host:str, path:str) -> dict:
+        """
+        Find the recorded response for this request.
+        POST requests (simulations and broadcasts) contain signatures and sequence numbers that change every run,
+        so if there is no exact match we use the most recent POST to the same path.
+
+        @params:
+            - key: the fixture key for this request
+            - method: GET or POST
+            - host: the upstream host
+            - path: the path on the upstream host
+
+        @return: the fixture dict, or None if nothing was recorded
+        """
+
+        with self.lock:
+            if key in self.fixtures:
+                return self.fixtures[key]
+
+            if method == 'POST':
+                return self.latest.get((method, host, path))
+
+        return None
+
+    def remember(self, fixture:dict) -> bool:
+        """
+        Add this fixture to the in-memory lookups.
+
+        @params:
+            - fixture: a fixture dict
+
+        @return: True
+        """
+
+        with self.lock:
+            self.fixtures[fixture['key']] = fixture
+            self.latest[(fixture['method'], fixture['host'], fixture['path'])] = fixture
+
+        return True
+
+    def save(self, fixture:dict) -> str:
+        """
+        Write this fixture to disk and add it to the in-memory lookups.
+
+        @params:
+            - fixture: a fixture dict
+
+        @return: the file name it was saved to
+        """
+
+        # Ports are kept in the folder name, but without the colon
+        host_dir:str = os.path.join(self.fixtures_dir, fixture['host'].replace(':', '_'))
+        os.makedirs(host_dir, exist_ok = True)
+
+        file_name:str = os.path.join(host_dir, f"{fixture['method']}_{fixture['key']}.json")
+        temp_name:str = f'{file_name}.{threading.get_ident()}.tmp'
+
+        with open(temp_name, 'w') as file:
+            json.dump(fixture, file, indent = 4)
+
+        os.replace(temp_name, file_name)
+
+        self.remember(fixture)
+
+        return file_name
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    """
+    Handles requests like http://127.0.0.1:8080/<host>/<path>.
+
+    In record mode the request is forwarded to https://<host>/<path> and the response is saved.
+    In replay mode the saved response is returned, after any requested latency or errors.
+    """
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.handleRequest('GET')
+
+    def do_POST(self):
+        self.handleRequest('POST')
+
+    def handleRequest(self, method:str):
+        """
+        Record or replay a single request.
+
+        @params:
+            - method: GET or POST
+
+        @return: None
+        """
+
+        options:argparse.Namespace = self.server.options
+        store:ReplayStore          = self.server.store
+
+        parts      = urlsplit(self.path)
+        path_parts = parts.path.lstrip('/').split('/', 1)
+        host:str   = path_parts[0]
+        path:str   = '/' + path_parts[1] if len(path_parts) > 1 else '/'
+
+        body:bytes = b''
+        if 'Content-Length' in self.headers:
+            body = self.rfile.read(int(self.headers['Content-Length']))
+
+        if host == '':
+            self.sendResponse(400, 'application/json', json.dumps({'code': 3, 'message': 'requests must look like /<host>/<path>'}))
+            return
+
+        key:str = store.fixtureKey(method, host, path, parts.query, body)
+
+        if options.record == True:
+            fixture:dict = self.forward(method, host, path, parts.query, body, key)
+            if fixture is None:
+                self.sendResponse(502, 'application/json', json.dumps({'code': 14, 'message': f'{host} could not be reached'}))
+                return
+
+            store.save(fixture)
+            print (f" 🗄  Recorded {method} {host}{path} ({fixture['status']})")
+        else:
+            fixture:dict = store.lookup(key, method, host, path)
+
+            if options.latency > 0 or options.jitter > 0:
+                time.sleep(options.latency + random.uniform(0, options.jitter))
+
+            if options.error_rate > 0 and random.random() < options.error_rate:
+                self.sendResponse(options.error_status, 'application/json', json.dumps({'code': 14, 'message': 'injected error'}))
+                return
+
+            if fixture is None:
+                print (f' 🛎️  No fixture for {method} {host}{path}?{parts.query}')
+                self.sendResponse(404, 'application/json', json.dumps({'code': 5, 'message': f'no fixture recorded for {method} {host}{path}'}))
+                return
+
+        self.sendResponse(fixture['status'], fixture['content_type'], fixture['response'])
+
+    def forward(self, method:str, host:str, path:str, query:str, body:bytes, key:str) -> dict:
+        """
+        Send this request to the real host and turn the response into a fixture.
+
+        @params:
+            - method: GET or POST
+            - host: the upstream host
+            - path: the path on the upstream host
+            - query: the raw query string
+            - body: the raw request body
+            - key: the fixture key for this request
+
+        @return: a fixture dict, or None if the host could not be reached
+        """
+
+        url:str = f'{self.server.options.upstream_scheme}://{host}{path}'
+        if query != '':
+            url += f'?{query}'
+
+        headers:dict = {'Accept': self.headers.get('Accept', 'application/json')}
+        if 'Content-Type' in self.headers:
+            headers['Content-Type'] = self.headers['Content-Type']
+
+        try:
+            response:requests.Response = self.server.session.request(method, url, data = body if body else None, headers = headers, timeout = HTTP_TIMEOUT)
+        except requests.exceptions.RequestException as err:
+            print (f' 🛑 {method} {url} failed:', err)
+            return None
+
+        return {
+            'body':         body.decode('utf-8', errors = 'replace'),
+            'content_type': response.headers.get('Content-Type', 'application/json'),
+            'host':         host,
+            'key':          key,
+            'method':       method,
+            'path':         path,
+            'query':        query,
+            'response':     response.text,
+            'status':       response.status_code
+        }
+
+    def sendResponse(self, status:int, content_type:str, body:str):
+        """
+        Send the response back to the client.
+
+        @params:
+            - status: the HTTP status code
+            - content_type: the content type header value
+            - body: the response body
+
+        @return: None
+        """
+
+        content:bytes = body.encode('utf-8')
+
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(content)))
+        if status == 429:
+            self.send_header('Retry-After', '1')
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        # Only the record/replay summaries are printed
+        pass
+
+def main():
+
+    parser = argparse.ArgumentParser(description = 'Record LCD, denom trace, and price responses, and replay them without a network connection.')
+    parser.add_argument('--port', type = int, default = 8080, help = 'the port to listen on')
+    parser.add_argument('--fixtures', default = REPLAY_FIXTURES_DIR, help = 'the folder that holds the recorded responses')
+    parser.add_argument('--record', action = 'store_true', help = 'forward requests to the real hosts and save the responses')
+    parser.add_argument('--upstream-scheme', default = 'https', help = 'the scheme used when forwarding requests in record mode')
+    parser.add_argument('--latency', type = float, default = 0, help = 'seconds to wait before every replayed response')
+    parser.add_argument('--jitter', type = float, default = 0, help = 'up to this many extra random seconds per replayed response')
+    parser.add_argument('--error-rate', type = float, default = 0, help = 'the fraction (0 - 1) of replayed requests that return an error')
+    parser.add_argument('--error-status', type = int, default = 503, help = 'the HTTP status code for injected errors')
+
+    args = parser.parse_args()
+
+    store:ReplayStore = ReplayStore(args.fixtures)
+    fixture_count:int = store.load()
+
+    server:ThreadingHTTPServer = ThreadingHTTPServer(('127.0.0.1', args.port), ReplayHandler)
+    server.daemon_threads      = True
+    server.options             = args
+    server.session             = requests.Session()
+    server.store               = store
+
+    if args.record == True:
+        print (f'\n 🗄  Recording responses into {args.fixtures}')
+    else:
+        print (f'\n 🗄  Replaying {fixture_count} recorded responses from {args.fixtures}')
+        if args.latency > 0 or args.jitter > 0 or args.error_rate > 0:
+            print (f'    Latency: {args.latency}s (+ up to {args.jitter}s), error rate: {args.error_rate * 100}% (status {args.error_status})')
+
+    print (f'\n Listening on http://127.0.0.1:{args.port}')
+    print (f' Set REPLAY_SERVER_URL (or the LUNC_REPLAY_SERVER environment variable) to http://127.0.0.1:{args.port} to send every request here,')
+    print (f" or change an lcd_urls entry to http://127.0.0.1:{args.port}/<lcd host>\n")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print ('\n 🛑 Exiting...\n')
+
+if __name__ == "__main__":
+    """ This is executed when run from the command line """
+    main()
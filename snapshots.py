@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+import argparse
+
+from constants.constants import (
+    FULL_COIN_LOOKUP
+)
+
+from classes.balance_snapshots import balance_snapshots
+from classes.common import divide_raw_balance
+
+def coin_name(denom:str) -> str:
+    """
+    Get the readable name for a denom, if we know it.
+
+    @params:
+        - denom: the denom, like uluna
+
+    @return: the coin name, like LUNC
+    """
+
+    return FULL_COIN_LOOKUP.get(denom, denom)
+
+def format_amount(amount, denom:str) -> str:
+    """
+    Turn a raw amount into a readable one.
+
+    @params:
+        - amount: the raw amount (a string or a Decimal)
+        - denom: the denom, so we know the precision
+
+    @return: the amount with trailing zeros removed
+    """
+
+    return ("%.6f" % divide_raw_balance(amount, denom)).rstrip('0').rstrip('.')
+
+def print_table(header:list, rows:list) -> bool:
+    """
+    Print a simple table with columns as wide as their widest value.
+
+    @params:
+        - header: the column names
+        - rows: a list of rows, each the same length as the header
+
+    @return: True
+    """
+
+    widths:list = [max([len(str(value)) for value in column]) for column in zip(header, *rows)]
+
+    header_string:str = ' ' + ' | '.join(str(value).ljust(width) for value, width in zip(header, widths))
+    print ('-' * len(header_string))
+    print (header_string)
+    print ('-' * len(header_string))
+
+    for row in rows:
+        print (' ' + ' | '.join(str(value).ljust(width) for value, width in zip(row, widths)))
+
+    print ('-' * len(header_string) + '\n')
+
+    return True
+
+def main():
+
+    parser = argparse.ArgumentParser(description = 'Show the balance history saved by balances.py. No network requests are made.')
+    parser.add_argument('action', choices = ['history', 'diff'], help = 'history: every saved amount. diff: what changed between the last two snapshots of each wallet.')
+    parser.add_argument('--wallet', default = None, help = 'only show this wallet name')
+    parser.add_argument('--denom', default = None, help = 'only show this denom, like uluna (history only)')
+
+    args = parser.parse_args()
+
+    if args.action == 'history':
+        history:list = balance_snapshots.history(args.wallet, args.denom)
+
+        if len(history) == 0:
+            print (' 🛎️  No balance snapshots have been saved yet - run balances.py first.\n')
+            exit()
+
+        rows:list = []
+        for item in history:
+            rows.append([item['date'], item['block_height'], item['wallet_name'], coin_name(item['denom']), format_amount(item['available'], item['denom']), format_amount(item['delegated'], item['denom']), format_amount(item['rewards'], item['denom'])])
+
+        print_table(['Date', 'Block', 'Wallet', 'Coin', 'Available', 'Delegated', 'Rewards'], rows)
+    else:
+        # Get the wallet names from the history, unless we were given one
+        if args.wallet is not None:
+            wallet_names:list = [args.wallet]
+        else:
+            wallet_names:list = list(dict.fromkeys(item['wallet_name'] for item in balance_snapshots.history()))
+
+        rows:list = []
+        for wallet_name in wallet_names:
+            changes:dict = balance_snapshots.diff(wallet_name)
+            for denom in changes:
+                rows.append([wallet_name, coin_name(denom), format_amount(changes[denom]['available'], denom), format_amount(changes[denom]['delegated'], denom), format_amount(changes[denom]['rewards'], denom)])
+
+        if len(rows) == 0:
+            print (' 🛎️  Nothing has changed since the previous snapshot.\n')
+            exit()
+
+        print_table(['Wallet', 'Coin', 'Available', 'Delegated', 'Rewards'], rows)
+
+if __name__ == "__main__":
+    """ This is executed when run from the command line """
+    main()
@@ -1,6 +1,15 @@
 #!/usr/bin/env python3
 # -*- coding: UTF-8 -*-
 
+from __future__ import annotations
+
+# This must be the first import so it can time all the others (see --profile-imports)
+import classes.import_profiler
+
+import argparse
+
+from typing import TYPE_CHECKING
+
 from classes.common import (
     check_database,
     check_version,
@@ -14,15 +23,24 @@ from constants.constants import (
     USER_ACTION_QUIT
 )
 
-from classes.swap_transaction import swap_coins
-from classes.transaction_core import TransactionResult
+from classes.tracer import add_timing_arguments, start_timings
 from classes.wallet import UserParameters
 from classes.wallets import UserWallet, UserWallets
 
-from terra_classic_sdk.core.coin import Coin
+# The SDK is only loaded once the wallets are unlocked - these imports are just for the type hints
+if TYPE_CHECKING:
+    from classes.transaction_core import TransactionResult
+    from terra_classic_sdk.core.coin import Coin
 
 def main():
 
+    parser = argparse.ArgumentParser()
+    add_timing_arguments(parser)
+
+    args = parser.parse_args()
+
+    start_timings(args)
+
     # Check if there is a new version we should be using
     check_version()
     check_database()
@@ -35,6 +53,9 @@ def main():
         print ("\n 🛑 This password couldn't decrypt any wallets. Make sure it is correct, or rebuild the wallet list by running the configure_user_wallet.py script again.\n")
         exit()
 
+    # The swap classes load the whole SDK, so they aren't imported until the wallets are unlocked
+    from classes.swap_transaction import swap_coins
+
     if len(user_wallets) > 0:
         print (f'You can make swaps on the following wallets:')
 
@@ -5,10 +5,7 @@ import sqlite3
 import json
 import time
 
-from constants.constants import (
-    DB_FILE_NAME
-)
-
+from classes.schema import schema_manager
 from classes.wallet import UserWallet
 from classes.wallets import UserWallets
 
@@ -18,7 +15,7 @@ from classes.transaction_core import TransactionResult
 from terra_classic_sdk.core.coin import Coin
 
 def main():
-    conn = sqlite3.connect(DB_FILE_NAME)
+    conn = schema_manager.connect()
     conn.row_factory = sqlite3.Row
     print ("Opened database successfully")
 
@@ -1,12 +1,18 @@
 #!/usr/bin/env python3
 # -*- coding: UTF-8 -*-
 
+from __future__ import annotations
+
+# This must be the first import so it can time all the others (see --profile-imports)
+import classes.import_profiler
+
 import argparse
 import yaml
 
 from datetime import datetime
 from enum import Enum
 from os.path import exists
+from typing import TYPE_CHECKING
 
 from classes.common import (
     check_database,
@@ -25,17 +31,14 @@ from constants.constants import (
     WORKFLOWS_FILE_NAME,
 )
 
-from classes.delegation_transaction import delegate_to_validator, switch_validator, undelegate_from_validator
-from classes.liquidity_transaction import LiquidityTransaction, join_liquidity_pool, exit_liquidity_pool
-from classes.send_transaction import send_transaction
-from classes.swap_transaction import swap_coins
-from classes.transaction_core import TransactionResult
-from classes.validators import Validators
+from classes.tracer import add_timing_arguments, start_timings
 from classes.wallet import UserWallet
 from classes.wallets import UserWallets
-from classes.withdrawal_transaction import claim_delegation_rewards
 
-from terra_classic_sdk.core.coin import Coin    
+# The SDK is only loaded once the wallets are unlocked - these imports are just for the type hints
+if TYPE_CHECKING:
+    from classes.transaction_core import TransactionResult
+    from terra_classic_sdk.core.coin import Coin
 
 def check_amount(amount:str, balances:dict, preserve_minimum:bool = False) -> list[bool, Coin]:
     """
@@ -161,66 +164,36 @@ def check_trigger(triggers:list, balances:dict) -> bool:
 
     return is_triggered
 
-def find_address_in_wallet(wallet_list:dict, user_address:str) -> str:
+def find_address_in_wallet(user_wallets:UserWallets, user_address:str) -> str:
     """
-    Go through the list of wallets to find a match for the user address.
-    This might be either a wallet name or an address.
+    Find the address of a decrypted wallet by its name or address.
 
     @params:
+        - user_wallets: the UserWallets object that loaded the wallets
         - user_address: wallet name or actual terra/osmo address
 
-    @return: actual terra/osmo address
+    @return: actual terra/osmo address, or an empty string if there isn't a decrypted wallet that matches
     """
 
-    result:str = ''
-    wallet:UserWallet
-    for wallet_name in wallet_list:
-        wallet = wallet_list[wallet_name]
-        
-        if wallet.name.lower() == user_address.lower():
-            result = wallet.address
-            break
-        if wallet.address.lower() == user_address.lower():
-            result = wallet.address
-    
-    for wallet_name in wallet_list:
-        wallet = wallet_list[wallet_name]
-        
-        if wallet.name.lower() == user_address.lower():
-            result = wallet.address
-            break
-        if wallet.address.lower() == user_address.lower():
-            result = wallet.address
+    wallet:UserWallet = user_wallets.findWallet(user_address)
 
-    return result
+    if wallet is None:
+        return ''
+
+    return wallet.address
 
 def get_wallet(user_wallets:UserWallets, user_wallet:str) -> UserWallet:
     """
-    Basically a clone of find_address_in_wallet
-    """
+    Find a decrypted wallet by its name or address.
 
-    result:UserWallet = None
-
-    wallet:UserWallet
-    for wallet_name in user_wallets:
-        wallet = user_wallets[wallet_name]
-        
-        if wallet.name.lower() == user_wallet.lower():
-            result = wallet
-            break
-        if wallet.address.lower() == user_wallet.lower():
-            result = wallet
-    
-    for wallet_name in user_wallets:
-        wallet = user_wallets[wallet_name]
-        
-        if wallet.name.lower() == user_wallet.lower():
-            result = wallet
-            break
-        if wallet.address.lower() == user_wallet.lower():
-            result = wallet
+    @params:
+        - user_wallets: the UserWallets object that loaded the wallets
+        - user_wallet: wallet name or actual terra/osmo address
+
+    @return: the wallet, or None if it wasn't found
+    """
 
-    return result
+    return user_wallets.findWallet(user_wallet)
 
 class MessageType(Enum):
     HEADER = 0
@@ -364,16 +337,19 @@ def output(msg:str, silent:bool, type:int = OUTPUT_USER) -> bool:
 
 def main():
     
-    # Check if there is a new version we should be using
-    check_version()
-    check_database()
-
     parser = argparse.ArgumentParser()
     parser.add_argument('--workflow', default=WORKFLOWS_FILE_NAME)
     parser.add_argument('--silent', default=False)
+    add_timing_arguments(parser)
 
     args = parser.parse_args()
 
+    start_timings(args)
+
+    # Check if there is a new version we should be using
+    check_version()
+    check_database()
+
     silent_mode:bool = False
     
     if args.silent != False:
@@ -396,30 +372,73 @@ def main():
         print (f'\n 🛑 The {args.workflow} file does not exist - please create one using the documentation at https://github.com/geoffmunn/utility-scripts/blob/main/docs/workflows.md.\n')
         exit()
     
+    if user_workflows is None:
+        print ("\n 🛑 The workflow file is empty.\n")
+        exit()
+
+    # Only the wallets that these workflows use need to be decrypted
+    workflow_wallets:list = []
+    for workflow in user_workflows['workflows']:
+        workflow_wallets += [str(workflow_wallet) for workflow_wallet in workflow['wallets']]
+
+        # Steps can also use a different wallet to the one the workflow is running on, and recipients
+        # have to be one of our own wallets, so these are decrypted as well
+        for step in workflow['steps']:
+            workflow_wallets += [str(step[key]) for key in ['wallet', 'recipient'] if key in step]
+
     # Get the user wallets. We'll be getting the balances futher on down.
-    user_wallets = UserWallets().loadUserWallets(get_balances = False)
+    all_wallets:UserWallets = UserWallets()
+    user_wallets:dict       = all_wallets.loadUserWallets(get_balances = False, wallet_names = workflow_wallets)
     
     if len(user_wallets) == 0:
         print ("\n 🛑 This password couldn't decrypt any wallets. Make sure it is correct, or rebuild the wallet list by running the configure_user_wallet.py script again.\n")
         exit()
 
+    # The transaction classes load the whole SDK, so they aren't imported until the wallets are unlocked
+    from classes.delegation_transaction import delegate_to_validator, switch_validator, undelegate_from_validator
+    from classes.liquidity_transaction import LiquidityTransaction, join_liquidity_pool, exit_liquidity_pool
+    from classes.send_transaction import send_transaction
+    from classes.swap_transaction import swap_coins
+    from classes.validators import Validators
+    from classes.withdrawal_transaction import claim_delegation_rewards
+
     # Set up the log object
     logs:Log = Log()
     logs.silent_mode = silent_mode
     
     # Go through each workflow and attach the wallets that they match
-    if user_workflows is not None:
-        for workflow in user_workflows['workflows']:
-            workflow['user_wallets'] = []   
-            # Take each wallet in the user config list... 
-            for wallet in user_wallets:
-                # If this wallet name or address matches what the workflow has asked for, then add it
-                for workflow_wallet in workflow['wallets']:
-                    if workflow_wallet.lower() == user_wallets[wallet].name.lower() or workflow_wallet.lower() == user_wallets[wallet].address.lower():
-                        workflow['user_wallets'].append(user_wallets[wallet])
-    else:
-        print ("\n 🛑 The workflow file is empty.\n")
-        exit()
+    for workflow in user_workflows['workflows']:
+        workflow['user_wallets'] = []   
+        matched_wallets:set      = set()
+
+        # Look up each wallet name or address that the workflow has asked for
+        for workflow_wallet in workflow['wallets']:
+            wallet:UserWallet = all_wallets.findWallet(workflow_wallet)
+
+            # Each wallet is only run once, even if it is listed by both name and address
+            if wallet is not None and wallet.name not in matched_wallets:
+                matched_wallets.add(wallet.name)
+                workflow['user_wallets'].append(wallet)
+
+    # Check every recipient before anything runs, so a bad address doesn't stop a workflow halfway through
+    recipients:dict = {}
+    for workflow in user_workflows['workflows']:
+        for step in workflow['steps']:
+            if 'recipient' in step:
+                recipient_address:str = find_address_in_wallet(all_wallets, step['recipient'])
+                if recipient_address != '':
+                    recipients[recipient_address] = step['recipient']
+
+    validations:dict = all_wallets.validateAddresses(list(recipients))
+    for recipient_address in validations:
+        is_valid, is_empty = validations[recipient_address]
+        if is_valid == False and is_empty == False:
+            # A bad checksum will never work, but if the LCD couldn't check it then the step can try again later
+            if UserWallet().validateAddressFormat(recipient_address) == False:
+                print (f"\n 🛑 The recipient '{recipients[recipient_address]}' ({recipient_address}) is not a valid address - please check your address book.\n")
+                exit()
+            else:
+                print (f" 🛎️  The recipient '{recipients[recipient_address]}' ({recipient_address}) could not be checked right now - it will be checked again when the step runs.")
 
     # Now go through each workflow and run the steps
     for workflow in user_workflows['workflows']:
@@ -556,7 +575,7 @@ def main():
                             # This is going to a specific validator, and is from the wallet balance
                             # Check if there's a specific wallet to use:
                             if 'wallet' in step:
-                                step_wallet:UserWallet = get_wallet(user_wallets, step['wallet'])
+                                step_wallet:UserWallet = get_wallet(all_wallets, step['wallet'])
                             else:
                                 step_wallet:UserWallet = wallet
 
@@ -617,7 +636,7 @@ def main():
                             # We are sending an amount to a specific address (could be terra or osmo)
                             # Check if there's a specific wallet to use:
                             if 'wallet' in step:
-                                step_wallet:UserWallet = get_wallet(user_wallets, step['wallet'])
+                                step_wallet:UserWallet = get_wallet(all_wallets, step['wallet'])
                             else:
                                 step_wallet:UserWallet = wallet
 
@@ -641,7 +660,7 @@ def main():
                                     if amount_ok == True:
                                         # Get the address based on the recipient value
                                         # We will restrict recipients to just whats in the address book for safety reasons
-                                        recipient_address:str = find_address_in_wallet(user_wallets, step['recipient'])
+                                        recipient_address:str = find_address_in_wallet(all_wallets, step['recipient'])
 
                                         if recipient_address != '':
                                             # We should be ok to send at this point
@@ -678,7 +697,7 @@ def main():
                             # We are sending an amount to a specific address (could be terra or osmo)
                             # Check if there's a specific wallet to use:
                             if 'wallet' in step:
-                                step_wallet:UserWallet = get_wallet(user_wallets, step['wallet'])
+                                step_wallet:UserWallet = get_wallet(all_wallets, step['wallet'])
                             else:
                                 step_wallet:UserWallet = wallet
 
@@ -729,7 +748,7 @@ def main():
                         if action == 'join pool':
                             # Check if there's a specific wallet to use:
                             if 'wallet' in step:
-                                step_wallet:UserWallet = get_wallet(user_wallets, step['wallet'])
+                                step_wallet:UserWallet = get_wallet(all_wallets, step['wallet'])
                             else:
                                 step_wallet:UserWallet = wallet
 
@@ -777,7 +796,7 @@ def main():
                         if action == 'exit pool':
                             # Check if there's a specific wallet to use:
                             if 'wallet' in step:
-                                step_wallet:UserWallet = get_wallet(user_wallets, step['wallet'])
+                                step_wallet:UserWallet = get_wallet(all_wallets, step['wallet'])
                             else:
                                 step_wallet:UserWallet = wallet
 
@@ -788,7 +807,7 @@ def main():
                                     pool_id:int = step['pool id']
 
                                 # Create the send tx object
-                                liquidity_tx = LiquidityTransaction().create(wallet.seed, wallet.denom)
+                                liquidity_tx = LiquidityTransaction().create(wallet.seed, wallet.denom, wallet.terra)
 
                                 # Update the liquidity object with the details so we can get the pool assets
                                 liquidity_tx.pools        = wallet.pools